@@ -39,7 +39,12 @@
 #
 # Source File Name:  cli.py
 ###
-"""CDP Control."""
+"""
+CDP Control.
+
+The commands import their implementation when invoked, so the cloud SDKs and
+pytest are not loaded by the commands not needing them.
+"""
 
 import sys
 
@@ -47,8 +52,6 @@ import click
 
 from cdpctl import SUPPORTED_PLATFORMS, SUPPORTED_TARGETS
 from cdpctl.__version__ import __version__
-from cdpctl.command.config import render_skeleton
-from cdpctl.command.validate import run_validation
 
 SUPPORTED_OUTPUT_TYPES = ["text", "json"]
 
@@ -70,6 +73,18 @@ def _cli(ctx, debug=False, version=False, quiet=False) -> None:
         sys.exit(0)
 
 
+def _parse_shard(ctx, param, value):  # pylint: disable=unused-argument
+    """Parse the shard option."""
+    if value is None:
+        return None
+    from cdpctl.validation.results import parse_shard
+
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
 @click.command()
 @click.pass_context
 @click.argument("target", type=click.Choice(SUPPORTED_TARGETS, case_sensitive=False))
@@ -95,16 +110,101 @@ def _cli(ctx, debug=False, version=False, quiet=False) -> None:
     help="The format to output the results as.",
     type=click.Choice(SUPPORTED_OUTPUT_TYPES, case_sensitive=False),
 )
+@click.option(
+    "-w",
+    "--watch",
+    is_flag=True,
+    default=False,
+    help="Watch the config file and run again the validations affected by changes.",
+)
+@click.option(
+    "--revalidate",
+    is_flag=True,
+    default=False,
+    help="Run every validation, even if its inputs did not change since last run.",
+)
+@click.option(
+    "--shard",
+    default=None,
+    help="Only run the i-th of N shards of the validations, given as i/N.",
+    callback=_parse_shard,
+)
+@click.option(
+    "--shard_file",
+    default=None,
+    help="The file to write the shard results to. "
+    "Defaults to cdpctl-shard-i-of-N.json.",
+    type=click.Path(exists=False),
+)
+@click.option(
+    "--deadline",
+    default=None,
+    help="Stop evaluating the validations after this many seconds.",
+    type=click.FloatRange(min=0),
+)
+@click.option(
+    "--fail-fast",
+    "fail_fast",
+    is_flag=True,
+    default=False,
+    help="Stop at the first failed validation.",
+)
+@click.option(
+    "--timings_file",
+    default=None,
+    help="The timing history used to order the validations and split the "
+    "shards. Defaults to the cdpctl cache, which does not split the shards.",
+    type=click.Path(exists=False),
+)
+@click.option(
+    "--memprofile",
+    is_flag=True,
+    default=False,
+    help="Profile the memory used by each validation and by the rendering.",
+)
+@click.option(
+    "--memprofile_file",
+    default=None,
+    help="The file to write the memory profile to. "
+    "Defaults to cdpctl-memprofile.json.",
+    type=click.Path(exists=False),
+)
 def validate(
-    ctx, target: str, config_file, output_file, output_format
+    ctx,
+    target: str,
+    config_file,
+    output_file,
+    output_format,
+    watch,
+    revalidate,
+    shard,
+    shard_file,
+    deadline,
+    fail_fast,
+    timings_file,
+    memprofile,
+    memprofile_file,
 ) -> None:  # pylint: disable=unused-argument
     """Run validation checks on provided section."""
+    if shard is not None and watch:
+        raise click.UsageError("--watch cannot be used with --shard.")
+    from cdpctl.command.validate import run_validation
+
     run_validation(
         target=target,
         config_file=config_file,
         debug=ctx.obj["DEBUG"],
         output_format=output_format,
         output_file=output_file,
+        watch=watch,
+        revalidate=revalidate,
+        shard=shard,
+        shard_file=shard_file,
+        deadline=deadline,
+        fail_fast=fail_fast,
+        timings_file=timings_file,
+        memprofile=memprofile,
+        memprofile_file=memprofile_file,
     )
 
 
@@ -131,9 +231,236 @@ def config() -> None:
 )
 def skeleton(output_file, platform: str) -> None:
     """Output the skeleton config."""
+    from cdpctl.command.config import render_skeleton
+
     render_skeleton(output_file=output_file, platform=platform.lower())
 
 
+@click.command()
+@click.pass_context
+@click.option(
+    "--host",
+    default="127.0.0.1",
+    help="The address to listen on. Defaults to 127.0.0.1.",
+)
+@click.option(
+    "-p",
+    "--port",
+    default=8765,
+    help="The port to listen on. Defaults to 8765.",
+    type=int,
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    default=None,
+    help="Listen on a Unix socket instead of a port.",
+    type=click.Path(exists=False),
+)
+@click.option(
+    "--token",
+    envvar="CDPCTL_SERVE_TOKEN",
+    default=None,
+    help="The bearer token the requests must send. Generated and printed when "
+    "listening on a port without one, optional on a Unix socket.",
+)
+def serve(ctx, host, port, socket_path, token) -> None:
+    """Serve validation requests, keeping the clients and caches warm."""
+    from cdpctl.command.serve import run_server
+
+    run_server(
+        host=host,
+        port=port,
+        socket_path=socket_path,
+        debug=ctx.obj["DEBUG"],
+        token=token,
+    )
+
+
+@click.command()
+@click.argument("target", type=click.Choice(SUPPORTED_TARGETS, case_sensitive=False))
+@click.option(
+    "-c",
+    "--config_file",
+    "config_files",
+    multiple=True,
+    default=["config.yml"],
+    help="The config file of an environment to provision. Repeat it to provision "
+    "several environments. Defaults to config.yml.",
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    "--width",
+    default=4,
+    help="The number of environments provisioned at once. Defaults to 4.",
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--forks",
+    default=20,
+    help="The Ansible forks shared by the environments provisioned at once. "
+    "Defaults to 20.",
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--events_file",
+    default=None,
+    help="The file to write the provisioning events to, as newline delimited JSON.",
+    type=click.Path(exists=False, dir_okay=False),
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Resume the previous provisioning: skip the environments already "
+    "provisioned and start the others at the task they stopped at, with the facts "
+    "set and the variables registered by the tasks already run as host variables. "
+    "The tasks are found by name, an environment stopped at a task whose name is "
+    "not unique is not resumed.",
+)
+@click.option(
+    "--project_dir",
+    default="example",
+    help="The ansible-runner input directory of the playbook. Defaults to example.",
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    "--playbook",
+    default="test.yaml",
+    help="The playbook to run, relative to the project subdirectory of the "
+    "project_dir. Defaults to test.yaml.",
+)
+def provision(
+    target: str,
+    config_files,
+    width,
+    forks,
+    events_file,
+    resume,
+    project_dir,
+    playbook,
+) -> None:
+    """Provision the prerequisites of CDP environments."""
+    from cdpctl.command.provision import run_provision
+
+    run_provision(
+        target=target,
+        config_files=list(config_files),
+        width=width,
+        forks=forks,
+        events_file=events_file,
+        resume=resume,
+        project_dir=project_dir,
+        playbook=playbook,
+    )
+
+
+@click.command()
+@click.argument("target", type=click.Choice(SUPPORTED_TARGETS, case_sensitive=False))
+@click.option(
+    "-c",
+    "--config_file",
+    "config_file",
+    default="config.yml",
+    help="The config file of the environment to tear down. Defaults to config.yml.",
+    type=click.Path(exists=False),
+)
+@click.option(
+    "--plan",
+    "plan_only",
+    is_flag=True,
+    default=False,
+    help="Only print the deletion plan, without deleting anything.",
+)
+@click.option(
+    "-y",
+    "--yes",
+    "assume_yes",
+    is_flag=True,
+    default=False,
+    help="Delete the resources without asking for confirmation.",
+)
+@click.option(
+    "--max_workers",
+    default=8,
+    help="The number of resources deleted at once. Defaults to 8.",
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--delete_vpc",
+    is_flag=True,
+    default=False,
+    help="Also delete the AWS VPC of the config, with everything in it: its NAT "
+    "gateways and their Elastic IPs, subnets, internet gateways, route tables "
+    "and security groups. On Azure, also delete the VNet and the NSGs of the "
+    "config.",
+)
+@click.option(
+    "--delete_buckets",
+    is_flag=True,
+    default=False,
+    help="Also delete the S3 buckets or ADLS file systems of the config "
+    "locations, with all their objects. Only the objects under the locations "
+    "are deleted otherwise.",
+)
+def teardown(
+    target: str,
+    config_file,
+    plan_only,
+    assume_yes,
+    max_workers,
+    delete_vpc,
+    delete_buckets,
+) -> None:
+    """Delete the prerequisites of a CDP environment."""
+    from cdpctl.command.teardown import run_teardown
+
+    run_teardown(
+        target=target,
+        config_file=config_file,
+        plan_only=plan_only,
+        assume_yes=assume_yes,
+        max_workers=max_workers,
+        delete_vpc=delete_vpc,
+        delete_buckets=delete_buckets,
+    )
+
+
+@click.group()
+def results() -> None:
+    """Works with the validation results."""
+    pass
+
+
+@click.command()
+@click.argument(
+    "shard_files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "-o",
+    "--output_file",
+    default="-",
+    help="The file to output the results to. Defaults to stdout.",
+    type=click.Path(exists=False),
+)
+@click.option(
+    "-f",
+    "--output_format",
+    default="text",
+    help="The format to output the results as.",
+    type=click.Choice(SUPPORTED_OUTPUT_TYPES, case_sensitive=False),
+)
+def merge(shard_files, output_file, output_format) -> None:
+    """Merge the results of the shards of a validation run."""
+    from cdpctl.command.results import run_merge
+
+    run_merge(
+        shard_files=list(shard_files),
+        output_format=output_format,
+        output_file=output_file,
+    )
+
+
 def print_version() -> None:
     """Print the cdpctl version."""
     click.echo(__version__)
@@ -141,8 +468,13 @@ def print_version() -> None:
 
 
 config.add_command(skeleton)
+results.add_command(merge)
 _cli.add_command(validate)
 _cli.add_command(config)
+_cli.add_command(results)
+_cli.add_command(serve)
+_cli.add_command(provision)
+_cli.add_command(teardown)
 
 
 def main() -> None:
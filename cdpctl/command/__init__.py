@@ -41,8 +41,17 @@
 ###
 """Common Shared Info."""
 
-from .provision import ProvisionCommand
+from typing import Any
 
 __all__ = [
     "ProvisionCommand",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the commands on first use, as they load Ansible."""
+    if name == "ProvisionCommand":
+        from .provision import ProvisionCommand
+
+        return ProvisionCommand
+    raise AttributeError(f"module {__name__} has no attribute {name}")
@@ -41,20 +41,13 @@
 ###
 
 """Config Commands Implementation."""
-from jinja2 import Environment, PackageLoader, select_autoescape
-
-from cdpctl.utils import smart_open
+from cdpctl.utils import get_template_environment, render_template
 
 CONFIG_TEMPLATE_NAME = {"aws": "config_aws.yml.j2", "azure": "config_azure.yml.j2"}
 
 
 def render_skeleton(output_file: str, platform: str):
     """Render the skeleton config."""
-    env = Environment(
-        loader=PackageLoader(package_name="cdpctl", package_path="templates"),
-        autoescape=select_autoescape(),
-    )
-
+    env = get_template_environment(package_name="cdpctl")
     config_template = env.get_template(CONFIG_TEMPLATE_NAME[platform])
-    with smart_open(output_file) as f:
-        f.write(config_template.render(info={}))
+    render_template(config_template, output_file, info={})
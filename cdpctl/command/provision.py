@@ -40,39 +40,632 @@
 # Source File Name:  provision.py
 ###
 """Povision Command Implementation."""
+import hashlib
+import json
 import os
-from typing import Any, Dict
+import queue
+import re
+import shlex
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Optional, TextIO, Tuple
 
 import ansible_runner
+import click
 import progressbar
+import yaml
 
 from cdpctl import Command
+from cdpctl.utils import get_cache_dir
+
+DEFAULT_PROVISION_WIDTH = 4
+DEFAULT_PROVISION_FORKS = 20
+DEFAULT_PROVISION_PROJECT_DIR = "example"
+DEFAULT_PROVISION_PLAYBOOK = "test.yaml"
+PROVISION_EVENT_QUEUE_SIZE = 10000
+PROVISION_EVENT_BATCH_SIZE = 1000
+PROVISION_REDRAW_INTERVAL = 0.25
+# Event reporting the final status of a run, besides the ansible-runner events
+RUN_STATUS_EVENT = "cdpctl_run_status"
+# Events of the result of a task on a host, with the result they count as
+HOST_RESULT_EVENTS = {
+    "runner_on_ok": "ok",
+    "runner_on_failed": "failed",
+    "runner_on_unreachable": "unreachable",
+    "runner_on_skipped": "skipped",
+}
+HOST_RESULTS = ["ok", "changed", "failed", "unreachable", "skipped"]
+_STOP = object()
+PROVISION_CACHE_DIR_NAME = "provision"
+# Events failing a task on a host
+HOST_FAILED_EVENTS = ["runner_on_failed", "runner_on_unreachable"]
+GATHER_FACTS_ACTIONS = ["setup", "gather_facts"]
+
+
+def get_run_names(config_files: List[str]) -> List[str]:
+    """Get a unique name for the run of each config file, from its file name."""
+    names: List[str] = []
+    for config_file in config_files:
+        stem = os.path.splitext(os.path.basename(config_file))[0]
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", stem) or "config"
+        unique_name, index = name, 1
+        while unique_name in names:
+            index += 1
+            unique_name = f"{name}-{index}"
+        names.append(unique_name)
+    return names
+
+
+@lru_cache(maxsize=None)
+def get_task_registers(path: str) -> Dict[int, str]:
+    """
+    Get the variables the tasks of a file register their result in, by line.
+
+    The task path of the events is the file and the line the mapping of the
+    task starts at, as read by the YAML parser of Ansible, so the registers
+    are taken from the mappings of the parsed file at their line.
+    """
+    try:
+        with open(path, encoding="utf-8") as source:
+            stack = [
+                node
+                for node in yaml.compose_all(source, Loader=yaml.SafeLoader)
+                if node is not None
+            ]
+    except (OSError, yaml.YAMLError):
+        return {}
+    registers: Dict[int, str] = {}
+    while stack:
+        node = stack.pop()
+        if isinstance(node, yaml.SequenceNode):
+            stack.extend(node.value)
+        elif isinstance(node, yaml.MappingNode):
+            for key, value in node.value:
+                if (
+                    isinstance(key, yaml.ScalarNode)
+                    and key.value == "register"
+                    and isinstance(value, yaml.ScalarNode)
+                ):
+                    # A mapping in the task starts on its line in flow style
+                    registers.setdefault(node.start_mark.line + 1, value.value)
+                stack.append(value)
+    return registers
+
+
+def get_task_register(task_path: Optional[str]) -> Optional[str]:
+    """Get the variable the task of a task path registers its result in."""
+    path, _, line = (task_path or "").rpartition(":")
+    if not path or not line.isdigit():
+        return None
+    return get_task_registers(path).get(int(line))
+
+
+class ProvisionEvents:
+    """
+    Events of the provision runs, rendered by their own thread.
+
+    The event handlers of the runs never write nor wait: they put each event
+    on the unbounded queue of the writer thread of the NDJSON events file, if
+    any, which writes them tagged with the name of their run, so the file has
+    all the events. For the progress, they put the events on a bounded queue:
+    an event arriving while the queue is full is dropped from the progress
+    and counted. The renderer thread takes the events in batches, keeping the
+    current task of each run and the task results of each host, and redraws
+    at most once per interval, printing the current task of the runs which
+    changed since the last redraw. Once stopped, the events are no longer
+    written.
+    """
+
+    def __init__(
+        self,
+        progress_bar: Any = None,
+        events_file: Optional[str] = None,
+        max_size: int = PROVISION_EVENT_QUEUE_SIZE,
+        interval: float = PROVISION_REDRAW_INTERVAL,
+    ) -> None:
+        """Initialize the ProvisionEvents."""
+        self.progress_bar = progress_bar
+        self.events_file = events_file
+        self.interval = interval
+        self.events = 0
+        self.dropped = 0
+        self.tasks: Dict[str, str] = {}
+        self.hosts: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_size)
+        self._changed: Dict[str, None] = {}
+        self._lines: List[str] = []
+        self._lock = threading.Lock()
+        self._writes: "queue.Queue[Any]" = queue.Queue()
+        self._writing = bool(events_file)
+        self._output_mode = "w"
+        self._output_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "ProvisionEvents":
+        """Start rendering the events."""
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Render the remaining events and stop."""
+        self.stop()
+
+    def start(self) -> None:
+        """Start the writer thread of the events file and the renderer thread."""
+        if self.events_file:
+            # Truncated when first opened, appended to when started again
+            output = open(self.events_file, self._output_mode, encoding="utf-8")
+            self._output_mode = "a"
+            with self._output_lock:
+                self._writing = True
+            self._writer = threading.Thread(
+                target=self._write_events,
+                args=(output,),
+                name="cdpctl-provision-events-file",
+                daemon=True,
+            )
+            self._writer.start()
+        self._thread = threading.Thread(
+            target=self._render, name="cdpctl-provision-events", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Render the remaining events, with the summary of the hosts."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        with self._output_lock:
+            self._writing = False
+            self._writes.put(_STOP)
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    def put(self, name: str, event: Dict[str, Any]) -> None:
+        """Put an event of a run for the events file and the progress."""
+        self._write(name, event)
+        try:
+            self._queue.put_nowait((name, event))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def put_status(self, name: str, status: str) -> None:
+        """Put the final status of a run, which is never dropped."""
+        event = {"event": RUN_STATUS_EVENT, "status": status}
+        self._write(name, event)
+        self._queue.put((name, event))
+
+    def _write(self, name: str, event: Dict[str, Any]) -> None:
+        with self._output_lock:
+            if self._writing:
+                self._writes.put((name, event))
+
+    def _write_events(self, output: TextIO) -> None:
+        try:
+            while True:
+                record = self._writes.get()
+                if record is _STOP:
+                    return
+                name, event = record
+                output.write(json.dumps({"run": name, **event}, default=str) + "\n")
+        finally:
+            output.close()
+
+    def _render(self) -> None:
+        stopping = False
+        last_draw = 0.0
+        while not stopping:
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.interval))
+                while len(batch) < PROVISION_EVENT_BATCH_SIZE:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            for record in batch:
+                if record is _STOP:
+                    stopping = True
+                else:
+                    self._handle(record[0], record[1])
+            now = time.monotonic()
+            if stopping or now - last_draw >= self.interval:
+                self._draw(final=stopping)
+                last_draw = now
+
+    def _handle(self, name: str, event: Dict[str, Any]) -> None:
+        self.events += 1
+        kind = event.get("event")
+        event_data = event.get("event_data") or {}
+        if kind == RUN_STATUS_EVENT:
+            self._lines.append(f"[{name}] {event['status']}")
+        elif kind in HOST_RESULT_EVENTS and "host" in event_data:
+            results = self.hosts.setdefault(
+                (name, event_data["host"]), dict.fromkeys(HOST_RESULTS, 0)
+            )
+            results[HOST_RESULT_EVENTS[kind]] += 1
+            if kind == "runner_on_ok" and (event_data.get("res") or {}).get("changed"):
+                results["changed"] += 1
+        elif "name" in event_data and self.tasks.get(name) != event_data["name"]:
+            self.tasks[name] = event_data["name"]
+            self._changed[name] = None
+
+    def _draw(self, final: bool = False) -> None:
+        lines = [f"[{name}] Task: {self.tasks[name]}" for name in self._changed]
+        lines.extend(self._lines)
+        self._changed.clear()
+        self._lines = []
+        if final:
+            for (name, host), results in sorted(self.hosts.items()):
+                counts = " ".join(f"{key}={results[key]}" for key in HOST_RESULTS)
+                lines.append(f"[{name}] {host}: {counts}")
+            if self.dropped:
+                lines.append(f"{self.dropped} events were dropped from the progress")
+        if lines:
+            print("\n".join(lines))
+        if self.progress_bar is not None:
+            self.progress_bar.update(self.events)
+            progressbar.streams.flush()
+
+
+class ProvisionCheckpoint:
+    """
+    Progress of the provision of an environment, to resume it.
+
+    The resume task is the first task failed, or the one running when the run
+    stopped. Ansible caches the gathered facts in the
+    fact cache directory of the environment, emptied when a run starts over
+    instead of resuming, and the facts set and the variables registered by
+    the tasks are kept per host, to be restored as host variables of the
+    playbook when resuming.
+
+    Ansible resumes at the first task with the resume task name, so a run
+    whose resume task name was used by several tasks is not resumed.
+
+    The checkpoint is updated in memory from the events of the run, and saved
+    when the run ends.
+    """
+
+    def __init__(self, path: Optional[str] = None, fact_cache_dir: str = None) -> None:
+        """Initialize the ProvisionCheckpoint."""
+        self.path = path
+        self.fact_cache_dir = fact_cache_dir
+        # The directory the playbook is run from, the task paths are kept
+        # relative to it
+        self.source_dir: Optional[str] = None
+        self.status: Optional[str] = None
+        self.resume_task: Optional[str] = None
+        self.task_paths: Dict[str, List[str]] = {}
+        self.facts: Dict[str, Dict[str, Any]] = {}
+        self.registered: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[str] = None
+        self._task_register: Optional[str] = None
+
+    @classmethod
+    def for_run(
+        cls,
+        target: str,
+        name: str,
+        config_file: str,
+        resume: bool = False,
+        playbook: str = DEFAULT_PROVISION_PLAYBOOK,
+    ) -> "ProvisionCheckpoint":
+        """Get the checkpoint of a run, loading the previous one if resuming."""
+        key = hashlib.sha256(
+            f"{target}:{playbook}:{os.path.abspath(config_file)}".encode("utf-8")
+        ).hexdigest()[:16]
+        cache_dir = get_cache_dir(PROVISION_CACHE_DIR_NAME)
+        if not cache_dir:
+            return cls()
+        checkpoint = cls(
+            os.path.join(cache_dir, f"{name}-{key}.json"),
+            get_cache_dir(PROVISION_CACHE_DIR_NAME, "facts", f"{name}-{key}"),
+        )
+        if resume:
+            checkpoint.load()
+        return checkpoint
+
+    def load(self) -> None:
+        """Load the saved checkpoint, if any."""
+        if not self.path or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as checkpoint_file:
+                saved = json.load(checkpoint_file)
+            self.status = saved["status"]
+            self.resume_task = saved["resume_task"]
+            self.task_paths = dict(saved["task_paths"])
+            self.facts = dict(saved["facts"])
+            self.registered = dict(saved["registered"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+    def save(self) -> None:
+        """Save the checkpoint, replacing the file at once."""
+        if not self.path:
+            return
+        if self.resume_task is None and self.status != "successful":
+            self.resume_task = self._task
+        try:
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.path), suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as checkpoint_file:
+                json.dump(
+                    {
+                        "status": self.status,
+                        "resume_task": self.resume_task,
+                        "task_paths": self.task_paths,
+                        "facts": self.facts,
+                        "registered": self.registered,
+                    },
+                    checkpoint_file,
+                    default=str,
+                )
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+    def start(self) -> Optional[str]:
+        """
+        Start a run, returning the task to start at, if any.
+
+        Raises a ValueError when the resume task name is not unique.
+        """
+        resume_task = self.resume_task if self.status != "successful" else None
+        task_paths = self.task_paths.get(resume_task or "", [])
+        if len(task_paths) > 1:
+            raise ValueError(
+                f"unable to resume at the task '{resume_task}', its name is used "
+                f"by several tasks: {', '.join(task_paths)}"
+            )
+        if resume_task is None:
+            self._clear_facts()
+        self.status = None
+        self.resume_task = None
+        self._task = None
+        return resume_task
+
+    def _clear_facts(self) -> None:
+        """Drop the facts and variables of a previous run, a new run starting over."""
+        self.task_paths = {}
+        self.facts = {}
+        self.registered = {}
+        if self.fact_cache_dir:
+            shutil.rmtree(self.fact_cache_dir, ignore_errors=True)
+            os.makedirs(self.fact_cache_dir, exist_ok=True)
+
+    def get_envvars(self) -> Dict[str, str]:
+        """
+        Get the environment variables of the fact cache of the run.
+
+        The facts gathered are cached for the run to be resumed, a new run
+        starting with an empty cache.
+        """
+        if not self.fact_cache_dir:
+            return {}
+        return {
+            "ANSIBLE_CACHE_PLUGIN": "jsonfile",
+            "ANSIBLE_CACHE_PLUGIN_CONNECTION": self.fact_cache_dir,
+            # Facts are only gathered for the hosts without cached facts
+            "ANSIBLE_GATHERING": "smart",
+        }
+
+    def get_host_vars(self) -> Dict[str, Dict[str, Any]]:
+        """Get the facts and registered variables of the completed tasks per host."""
+        return {
+            host: {**self.facts.get(host, {}), **self.registered.get(host, {})}
+            for host in sorted(set(self.facts) | set(self.registered))
+        }
+
+    def write_host_vars(self, playbook_dir: str) -> None:
+        """Write the host variables to restore next to the playbook."""
+        for host, host_vars in self.get_host_vars().items():
+            if os.sep in host or host.startswith("."):
+                continue
+            host_vars_dir = os.path.join(playbook_dir, "host_vars")
+            os.makedirs(host_vars_dir, exist_ok=True)
+            with open(
+                os.path.join(host_vars_dir, f"{host}.json"), "w", encoding="utf-8"
+            ) as host_vars_file:
+                json.dump(host_vars, host_vars_file, default=str)
+
+    def update(self, event: Dict[str, Any]) -> None:
+        """Update the checkpoint from an event of the run."""
+        kind = event.get("event")
+        event_data = event.get("event_data") or {}
+        if kind == "playbook_on_task_start":
+            self._task = event_data.get("task") or event_data.get("name")
+            self._task_register = get_task_register(event_data.get("task_path"))
+            if self._task:
+                paths = self.task_paths.setdefault(self._task, [])
+                task_path = event_data.get("task_path") or ""
+                if self.source_dir and task_path.startswith(self.source_dir):
+                    task_path = os.path.relpath(task_path, self.source_dir)
+                if task_path not in paths:
+                    paths.append(task_path)
+        elif kind in HOST_FAILED_EVENTS and not event_data.get("ignore_errors"):
+            if self.resume_task is None:
+                self.resume_task = self._task
+        elif kind == "runner_on_ok" and "host" in event_data:
+            result = event_data.get("res") or {}
+            # The gathered facts are kept by the fact cache
+            facts = result.get("ansible_facts")
+            if facts and event_data.get("task_action") not in GATHER_FACTS_ACTIONS:
+                self.facts.setdefault(event_data["host"], {}).update(facts)
+            if self._task_register:
+                self.registered.setdefault(event_data["host"], {})[
+                    self._task_register
+                ] = result
+        elif kind == "playbook_on_stats":
+            # The playbook ended, no task is left running
+            self._task = None
 
 
 class ProvisionCommand(Command):
-    """The provision command."""
+    """
+    The provision command.
+
+    Several environments are provisioned at once, up to the width. Each run
+    has its own private data and artifact directory, and the concurrent runs
+    share the forks budget. Their events are reported in a single stream,
+    tagged with the name of the run, by the renderer of the ProvisionEvents.
+
+    The playbook is run from the project directory, an ansible-runner input
+    directory copied for each run. The progress of each run is checkpointed:
+    when resuming, the environments already provisioned are skipped and the
+    others start at the task they stopped at, with their cached facts and the
+    variables set by the tasks already run.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        width: int = DEFAULT_PROVISION_WIDTH,
+        forks: int = DEFAULT_PROVISION_FORKS,
+        project_dir: Optional[str] = None,
+        playbook: str = DEFAULT_PROVISION_PLAYBOOK,
+        work_dir: Optional[str] = None,
+        events_file: Optional[str] = None,
+        resume: bool = False,
+    ) -> None:
         """Set up the Command."""
         super().__init__()
+        self.width = max(1, width)
+        self.forks = max(1, forks)
+        self.project_dir = os.path.abspath(project_dir or DEFAULT_PROVISION_PROJECT_DIR)
+        self.playbook = playbook
+        self.work_dir = work_dir
+        self.resume = resume
+        self.statuses: Dict[str, str] = {}
+        self.checkpoints: Dict[str, ProvisionCheckpoint] = {}
         self.progress_bar = progressbar.ProgressBar(
             max_value=progressbar.UnknownLength, redirect_stdout=True
         )
+        self.events = ProvisionEvents(self.progress_bar, events_file)
+        self._lock = threading.Lock()
 
     def run(self, target: str, config_file: str) -> None:
         """Run the povision."""
-        print(f"provisioning {target} with {str(config_file)}")
-        t, _ = ansible_runner.run_async(
-            private_data_dir=os.path.join(os.getcwd(), "example"),
-            playbook="test.yaml",
-            quiet=True,
-            event_handler=self.status_updater,
+        self.run_all(target, [config_file])
+
+    def run_all(self, target: str, config_files: List[str]) -> Dict[str, str]:
+        """Provision the environments of the config files, returning their status."""
+        print(f"provisioning {target} with {', '.join(map(str, config_files))}")
+        if self.work_dir:
+            return self._run_all(target, config_files, self.work_dir)
+        # The runs only need their directories while provisioning
+        with tempfile.TemporaryDirectory(prefix="cdpctl-provision-") as work_dir:
+            return self._run_all(target, config_files, work_dir)
+
+    def _run_all(
+        self, target: str, config_files: List[str], work_dir: str
+    ) -> Dict[str, str]:
+        """Provision the environments of the config files in the work directory."""
+        names = get_run_names(config_files)
+        width = min(self.width, len(config_files))
+        # The runs at once share the forks, each getting at least one
+        forks = max(1, self.forks // width)
+        with self.events, ThreadPoolExecutor(max_workers=width) as executor:
+            list(
+                executor.map(
+                    lambda run: self._provision(
+                        target, run[0], run[1], work_dir, forks
+                    ),
+                    zip(names, config_files),
+                )
+            )
+        return self.statuses
+
+    def _provision(
+        self, target: str, name: str, config_file: str, work_dir: str, forks: int
+    ) -> str:
+        """Provision the environment of a config file in its own directory."""
+        private_data_dir = os.path.join(work_dir, name)
+        checkpoint = ProvisionCheckpoint.for_run(
+            target, name, config_file, resume=self.resume, playbook=self.playbook
         )
-        t.join()
+        with self._lock:
+            self.checkpoints[name] = checkpoint
+        if self.resume and checkpoint.status == "successful":
+            print(f"[{name}] already provisioned")
+            status = "successful"
+        else:
+            status = "error"
+            checkpoint.source_dir = private_data_dir
+            try:
+                resume_task = checkpoint.start()
+                shutil.copytree(self.project_dir, private_data_dir, dirs_exist_ok=True)
+                if resume_task:
+                    checkpoint.write_host_vars(
+                        os.path.dirname(
+                            os.path.join(private_data_dir, "project", self.playbook)
+                        )
+                    )
+                status = ansible_runner.run(
+                    private_data_dir=private_data_dir,
+                    artifact_dir=os.path.join(private_data_dir, "artifacts"),
+                    ident=name,
+                    playbook=self.playbook,
+                    forks=forks,
+                    extravars={
+                        "cdpctl_target": target,
+                        "cdpctl_config_file": os.path.abspath(config_file),
+                    },
+                    envvars=checkpoint.get_envvars(),
+                    cmdline=(
+                        f"--start-at-task {shlex.quote(resume_task)}"
+                        if resume_task
+                        else None
+                    ),
+                    quiet=True,
+                    event_handler=partial(self.status_updater, name),
+                ).status
+            except Exception as e:  # pylint: disable=broad-except
+                # A run unable to start does not stop the others
+                print(f"[{name}] {e}")
+            finally:
+                checkpoint.status = status
+                checkpoint.save()
+        with self._lock:
+            self.statuses[name] = status
+        self.events.put_status(name, status)
+        return status
 
-    def status_updater(self, event: Dict[str, Any]) -> None:
-        """Update the status of the provision."""
-        if "event_data" in event and "name" in event["event_data"]:
-            print(f"Task: {event['event_data']['name']}")
-            self.progress_bar.update(event["counter"])
-            progressbar.streams.flush()
+    def status_updater(self, name: str, event: Dict[str, Any]) -> None:
+        """Update the status of the provision, without waiting on the output."""
+        self.checkpoints[name].update(event)
+        self.events.put(name, event)
+
+
+def run_provision(
+    target: str,
+    config_files: List[str],
+    width: int = DEFAULT_PROVISION_WIDTH,
+    forks: int = DEFAULT_PROVISION_FORKS,
+    events_file: Optional[str] = None,
+    resume: bool = False,
+    project_dir: Optional[str] = None,
+    playbook: str = DEFAULT_PROVISION_PLAYBOOK,
+) -> None:
+    """Provision the environments of the config files, failing if any run failed."""
+    statuses = ProvisionCommand(
+        width=width,
+        forks=forks,
+        project_dir=project_dir,
+        playbook=playbook,
+        events_file=events_file,
+        resume=resume,
+    ).run_all(target, config_files)
+    failed = sorted(name for name, status in statuses.items() if status != "successful")
+    if failed:
+        click.secho(f"Error: provisioning failed for {', '.join(failed)}", fg="red")
+        sys.exit(1)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  serve.py
+###
+"""Serve Command Implementation."""
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import shutil
+import socketserver
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+import click
+import yaml
+
+from cdpctl import SUPPORTED_PLATFORMS, SUPPORTED_TARGETS
+from cdpctl.__version__ import __version__
+from cdpctl.command.validate import get_cloud_config_error, run_checks
+from cdpctl.validation import conftest, get_issues
+from cdpctl.validation.cache import get_client_pool
+from cdpctl.validation.plan import ValidationPlan
+from cdpctl.validation.policies import get_policy_document_cache
+from cdpctl.validation.ratelimit import get_rate_limiter
+from cdpctl.validation.renderer import get_renderer
+
+DEFAULT_SERVE_HOST = "127.0.0.1"
+DEFAULT_SERVE_PORT = 8765
+MAX_REQUEST_SIZE = 1024 * 1024
+CONTENT_TYPES = {"json": "application/json", "text": "text/plain; charset=utf-8"}
+
+Response = Tuple[int, str, str]
+
+
+def _error(status: int, message: str) -> Response:
+    return status, CONTENT_TYPES["json"], json.dumps({"error": message})
+
+
+class ValidationService:
+    """
+    Validation runs sharing the warm state of the serving process.
+
+    The cloud clients are pooled, and the validation plan collected for a
+    platform and target is reused by the next runs. Runs share process-wide
+    state, so requests are run one at a time, and the state recorded by a
+    run is dropped before the next one.
+    """
+
+    def __init__(self, debug: bool = False, work_dir: Optional[str] = None) -> None:
+        """Initialize the ValidationService."""
+        self.debug = debug
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="cdpctl-serve-")
+        self.plans: Dict[Tuple[str, str], ValidationPlan] = {}
+        self._lock = threading.Lock()
+
+    def _write_config(self, config: Dict[str, Any]) -> str:
+        """Write a config to a file named after its content."""
+        data = yaml.safe_dump(config, sort_keys=True)
+        name = hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+        config_file = os.path.join(self.work_dir, f"config-{name}.yml")
+        with open(config_file, "w", encoding="utf-8") as f:
+            f.write(data)
+        return config_file
+
+    def _render(self, output_format: str) -> str:
+        """Render the issues of the run."""
+        report_file = os.path.join(self.work_dir, f"report.{output_format}")
+        get_renderer(output_format=output_format).render(get_issues(), report_file)
+        with open(report_file, encoding="utf-8") as f:
+            return f.read()
+
+    def validate(self, request: Dict[str, Any]) -> Response:
+        """Run a validation request, returning the status, type and body."""
+        target = request.get("target", "infra")
+        output_format = request.get("output_format", "json")
+        config = request.get("config")
+        if isinstance(config, str):
+            try:
+                config = yaml.safe_load(config)
+            except yaml.YAMLError as e:
+                return _error(400, f"Unable to load the config: {e}")
+        if target not in SUPPORTED_TARGETS:
+            return _error(400, f"Unsupported target: {target}")
+        if output_format not in CONTENT_TYPES:
+            return _error(400, f"Unsupported output format: {output_format}")
+        if not isinstance(config, dict):
+            return _error(400, "No config was provided")
+        infra_type = config.get("infra_type")
+        if infra_type not in SUPPORTED_PLATFORMS:
+            return _error(400, f"Unsupported infra_type: {infra_type}")
+        deadline = request.get("deadline")
+        if deadline is not None and (
+            isinstance(deadline, bool)
+            or not isinstance(deadline, (int, float))
+            or not 0 < deadline < float("inf")
+        ):
+            return _error(400, f"The deadline must be a positive number: {deadline}")
+
+        with self._lock:
+            error = get_cloud_config_error(config=config, infra_type=infra_type)
+            if error is not None:
+                return _error(422, error)
+            get_issues().clear()
+            get_rate_limiter().clear_throttle_events()
+            get_policy_document_cache().clear()
+            config_file = self._write_config(config)
+            try:
+                run_checks(
+                    target=target,
+                    config_file=config_file,
+                    config=config,
+                    debug=self.debug,
+                    revalidate=bool(request.get("revalidate", False)),
+                    deadline=deadline,
+                    fail_fast=bool(request.get("fail_fast", False)),
+                    plan=self.plans.get((infra_type, target)),
+                )
+            finally:
+                os.remove(config_file)
+            if conftest.plan is not None:  # type: ignore[attr-defined]
+                self.plans[(infra_type, target)] = conftest.plan  # type: ignore
+            return 200, CONTENT_TYPES[output_format], self._render(output_format)
+
+    def close(self) -> None:
+        """Remove the files of the service."""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+class ValidationRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler of the validation requests.
+
+    POST /validate takes a JSON body with the config (a mapping or a YAML
+    string), and optionally the target, output_format, revalidate,
+    deadline and fail_fast. GET /health reports the server is up. When the
+    server has a token, the validation requests must send it as a bearer
+    token in their Authorization header.
+    """
+
+    server_version = f"cdpctl/{__version__}"
+
+    def _respond(self, response: Response) -> None:
+        status, content_type, body = response
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _is_authorized(self) -> bool:
+        token = self.server.token  # type: ignore[attr-defined]
+        if token is None:
+            return True
+        expected = f"Bearer {token}".encode("utf-8")
+        received = (self.headers.get("Authorization") or "").encode("utf-8")
+        return hmac.compare_digest(received, expected)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Report the health of the server."""
+        if self.path != "/health":
+            self._respond(_error(404, f"Unknown path: {self.path}"))
+            return
+        self._respond(
+            (
+                200,
+                CONTENT_TYPES["json"],
+                json.dumps({"status": "ok", "version": __version__}),
+            )
+        )
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Run a validation request."""
+        if self.path != "/validate":
+            self._respond(_error(404, f"Unknown path: {self.path}"))
+            return
+        if not self._is_authorized():
+            self._respond(_error(401, "A valid bearer token is required"))
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_SIZE:
+            self._respond(_error(413, "The request is too large"))
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._respond(_error(400, f"Invalid JSON request: {e}"))
+            return
+        if not isinstance(request, dict):
+            self._respond(_error(400, "The request must be a JSON object"))
+            return
+        self._respond(self.server.service.validate(request))  # type: ignore
+
+    def address_string(self) -> str:
+        """Get the address of the client, Unix socket clients have none."""
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        """Log the requests to stderr."""
+        # pylint: disable=redefined-builtin
+        click.echo(f"{self.address_string()} - {format % args}", err=True)
+
+
+class ValidationHTTPServer(HTTPServer):
+    """
+    HTTP server of the validation requests on a TCP port.
+
+    Any local user can connect to a port, so the requests must send the
+    token of the server.
+    """
+
+    def __init__(
+        self, address: Tuple[str, int], service: ValidationService, token: str
+    ) -> None:
+        """Initialize the ValidationHTTPServer."""
+        if not token:
+            raise ValueError("A token is required to serve on a TCP port")
+        super().__init__(address, ValidationRequestHandler)
+        self.service = service
+        self.token: Optional[str] = token
+
+
+class ValidationUnixServer(socketserver.UnixStreamServer):
+    """
+    HTTP server of the validation requests on a Unix socket.
+
+    The socket is only accessible to the user running the server, the token
+    is optional.
+    """
+
+    def __init__(
+        self, socket_path: str, service: ValidationService, token: Optional[str] = None
+    ) -> None:
+        """Initialize the ValidationUnixServer."""
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        # Created without group and other permissions, instead of restricted
+        # once already bound
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, ValidationRequestHandler)
+        finally:
+            os.umask(umask)
+        self.service = service
+        self.token = token
+
+
+def run_server(
+    host: str = DEFAULT_SERVE_HOST,
+    port: int = DEFAULT_SERVE_PORT,
+    socket_path: Optional[str] = None,
+    debug: bool = False,
+    token: Optional[str] = None,
+) -> None:
+    """
+    Serve the validation requests until interrupted.
+
+    A token is generated when serving on a TCP port without one.
+    """
+    # Loaded once up front, instead of by the first request of each platform
+    # pylint: disable=unused-import
+    import cdpctl.validation.aws_utils  # noqa: F401
+    import cdpctl.validation.azure_utils  # noqa: F401
+
+    get_client_pool().enabled = True
+    service = ValidationService(debug=debug)
+    server: socketserver.BaseServer
+    if socket_path:
+        server = ValidationUnixServer(socket_path, service, token)
+        address = click.format_filename(socket_path)
+    else:
+        generated = not token
+        token = token or secrets.token_urlsafe(32)
+        server = ValidationHTTPServer((host, port), service, token)
+        address = f"http://{host}:{server.server_address[1]}"
+        if generated:
+            click.echo(f"The requests must send the token {token}", err=True)
+    click.secho(
+        f"Serving validations on {address}, press Ctrl+C to stop.",
+        fg="blue",
+        err=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("", err=True)
+    finally:
+        server.server_close()
+        service.close()
+        get_client_pool().enabled = False
+        get_client_pool().clear()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
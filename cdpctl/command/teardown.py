@@ -40,3 +40,828 @@
 # Source File Name:  teardown.py
 ###
 """Teardown Command Implementation."""
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import click
+
+from cdpctl import SUPPORTED_PLATFORMS
+from cdpctl.utils import load_config
+from cdpctl.validation import ValidationError
+from cdpctl.validation.prefetch import (
+    AWS_INSTANCE_PROFILE_NAME_KEYS,
+    AWS_ROLE_NAME_KEYS,
+    AWS_SECURITY_GROUP_ID_KEYS,
+    AWS_SUBNET_IDS_KEYS,
+    AZURE_IDENTITY_NAME_KEYS,
+    get_config_values,
+)
+from cdpctl.validation.ratelimit import get_backoff_time
+
+TEARDOWN_MAX_WORKERS = 8
+TEARDOWN_MAX_ATTEMPTS = 15
+# The NatGatewayDeleted waiter, for the botocore versions without it
+NAT_GATEWAY_DELETED_WAITER = {
+    "version": 2,
+    "waiters": {
+        "NatGatewayDeleted": {
+            "operation": "DescribeNatGateways",
+            "delay": 15,
+            "maxAttempts": 40,
+            "acceptors": [
+                {
+                    "matcher": "path",
+                    "argument": "length(NatGateways[?State != 'deleted']) == `0`",
+                    "expected": True,
+                    "state": "success",
+                },
+                {
+                    "matcher": "error",
+                    "expected": "NatGatewayNotFound",
+                    "state": "success",
+                },
+            ],
+        }
+    },
+}
+AWS_VPC_ID_KEY = "infra:aws:vpc:existing:vpc_id"
+AZURE_VNET_NAME_KEY = "infra:vpc:name"
+AZURE_SECURITY_GROUP_NAME_KEYS = [
+    "infra:security_group:default:name",
+    "infra:security_group:knox:name",
+]
+AZURE_IDENTITY_API_VERSION = "2018-11-30"
+# Errors of resources already deleted
+AWS_NOT_FOUND_ERROR_CODES = {
+    "NoSuchEntity",
+    "NoSuchBucket",
+    "InvalidSubnetID.NotFound",
+    "InvalidGroup.NotFound",
+    "InvalidVpcID.NotFound",
+    "InvalidRouteTableID.NotFound",
+    "InvalidInternetGatewayID.NotFound",
+    "NatGatewayNotFound",
+    "InvalidNatGatewayID.NotFound",
+    "InvalidAllocationID.NotFound",
+}
+# Errors of resources still used by resources being deleted, which clear once
+# the deletions are visible
+AWS_RETRY_ERROR_CODES = {
+    "DependencyViolation",
+    "DeleteConflict",
+    "InvalidGroup.InUse",
+    "BucketNotEmpty",
+    "ConcurrentModification",
+}
+AZURE_RETRY_STATUS_CODES = {409}
+
+DELETED = "deleted"
+NOT_FOUND = "not found"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+ResourceKey = Tuple[str, str]
+
+
+class TeardownResource:
+    """A cloud resource to delete, after the resources depending on it."""
+
+    def __init__(
+        self,
+        kind: str,
+        resource_id: str,
+        config_key: str,
+        delete: Callable[[], Any],
+        after: Iterable[ResourceKey] = (),
+    ) -> None:
+        """Initialize the TeardownResource."""
+        self.kind = kind
+        self.resource_id = resource_id
+        self.config_key = config_key
+        self.delete = delete
+        self.after: Set[ResourceKey] = set(after)
+
+    @property
+    def key(self) -> ResourceKey:
+        """Get the key of the resource in the plan."""
+        return (self.kind, self.resource_id)
+
+    def __str__(self) -> str:
+        """Get the kind and id of the resource."""
+        return f"{self.kind} {self.resource_id}"
+
+
+class TeardownResult(NamedTuple):
+    """The outcome of the deletion of a resource."""
+
+    resource: TeardownResource
+    status: str
+    message: str = ""
+
+    @property
+    def deleted(self) -> bool:
+        """Check if the resource no longer exists."""
+        return self.status in (DELETED, NOT_FOUND)
+
+
+class TeardownPlan:
+    """
+    Deletion plan of the resources referenced by a config.
+
+    A resource is deleted once all the resources it is to be deleted after
+    are deleted, so the deletions not depending on each other run at once.
+    A deletion failing with an error of the resource still being in use is
+    retried with backoff, as deletions take time to be visible. The resources
+    waiting on a failed deletion are skipped.
+    """
+
+    def __init__(
+        self,
+        resources: Iterable[TeardownResource],
+        is_not_found: Callable[[Exception], bool],
+        is_retryable: Callable[[Exception], bool],
+    ) -> None:
+        """Initialize the TeardownPlan, ignoring the repeated resources."""
+        self.resources: Dict[ResourceKey, TeardownResource] = {}
+        for resource in resources:
+            if resource.key in self.resources:
+                self.resources[resource.key].after |= resource.after
+            else:
+                self.resources[resource.key] = resource
+        self.is_not_found = is_not_found
+        self.is_retryable = is_retryable
+        self.blockers: Dict[ResourceKey, Set[ResourceKey]] = {
+            key: {after for after in resource.after if after in self.resources}
+            for key, resource in self.resources.items()
+        }
+        self.dependents: Dict[ResourceKey, Set[ResourceKey]] = {
+            key: set() for key in self.resources
+        }
+        for key, blockers in self.blockers.items():
+            for blocker in blockers:
+                self.dependents[blocker].add(key)
+
+    def get_waves(self) -> List[List[TeardownResource]]:
+        """Get the resources deleted at once, in the order of the deletions."""
+        remaining = {key: set(blockers) for key, blockers in self.blockers.items()}
+        waves: List[List[TeardownResource]] = []
+        while remaining:
+            ready = sorted(key for key, blockers in remaining.items() if not blockers)
+            if not ready:
+                raise ValueError(
+                    "Circular dependency between "
+                    + ", ".join(str(self.resources[key]) for key in sorted(remaining))
+                )
+            for key in ready:
+                del remaining[key]
+            for blockers in remaining.values():
+                blockers.difference_update(ready)
+            waves.append([self.resources[key] for key in ready])
+        return waves
+
+    def _get_waiting(self, key: ResourceKey) -> Set[ResourceKey]:
+        waiting: Set[ResourceKey] = set()
+        pending = list(self.dependents[key])
+        while pending:
+            dependent = pending.pop()
+            if dependent not in waiting:
+                waiting.add(dependent)
+                pending.extend(self.dependents[dependent])
+        return waiting
+
+    def delete(
+        self,
+        resource: TeardownResource,
+        max_attempts: int = TEARDOWN_MAX_ATTEMPTS,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> TeardownResult:
+        """Delete a resource, retrying while it is in use."""
+        attempt = 0
+        while True:
+            try:
+                resource.delete()
+                return TeardownResult(resource, DELETED)
+            except Exception as e:  # pylint: disable=broad-except
+                if self.is_not_found(e):
+                    return TeardownResult(resource, NOT_FOUND)
+                attempt += 1
+                if not self.is_retryable(e) or attempt >= max_attempts:
+                    return TeardownResult(resource, FAILED, str(e))
+                sleep(get_backoff_time(attempt))
+
+    def execute(
+        self,
+        max_workers: int = TEARDOWN_MAX_WORKERS,
+        on_result: Optional[Callable[[TeardownResult], None]] = None,
+        **delete_kwargs: Any,
+    ) -> Dict[ResourceKey, TeardownResult]:
+        """Delete the resources, as soon as the ones before them are deleted."""
+        self.get_waves()
+        remaining = {key: set(blockers) for key, blockers in self.blockers.items()}
+        results: Dict[ResourceKey, TeardownResult] = {}
+
+        def report(result: TeardownResult) -> None:
+            results[result.resource.key] = result
+            if on_result is not None:
+                on_result(result)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures: Dict[Any, ResourceKey] = {}
+            while remaining or futures:
+                for key in sorted(remaining):
+                    if not remaining[key]:
+                        del remaining[key]
+                        future = executor.submit(
+                            self.delete, self.resources[key], **delete_kwargs
+                        )
+                        futures[future] = key
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = futures.pop(future)
+                    result = future.result()
+                    report(result)
+                    if result.deleted:
+                        for dependent in self.dependents[key]:
+                            if dependent in remaining:
+                                remaining[dependent].discard(key)
+                        continue
+                    for waiting in sorted(self._get_waiting(key)):
+                        if waiting in remaining:
+                            del remaining[waiting]
+                            report(
+                                TeardownResult(
+                                    self.resources[waiting],
+                                    SKIPPED,
+                                    f"waiting on {result.resource}",
+                                )
+                            )
+        return results
+
+
+def _is_aws_error(e: Exception, codes: Set[str]) -> bool:
+    response = getattr(e, "response", None) or {}
+    return response.get("Error", {}).get("Code") in codes
+
+
+def _delete_aws_role(iam_client: Any, role_name: str) -> None:
+    """Delete a role, with its policies and from its instance profiles."""
+    for page in iam_client.get_paginator("list_attached_role_policies").paginate(
+        RoleName=role_name
+    ):
+        for policy in page["AttachedPolicies"]:
+            iam_client.detach_role_policy(
+                RoleName=role_name, PolicyArn=policy["PolicyArn"]
+            )
+    for page in iam_client.get_paginator("list_role_policies").paginate(
+        RoleName=role_name
+    ):
+        for policy_name in page["PolicyNames"]:
+            iam_client.delete_role_policy(RoleName=role_name, PolicyName=policy_name)
+    for page in iam_client.get_paginator("list_instance_profiles_for_role").paginate(
+        RoleName=role_name
+    ):
+        for profile in page["InstanceProfiles"]:
+            iam_client.remove_role_from_instance_profile(
+                InstanceProfileName=profile["InstanceProfileName"], RoleName=role_name
+            )
+    iam_client.delete_role(RoleName=role_name)
+
+
+def _delete_aws_instance_profile(iam_client: Any, name: str) -> None:
+    """Delete an instance profile, removing its roles first."""
+    profile = iam_client.get_instance_profile(InstanceProfileName=name)
+    for role in profile["InstanceProfile"]["Roles"]:
+        iam_client.remove_role_from_instance_profile(
+            InstanceProfileName=name, RoleName=role["RoleName"]
+        )
+    iam_client.delete_instance_profile(InstanceProfileName=name)
+
+
+def _delete_aws_objects(s3_client: Any, bucket_name: str, prefix: str = "") -> None:
+    """Delete all the versions of the objects of a bucket under a prefix."""
+    for page in s3_client.get_paginator("list_object_versions").paginate(
+        Bucket=bucket_name, Prefix=prefix
+    ):
+        objects = [
+            {"Key": version["Key"], "VersionId": version["VersionId"]}
+            for version in page.get("Versions", []) + page.get("DeleteMarkers", [])
+        ]
+        if objects:
+            s3_client.delete_objects(
+                Bucket=bucket_name, Delete={"Objects": objects, "Quiet": True}
+            )
+
+
+def _delete_aws_bucket(s3_client: Any, bucket_name: str) -> None:
+    """Delete a bucket, with all the versions of its objects."""
+    _delete_aws_objects(s3_client, bucket_name)
+    s3_client.delete_bucket(Bucket=bucket_name)
+
+
+def get_s3_prefix(s3a_url: str) -> str:
+    """Get the prefix of the objects of a S3A location, empty for a bucket."""
+    path = s3a_url.split("://", 1)[-1].partition("/")[2].strip("/")
+    return f"{path}/" if path else ""
+
+
+def _get_nat_gateway_deleted_waiter(ec2_client: Any) -> Any:
+    if "nat_gateway_deleted" in ec2_client.waiter_names:
+        return ec2_client.get_waiter("nat_gateway_deleted")
+    from botocore.waiter import WaiterModel, create_waiter_with_client
+
+    return create_waiter_with_client(
+        "NatGatewayDeleted", WaiterModel(NAT_GATEWAY_DELETED_WAITER), ec2_client
+    )
+
+
+def _delete_aws_nat_gateway(ec2_client: Any, gateway_id: str) -> None:
+    """Delete a NAT gateway, wait for it to be deleted and release its addresses."""
+    gateways = ec2_client.describe_nat_gateways(NatGatewayIds=[gateway_id])
+    allocation_ids = [
+        address["AllocationId"]
+        for gateway in gateways["NatGateways"]
+        for address in gateway.get("NatGatewayAddresses", [])
+        if address.get("AllocationId")
+    ]
+    ec2_client.delete_nat_gateway(NatGatewayId=gateway_id)
+    _get_nat_gateway_deleted_waiter(ec2_client).wait(NatGatewayIds=[gateway_id])
+    for allocation_id in allocation_ids:
+        try:
+            ec2_client.release_address(AllocationId=allocation_id)
+        except Exception as e:  # pylint: disable=broad-except
+            if not _is_aws_error(e, AWS_NOT_FOUND_ERROR_CODES):
+                raise
+
+
+def _delete_aws_route_table(ec2_client: Any, route_table_id: str) -> None:
+    """Delete a route table, removing its subnet associations first."""
+    tables = ec2_client.describe_route_tables(RouteTableIds=[route_table_id])
+    for association in tables["RouteTables"][0].get("Associations", []):
+        ec2_client.disassociate_route_table(
+            AssociationId=association["RouteTableAssociationId"]
+        )
+    ec2_client.delete_route_table(RouteTableId=route_table_id)
+
+
+def _delete_aws_internet_gateway(ec2_client: Any, gateway_id: str, vpc_id: str) -> None:
+    """Detach an internet gateway from the VPC and delete it."""
+    ec2_client.detach_internet_gateway(InternetGatewayId=gateway_id, VpcId=vpc_id)
+    ec2_client.delete_internet_gateway(InternetGatewayId=gateway_id)
+
+
+def get_aws_resources(
+    config: Dict[str, Any], delete_vpc: bool = False, delete_buckets: bool = False
+) -> List[TeardownResource]:
+    """
+    Get the AWS resources referenced by the config.
+
+    The subnets and security groups of the config are deleted, and the objects
+    under its S3 locations. Instance profiles are deleted before the roles
+    they hold. Only describe, get and list calls are made.
+
+    With delete_vpc, the VPC of the config is deleted too, last, after
+    everything in it: its NAT gateways and their Elastic IPs, then all its
+    subnets and internet gateways, its route tables and security groups. With
+    delete_buckets, the buckets of the S3 locations are deleted with all
+    their objects.
+    """
+    from cdpctl.validation import aws_utils
+
+    ec2_client = aws_utils.get_client("ec2", config)
+    iam_client = aws_utils.get_client("iam", config)
+    s3_client = aws_utils.get_client("s3", config)
+
+    resources: List[TeardownResource] = []
+    vpcs = (
+        [("vpc", vpc_id) for vpc_id in get_config_values(config, AWS_VPC_ID_KEY)]
+        if delete_vpc
+        else []
+    )
+    nat_gateways: List[ResourceKey] = []
+    for _, vpc_id in vpcs:
+        for gateway_id in aws_utils.iter_nat_gateway_ids(ec2_client, vpc_id):
+            nat_gateways.append(("nat_gateway", gateway_id))
+            resources.append(
+                TeardownResource(
+                    "nat_gateway",
+                    gateway_id,
+                    AWS_VPC_ID_KEY,
+                    partial(_delete_aws_nat_gateway, ec2_client, gateway_id),
+                )
+            )
+    for key in AWS_SUBNET_IDS_KEYS:
+        for subnet_id in get_config_values(config, key):
+            resources.append(
+                TeardownResource(
+                    "subnet",
+                    subnet_id,
+                    key,
+                    partial(ec2_client.delete_subnet, SubnetId=subnet_id),
+                    after=nat_gateways,
+                )
+            )
+    for key in AWS_SECURITY_GROUP_ID_KEYS:
+        for group_id in get_config_values(config, key):
+            resources.append(
+                TeardownResource(
+                    "security_group",
+                    group_id,
+                    key,
+                    partial(ec2_client.delete_security_group, GroupId=group_id),
+                )
+            )
+    for _, vpc_id in vpcs:
+        for gateway_id in aws_utils.iter_internet_gateway_ids(ec2_client, vpc_id):
+            resources.append(
+                TeardownResource(
+                    "internet_gateway",
+                    gateway_id,
+                    AWS_VPC_ID_KEY,
+                    partial(
+                        _delete_aws_internet_gateway, ec2_client, gateway_id, vpc_id
+                    ),
+                    after=nat_gateways,
+                )
+            )
+        for subnet_id in aws_utils.iter_vpc_subnet_ids(ec2_client, vpc_id):
+            resources.append(
+                TeardownResource(
+                    "subnet",
+                    subnet_id,
+                    AWS_VPC_ID_KEY,
+                    partial(ec2_client.delete_subnet, SubnetId=subnet_id),
+                    after=nat_gateways,
+                )
+            )
+        for route_table_id in aws_utils.iter_vpc_route_table_ids(ec2_client, vpc_id):
+            resources.append(
+                TeardownResource(
+                    "route_table",
+                    route_table_id,
+                    AWS_VPC_ID_KEY,
+                    partial(_delete_aws_route_table, ec2_client, route_table_id),
+                )
+            )
+        for group_id in aws_utils.iter_vpc_security_group_ids(ec2_client, vpc_id):
+            resources.append(
+                TeardownResource(
+                    "security_group",
+                    group_id,
+                    AWS_VPC_ID_KEY,
+                    partial(ec2_client.delete_security_group, GroupId=group_id),
+                )
+            )
+    vpc_contents = [resource.key for resource in resources]
+    for _, vpc_id in vpcs:
+        resources.append(
+            TeardownResource(
+                "vpc",
+                vpc_id,
+                AWS_VPC_ID_KEY,
+                partial(ec2_client.delete_vpc, VpcId=vpc_id),
+                after=vpc_contents,
+            )
+        )
+
+    for key in AWS_INSTANCE_PROFILE_NAME_KEYS:
+        for name in get_config_values(config, key):
+            profile_key = ("instance_profile", name)
+            resources.append(
+                TeardownResource(
+                    "instance_profile",
+                    name,
+                    key,
+                    partial(_delete_aws_instance_profile, iam_client, name),
+                )
+            )
+            try:
+                profile = aws_utils.fetch_instance_profile(iam_client, name)
+            except Exception as e:  # pylint: disable=broad-except
+                if not _is_aws_error(e, AWS_NOT_FOUND_ERROR_CODES):
+                    raise
+                continue
+            for role in profile["InstanceProfile"]["Roles"]:
+                resources.append(
+                    TeardownResource(
+                        "role",
+                        role["RoleName"],
+                        key,
+                        partial(_delete_aws_role, iam_client, role["RoleName"]),
+                        after=[profile_key],
+                    )
+                )
+    for key in AWS_ROLE_NAME_KEYS:
+        for role_name in get_config_values(config, key):
+            resources.append(
+                TeardownResource(
+                    "role",
+                    role_name,
+                    key,
+                    partial(_delete_aws_role, iam_client, role_name),
+                )
+            )
+
+    resolver = aws_utils.get_s3_location_resolver(config, s3_client)
+    locations: Dict[str, List[ResourceKey]] = {}
+    for key, location in sorted(resolver.locations.items()):
+        locations.setdefault(location.bucket_name, []).append(
+            ("s3_location", location.url)
+        )
+        resources.append(
+            TeardownResource(
+                "s3_location",
+                location.url,
+                key,
+                partial(
+                    _delete_aws_objects,
+                    s3_client,
+                    location.bucket_name,
+                    get_s3_prefix(location.url),
+                ),
+            )
+        )
+    if delete_buckets:
+        for bucket_name, keys in sorted(resolver.buckets.items()):
+            resources.append(
+                TeardownResource(
+                    "bucket",
+                    bucket_name,
+                    keys[0],
+                    partial(_delete_aws_bucket, s3_client, bucket_name),
+                    after=locations[bucket_name],
+                )
+            )
+    return resources
+
+
+def get_aws_plan(
+    config: Dict[str, Any], delete_vpc: bool = False, delete_buckets: bool = False
+) -> TeardownPlan:
+    """Get the deletion plan of the AWS resources referenced by the config."""
+    return TeardownPlan(
+        get_aws_resources(config, delete_vpc=delete_vpc, delete_buckets=delete_buckets),
+        is_not_found=partial(_is_aws_error, codes=AWS_NOT_FOUND_ERROR_CODES),
+        is_retryable=partial(_is_aws_error, codes=AWS_RETRY_ERROR_CODES),
+    )
+
+
+def _is_azure_not_found(e: Exception) -> bool:
+    from azure.core.exceptions import ResourceNotFoundError
+
+    return isinstance(e, ResourceNotFoundError)
+
+
+def _is_azure_retryable(e: Exception) -> bool:
+    from azure.core.exceptions import HttpResponseError
+
+    return (
+        isinstance(e, HttpResponseError) and e.status_code in AZURE_RETRY_STATUS_CODES
+    )
+
+
+def get_adls_directory(abfs_path: str) -> str:
+    """Get the directory of an ADLS path in its file system, empty for its root."""
+    return abfs_path.split("://", 1)[-1].partition("/")[2].strip("/")
+
+
+def _delete_azure_directory(
+    service_client: Any, container: str, directory: str = ""
+) -> None:
+    file_system_client = service_client.get_file_system_client(container)
+    if directory:
+        file_system_client.delete_directory(directory)
+        return
+    for path in file_system_client.get_paths(recursive=False):
+        if path.is_directory:
+            file_system_client.delete_directory(path.name)
+        else:
+            file_system_client.delete_file(path.name)
+
+
+def get_azure_resources(
+    config: Dict[str, Any], delete_vpc: bool = False, delete_buckets: bool = False
+) -> List[TeardownResource]:
+    """
+    Get the Azure resources referenced by the config.
+
+    The identities of the config are deleted, after their role assignments,
+    and the directories of its ADLS paths, the file systems being kept. The
+    plan is made with get and list calls only, the resources are deleted
+    when it is run.
+
+    With delete_vpc, the VNet and the NSGs of the config are deleted too, the
+    NSGs after the VNet whose subnets they are associated with. With
+    delete_buckets, the file systems of the ADLS paths are deleted with all
+    their directories.
+    """
+    from azure.core.exceptions import ResourceNotFoundError
+
+    from cdpctl.validation import azure_utils
+
+    resources: List[TeardownResource] = []
+    subscription_id = get_config_values(config, "infra:azure:subscription_id")
+    resource_group = get_config_values(config, "infra:azure:metagroup:name")
+    if subscription_id and resource_group:
+        resource_client = azure_utils.get_client("resource", config)
+        auth_client = azure_utils.get_client("auth", config)
+        for key in AZURE_IDENTITY_NAME_KEYS:
+            for identity_name in get_config_values(config, key):
+                identity_id = azure_utils.get_identity_id(
+                    subscription_id[0], resource_group[0], identity_name
+                )
+                assignments: List[ResourceKey] = []
+                try:
+                    identity = azure_utils.fetch_identity(resource_client, identity_id)
+                except ResourceNotFoundError:
+                    identity = None
+                if identity is not None:
+                    principal_id = identity.properties["principalId"]
+                    for assignment in auth_client.role_assignments.list(
+                        filter=f"principalId eq '{principal_id}'"
+                    ):
+                        assignments.append(("role_assignment", assignment.id))
+                        resources.append(
+                            TeardownResource(
+                                "role_assignment",
+                                assignment.id,
+                                key,
+                                partial(
+                                    auth_client.role_assignments.delete_by_id,
+                                    assignment.id,
+                                ),
+                            )
+                        )
+                resources.append(
+                    TeardownResource(
+                        "identity",
+                        identity_id,
+                        key,
+                        lambda identity_id=identity_id: (
+                            resource_client.resources.begin_delete_by_id(
+                                identity_id, AZURE_IDENTITY_API_VERSION
+                            ).result()
+                        ),
+                        after=assignments,
+                    )
+                )
+
+    if subscription_id and resource_group and delete_vpc:
+        network_client = azure_utils.get_client("network", config)
+        vnets: List[ResourceKey] = []
+        for vnet_name in get_config_values(config, AZURE_VNET_NAME_KEY):
+            vnets.append(("vnet", vnet_name))
+            resources.append(
+                TeardownResource(
+                    "vnet",
+                    vnet_name,
+                    AZURE_VNET_NAME_KEY,
+                    lambda vnet_name=vnet_name: (
+                        network_client.virtual_networks.begin_delete(
+                            resource_group[0], vnet_name
+                        ).result()
+                    ),
+                )
+            )
+        for key in AZURE_SECURITY_GROUP_NAME_KEYS:
+            for nsg_name in get_config_values(config, key):
+                resources.append(
+                    TeardownResource(
+                        "security_group",
+                        nsg_name,
+                        key,
+                        lambda nsg_name=nsg_name: (
+                            network_client.network_security_groups.begin_delete(
+                                resource_group[0], nsg_name
+                            ).result()
+                        ),
+                        after=vnets,
+                    )
+                )
+
+    resolver = azure_utils.get_adls_resolver(
+        config, partial(azure_utils.get_client, "datalake", config)
+    )
+    containers: Dict[Tuple[str, str], List[ResourceKey]] = {}
+    container_keys: Dict[Tuple[str, str], str] = {}
+    for key, (account_url, container) in sorted(resolver.locations.items()):
+        path = get_config_values(config, key)[0]
+        containers.setdefault((account_url, container), []).append(
+            ("adls_location", path)
+        )
+        container_keys.setdefault((account_url, container), key)
+        resources.append(
+            TeardownResource(
+                "adls_location",
+                path,
+                key,
+                partial(
+                    _delete_azure_directory,
+                    resolver.get_service_client(account_url),
+                    container,
+                    get_adls_directory(path),
+                ),
+            )
+        )
+    if delete_buckets:
+        for (account_url, container), locations in sorted(containers.items()):
+            service_client = resolver.get_service_client(account_url)
+            resources.append(
+                TeardownResource(
+                    "container",
+                    f"{account_url}/{container}",
+                    container_keys[(account_url, container)],
+                    partial(service_client.delete_file_system, container),
+                    after=locations,
+                )
+            )
+    return resources
+
+
+def get_azure_plan(
+    config: Dict[str, Any], delete_vpc: bool = False, delete_buckets: bool = False
+) -> TeardownPlan:
+    """Get the deletion plan of the Azure resources referenced by the config."""
+    return TeardownPlan(
+        get_azure_resources(
+            config, delete_vpc=delete_vpc, delete_buckets=delete_buckets
+        ),
+        is_not_found=_is_azure_not_found,
+        is_retryable=_is_azure_retryable,
+    )
+
+
+def print_plan(plan: TeardownPlan) -> None:
+    """Print the resources deleted at once, in the order of the deletions."""
+    click.secho("Teardown plan:", fg="blue")
+    for index, wave in enumerate(plan.get_waves(), start=1):
+        for position, resource in enumerate(wave):
+            prefix = f"{index:>3}. " if position == 0 else "     "
+            click.echo(f"{prefix}{resource} ({resource.config_key})")
+
+
+def print_result(result: TeardownResult) -> None:
+    """Print the outcome of the deletion of a resource."""
+    color = "green" if result.deleted else "red"
+    message = f" ({result.message})" if result.message else ""
+    click.secho(f"{result.status}: {result.resource}{message}", fg=color)
+
+
+def run_teardown(
+    target: str,  # pylint: disable=unused-argument
+    config_file: str,
+    plan_only: bool = False,
+    assume_yes: bool = False,
+    max_workers: int = TEARDOWN_MAX_WORKERS,
+    delete_vpc: bool = False,
+    delete_buckets: bool = False,
+) -> None:
+    """Run the teardown command."""
+    try:
+        config = load_config(config_file=config_file)
+    except FileExistsError:
+        click.secho(
+            f"Error: the config file {click.format_filename(config_file)} "
+            "does not exist.",
+            fg="red",
+        )
+        sys.exit(1)
+
+    infra_type = config.get("infra_type")
+    if infra_type not in SUPPORTED_PLATFORMS:
+        click.secho(
+            "The following platforms are supported: "
+            f"{click.style(', '.join(SUPPORTED_PLATFORMS), fg='blue')}",
+            fg="red",
+        )
+        sys.exit(1)
+
+    try:
+        plan = (
+            get_aws_plan(config, delete_vpc=delete_vpc, delete_buckets=delete_buckets)
+            if infra_type == "aws"
+            else get_azure_plan(
+                config, delete_vpc=delete_vpc, delete_buckets=delete_buckets
+            )
+        )
+        plan.get_waves()
+    except (ValidationError, ValueError) as e:
+        click.secho(f"Error: {e}", fg="red")
+        sys.exit(1)
+    if not plan.resources:
+        click.echo("Nothing to tear down.")
+        return
+    print_plan(plan)
+    if plan_only:
+        return
+    if not assume_yes and not click.confirm(
+        f"Delete these {len(plan.resources)} resources?"
+    ):
+        sys.exit(1)
+
+    results = plan.execute(max_workers=max_workers, on_result=print_result)
+    if not all(result.deleted for result in results.values()):
+        click.secho("Error: the teardown did not complete.", fg="red")
+        sys.exit(1)
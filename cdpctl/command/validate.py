@@ -43,18 +43,39 @@
 
 import os
 import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import click
 import pytest
+import yaml
 from _pytest.outcomes import Failed
 
 import cdpctl.validation as validation
 from cdpctl import SUPPORTED_PLATFORMS
 from cdpctl.utils import load_config
-from cdpctl.validation import UnrecoverableValidationError, conftest, get_issues
-from cdpctl.validation.aws_utils import validate_aws_config
-from cdpctl.validation.azure_utils import validate_azure_config
+from cdpctl.validation import (
+    UnrecoverableValidationError,
+    config_reads,
+    conftest,
+    get_issues,
+)
+from cdpctl.validation.cache import get_resource_cache, resource_reads
+from cdpctl.validation.deadline import get_circuit_breaker, run_budget
+from cdpctl.validation.fingerprint import ResultCache
+from cdpctl.validation.memprofile import DEFAULT_MEMPROFILE_FILE, MemoryProfile
+from cdpctl.validation.plan import ValidationPlan, get_changed_keys
+from cdpctl.validation.prefetch import prefetch_resources
+from cdpctl.validation.ratelimit import get_rate_limiter
 from cdpctl.validation.renderer import get_renderer
+from cdpctl.validation.results import (
+    get_default_shard_file,
+    get_shard_results,
+    save_results,
+)
+from cdpctl.validation.timings import TimingHistory, get_default_timings_file
+
+WATCH_POLL_INTERVAL = 1.0
 
 
 def run_validation(
@@ -63,6 +84,15 @@ def run_validation(
     debug: bool = False,
     output_format: str = "text",
     output_file: str = "-",
+    watch: bool = False,
+    revalidate: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    shard_file: Optional[str] = None,
+    deadline: Optional[float] = None,
+    fail_fast: bool = False,
+    timings_file: Optional[str] = None,
+    memprofile: bool = False,
+    memprofile_file: Optional[str] = None,
 ) -> None:
     """Run the validate command."""
     click.echo(
@@ -95,29 +125,181 @@ def run_validation(
         )
         sys.exit(1)
 
+    if not check_cloud_config(config=config, infra_type=infra_type):
+        sys.exit(1)
+
+    profile = MemoryProfile() if memprofile else None
+    if profile is not None:
+        profile.start()
+
+    click.secho("Validating:", fg="blue")
+    run_checks(
+        target=target,
+        config_file=config_file,
+        config=config,
+        debug=debug,
+        revalidate=revalidate,
+        shard=shard,
+        deadline=deadline,
+        fail_fast=fail_fast,
+        timings_file=timings_file,
+        memprofile=profile,
+    )
+
+    if debug:
+        throttle_counts = get_rate_limiter().get_throttle_counts()
+        for (cloud, scope, service), count in throttle_counts.items():
+            click.secho(
+                f"Throttled {count} time(s) by {cloud} {service} ({scope}).",
+                fg="yellow",
+                err=True,
+            )
+        for cloud, scope, service in get_circuit_breaker().get_opened():
+            click.secho(
+                f"Stopped calling {cloud} {service} ({scope}) after repeated "
+                "failures.",
+                fg="yellow",
+                err=True,
+            )
+
+    if profile is not None:
+        with profile.section("render", name=f"Rendering as {output_format}"):
+            render_issues(output_format=output_format, output_file=output_file)
+        save_memprofile(profile, memprofile_file or DEFAULT_MEMPROFILE_FILE)
+        profile.stop()
+        conftest.memprofile = None  # type: ignore[attr-defined]
+    else:
+        render_issues(output_format=output_format, output_file=output_file)
+
+    if shard is not None and conftest.plan is not None:  # type: ignore[attr-defined]
+        shard_file = shard_file or get_default_shard_file(shard)
+        save_results(
+            get_shard_results(
+                plan=conftest.plan,  # type: ignore[attr-defined]
+                shard=shard,
+                infra_type=infra_type,
+                target=target,
+                issues=get_issues(),
+                costs=conftest.shard_costs,  # type: ignore[attr-defined]
+            ),
+            shard_file,
+        )
+        click.echo(
+            message=f"Shard {shard[0]}/{shard[1]} results written to file "
+            f"{click.format_filename(shard_file)}.",
+            err=True,
+        )
+
+    if watch:
+        watch_validation(
+            target=target,
+            config_file=config_file,
+            config=config,
+            debug=debug,
+            output_format=output_format,
+            output_file=output_file,
+            revalidate=revalidate,
+            deadline=deadline,
+        )
+
+
+def run_checks(
+    target: str,
+    config_file: str,
+    config: Dict[str, Any],
+    debug: bool = False,
+    revalidate: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    deadline: Optional[float] = None,
+    plan: Optional[ValidationPlan] = None,
+    fail_fast: bool = False,
+    timings_file: Optional[str] = None,
+    memprofile: Optional[MemoryProfile] = None,
+) -> None:
+    """
+    Run the validations of a loaded config, adding their issues to the run.
+
+    A plan collected by a previous run of the same platform and target can be
+    given to skip building it again. The validations are ordered by the
+    seconds they took in the previous runs, recorded in the timings file,
+    which also splits the shards when given. The memory of each validation is
+    recorded in the memory profile, if any.
+    """
+    infra_type = config["infra_type"]
+    run_budget.start(deadline)
+    get_circuit_breaker().clear()
+    get_resource_cache().clear()
+    prefetch_resources(config=config, infra_type=infra_type)
+
+    conftest.config_file = config_file  # type: ignore[attr-defined]
+    conftest.plan = plan  # type: ignore[attr-defined]
+    conftest.shard = shard  # type: ignore[attr-defined]
+    conftest.fail_fast = fail_fast  # type: ignore[attr-defined]
+    conftest.memprofile = memprofile  # type: ignore[attr-defined]
+    conftest.weigh_shards = timings_file is not None  # type: ignore[attr-defined]
+    conftest.timings = TimingHistory(  # type: ignore[attr-defined]
+        timings_file or get_default_timings_file()
+    )
+    conftest.result_cache = ResultCache(  # type: ignore[attr-defined]
+        config_file=config_file, config=config, revalidate=revalidate
+    )
+    config_reads.clear()
+    resource_reads.clear()
+    pytest.main(get_pytest_options(infra_type=infra_type, target=target, debug=debug))
+
+
+def get_cloud_config_error(config: Dict[str, Any], infra_type: str) -> Optional[str]:
+    """Get the error of the cloud configs needed to run the validations."""
     try:
+        # The SDK of a cloud is only imported by the runs validating it
         if infra_type == "aws":
+            from cdpctl.validation.aws_utils import validate_aws_config
+
             validate_aws_config(config=config)
         elif infra_type == "azure":
+            from cdpctl.validation.azure_utils import validate_azure_config
+
             validate_azure_config(config=config)
-    except UnrecoverableValidationError as e:
-        click.secho(e, fg="red")
-        sys.exit(1)
-    except Failed as e:
-        click.secho(e, fg="red")
-        sys.exit(1)
+    except (UnrecoverableValidationError, Failed) as e:
+        return str(e)
+    return None
 
-    click.secho("Validating:", fg="blue")
 
+def check_cloud_config(config: Dict[str, Any], infra_type: str) -> bool:
+    """Check the cloud configs needed to run the validations."""
+    error = get_cloud_config_error(config=config, infra_type=infra_type)
+    if error is not None:
+        click.secho(error, fg="red")
+        return False
+    return True
+
+
+def get_pytest_options(
+    infra_type: str, target: str, debug: bool, nodeids: Optional[List[str]] = None
+) -> List[str]:
+    """Get the pytest options to run all, or only the selected, validations."""
     validation_root_path = os.path.dirname(validation.__file__)
     validation_ini_path = os.path.join(validation_root_path, "validation.ini")
 
-    options = [
-        f"{validation_root_path}",
+    options = (
+        [os.path.join(validation_root_path, nodeid) for nodeid in nodeids]
+        if nodeids
+        else [f"{validation_root_path}"]
+    )
+    # Skip collecting the validations of the other platforms with their SDKs
+    for platform in SUPPORTED_PLATFORMS:
+        if platform != infra_type:
+            options += [
+                "--ignore-glob",
+                os.path.join(validation_root_path, "*", f"validate_{platform}_*.py"),
+            ]
+    options += [
         "-m",
         f"{infra_type} and {target}",
         "-c",
         f"{validation_ini_path}",
+        "--rootdir",
+        f"{validation_root_path}",
         "--order-dependencies",
     ]
     if not debug:
@@ -125,9 +307,11 @@ def run_validation(
         options.append("--no-summary")
         options.append("-qq")
         options.append("-s")
+    return options
 
-    pytest.main(options)
 
+def render_issues(output_format: str, output_file: str) -> None:
+    """Render the issues found by the validations."""
     renderer = get_renderer(output_format=output_format)
     renderer.render(get_issues(), output_file)
     if output_file != "-":
@@ -135,3 +319,136 @@ def run_validation(
             message=f"Results written to file {click.format_filename(output_file)}.",
             err=True,
         )
+
+
+def save_memprofile(memprofile: MemoryProfile, memprofile_file: str) -> None:
+    """Save the memory profile, and summarize the sections using the most."""
+    memprofile.save(memprofile_file)
+    for line in memprofile.get_summary():
+        click.echo(line, err=True)
+    click.echo(
+        message="Memory profile written to file "
+        f"{click.format_filename(memprofile_file)}.",
+        err=True,
+    )
+
+
+def watch_validation(
+    target: str,
+    config_file: str,
+    config: Dict[str, Any],
+    debug: bool,
+    output_format: str,
+    output_file: str,
+    revalidate: bool = False,
+    deadline: Optional[float] = None,
+    poll_interval: float = WATCH_POLL_INTERVAL,
+) -> None:
+    """Run again the validations affected by every change of the config file."""
+    click.secho(
+        f"Watching {click.format_filename(config_file)} for changes, "
+        "press Ctrl+C to stop.",
+        fg="blue",
+        err=True,
+    )
+    last_modified = os.stat(config_file).st_mtime
+    try:
+        while True:
+            time.sleep(poll_interval)
+            try:
+                modified = os.stat(config_file).st_mtime
+            except OSError:
+                continue
+            if modified == last_modified:
+                continue
+            last_modified = modified
+            config = rerun_changed_validations(
+                target=target,
+                config_file=config_file,
+                config=config,
+                debug=debug,
+                output_format=output_format,
+                output_file=output_file,
+                revalidate=revalidate,
+                deadline=deadline,
+            )
+    except KeyboardInterrupt:
+        click.echo("", err=True)
+
+
+def rerun_changed_validations(
+    target: str,
+    config_file: str,
+    config: Dict[str, Any],
+    debug: bool,
+    output_format: str,
+    output_file: str,
+    revalidate: bool = False,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Run again the validations that read a changed config key.
+
+    The validations depending on them and their prerequisites run as well,
+    the issues of the other validations are kept. Return the new config.
+    """
+    try:
+        new_config = load_config(config_file=config_file)
+    except (FileExistsError, yaml.YAMLError) as e:
+        click.secho(f"Unable to load the config file: {e}", fg="red", err=True)
+        return config
+
+    changed_keys = get_changed_keys(config, new_config)
+    if not changed_keys:
+        return new_config
+
+    infra_type = new_config.get("infra_type")
+    if infra_type not in SUPPORTED_PLATFORMS:
+        click.secho(
+            f"No supported platform defined for infra_type: {infra_type}",
+            fg="red",
+            err=True,
+        )
+        return new_config
+
+    plan = conftest.plan  # type: ignore[attr-defined]
+    if plan is None or "infra_type" in changed_keys:
+        nodeids = None
+        conftest.plan = None  # type: ignore[attr-defined]
+        config_reads.clear()
+        resource_reads.clear()
+        get_issues().clear()
+    else:
+        nodeids = plan.select_changed(changed_keys, config_reads.keys)
+        if not nodeids:
+            click.secho(
+                "No validation reads the changed config keys.", fg="blue", err=True
+            )
+            return new_config
+        for nodeid in nodeids:
+            get_issues().pop(plan.names[nodeid], None)
+
+    run_budget.start(deadline)
+    get_circuit_breaker().clear()
+    if not check_cloud_config(config=new_config, infra_type=infra_type):
+        return new_config
+
+    get_resource_cache().clear()
+    conftest.result_cache = ResultCache(  # type: ignore[attr-defined]
+        config_file=config_file, config=new_config, revalidate=revalidate
+    )
+    if output_file == "-":
+        click.clear()
+    click.secho(
+        f"Validating {len(nodeids)} affected validation(s):"
+        if nodeids
+        else "Validating:",
+        fg="blue",
+    )
+    pytest.main(
+        get_pytest_options(
+            infra_type=infra_type, target=target, debug=debug, nodeids=nodeids
+        )
+    )
+    render_issues(output_format=output_format, output_file=output_file)
+    return new_config
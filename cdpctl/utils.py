@@ -41,11 +41,21 @@
 ###
 """General Utils."""
 import contextlib
+import functools
 import os
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import yaml
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    PackageLoader,
+    Template,
+    select_autoescape,
+)
+
+CACHE_DIR_NAME = "cdpctl"
 
 
 def load_config(config_file) -> Dict[str, Any]:
@@ -73,3 +83,47 @@ def smart_open(filename=None):
     finally:
         if fh is not sys.stdout:
             fh.close()
+
+
+def get_cache_dir(*paths: str) -> Optional[str]:
+    """
+    Get a directory under the cdpctl cache, creating it if needed.
+
+    Honors XDG_CACHE_HOME and falls back to ~/.cache. Returns None if the
+    directory cannot be created, so callers can run without a cache.
+    """
+    base_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    cache_dir = os.path.join(base_dir, CACHE_DIR_NAME, *paths)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return None
+    return cache_dir
+
+
+@functools.lru_cache(maxsize=None)
+def get_template_environment(
+    package_name: str, package_path: str = "templates"
+) -> Environment:
+    """
+    Get the shared Jinja environment for the templates of a package.
+
+    The environment is created once per process so compiled templates are
+    reused, and compiled bytecode is cached on disk between runs.
+    """
+    bytecode_cache_dir = get_cache_dir("jinja")
+    return Environment(
+        loader=PackageLoader(package_name=package_name, package_path=package_path),
+        autoescape=select_autoescape(),
+        bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir)
+        if bytecode_cache_dir
+        else None,
+    )
+
+
+def render_template(template: Template, output_file: str, **context: Any) -> None:
+    """Stream a rendered template to a file or stdout if - passed."""
+    with smart_open(output_file) as f:
+        f.writelines(template.generate(**context))
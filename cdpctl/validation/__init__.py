@@ -42,7 +42,7 @@
 """Shared validation functions."""
 import os
 from enum import Enum
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set
 
 import pytest
 import yaml
@@ -69,6 +69,12 @@ class UnrecoverableValidationError(ValidationError):
     pass
 
 
+class NotEvaluatedError(ValidationError):
+    """The validation could not be evaluated in time."""
+
+    pass
+
+
 class IssueTemplate:
     """Issue Templates."""
 
@@ -141,6 +147,23 @@ class Issue:
         """Get the render type."""
         return self._template.render_type
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the issue."""
+        return {
+            "template": self._template.id,
+            "subjects": self._subjects,
+            "resources": self._resources,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Issue":
+        """Deserialize an issue."""
+        return cls(
+            template=_issue_templates[data["template"]],
+            subjects=data.get("subjects"),
+            resources=data.get("resources"),
+        )
+
 
 class IssueType(Enum):
     """Issue Types enum."""
@@ -207,6 +230,37 @@ class Context:
 current_context: Context = Context()
 
 
+class ConfigReads:
+    """Config keys read by each validation."""
+
+    def __init__(self) -> None:
+        """Initialize the ConfigReads."""
+        self.nodeid: Optional[str] = None
+        self.keys: Dict[str, Set[str]] = {}
+
+    def start(self, nodeid: str) -> None:
+        """Start recording the config keys read by a validation."""
+        self.nodeid = nodeid
+        self.keys[nodeid] = set()
+
+    def stop(self) -> None:
+        """Stop recording the config keys read."""
+        self.nodeid = None
+
+    def record(self, key: str) -> None:
+        """Record a config key read by the current validation."""
+        if self.nodeid is not None:
+            self.keys[self.nodeid].add(key)
+
+    def clear(self) -> None:
+        """Clear all the recorded config keys."""
+        self.nodeid = None
+        self.keys.clear()
+
+
+config_reads: ConfigReads = ConfigReads()
+
+
 def validator(func):
     """Wrap a validator function to handle errors better."""
 
@@ -214,7 +268,7 @@ def validator(func):
         try:
             return func(*args, **kwargs)
         except Exception as e:
-            if isinstance(e, UnrecoverableValidationError):
+            if isinstance(e, (UnrecoverableValidationError, NotEvaluatedError)):
                 raise e
             raise UnrecoverableValidationError("Unhandled exception:", e) from e
 
@@ -238,6 +292,13 @@ def _add_issue(issue_type: IssueType, issue: Issue):
     context.last_message = issue.message
 
 
+def restore_issues(issues: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Add serialized issues to the current validation."""
+    for issue_type in IssueType:
+        for issue in issues.get(issue_type.value, []):
+            _add_issue(issue_type, Issue.from_dict(issue))
+
+
 def fail(
     template: str, subjects: List[str] = None, resources: List[str] = None
 ) -> None:
@@ -284,6 +345,7 @@ def get_config_value(
     parent_key_missing_issue: str = CONFIG_OPTION_PARENT_PATH_NOT_DEFINED,
 ) -> Any:
     """Get the value of a config key or have the proper error handling."""
+    config_reads.record(key.replace(path_delimiter, ":"))
     paths = key.split(path_delimiter)
     path_found = ""
     key_found = False
@@ -306,3 +368,15 @@ def get_config_value(
         fail(template=data_expected_issue, subjects=key)
 
     return data
+
+
+def has_config_value(
+    config: Dict[str, Any], key: str, path_delimiter: str = ":"
+) -> bool:
+    """Check if a config key is defined, without failing the validation."""
+    data: Any = config
+    for path in key.split(path_delimiter):
+        if not isinstance(data, dict) or path not in data:
+            return False
+        data = data[path]
+    return True
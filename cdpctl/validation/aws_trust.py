@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  aws_trust.py
+###
+"""Trust Policies of the AWS Roles."""
+import json
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable, List, Set, Tuple, Union
+from urllib.parse import unquote
+
+ASSUME_ROLE = "sts:AssumeRole"
+AWS = "AWS"
+SERVICE = "Service"
+FEDERATED = "Federated"
+EXTERNAL_ID = "sts:ExternalId"
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def get_principal_account(principal: str) -> str:
+    """Get the account of an AWS principal, given as an account id or an ARN."""
+    if principal.startswith("arn:"):
+        return principal.split(":", 5)[4]
+    return principal
+
+
+def parse_policy_document(document: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Parse a policy document, given decoded, as JSON or URL-encoded JSON."""
+    if isinstance(document, dict):
+        return document
+    document = document.strip()
+    if not document.startswith("{"):
+        document = unquote(document)
+    return json.loads(document)
+
+
+class TrustPolicy:
+    """
+    Statements of a role trust policy, indexed by principal, action and condition.
+
+    The principals (AWS accounts and ARNs, services, federated providers) and
+    the actions index the statements allowing or denying them, so checking
+    a principal is trusted is a lookup rather than a scan of the statements.
+    Statements with a NotPrincipal or a NotAction are not indexed.
+    """
+
+    def __init__(self, document: Union[str, Dict[str, Any]]) -> None:
+        """Initialize the TrustPolicy."""
+        self.statements: List[Dict[str, Any]] = _as_list(
+            parse_policy_document(document).get("Statement")
+        )
+        self._principals: Dict[Tuple[str, str], Set[int]] = {}
+        self._actions: Dict[str, Set[int]] = {}
+        self._action_patterns: List[Tuple[str, int]] = []
+        self._conditions: Dict[str, Dict[int, Set[str]]] = {}
+        self.allowed: Set[int] = set()
+        for index, statement in enumerate(self.statements):
+            if "NotPrincipal" in statement or "NotAction" in statement:
+                continue
+            if statement.get("Effect") == "Allow":
+                self.allowed.add(index)
+            elif statement.get("Effect") != "Deny":
+                continue
+            self._index_principals(index, statement.get("Principal"))
+            for action in _as_list(statement.get("Action")):
+                action = action.lower()
+                if "*" in action or "?" in action:
+                    self._action_patterns.append((action, index))
+                else:
+                    self._actions.setdefault(action, set()).add(index)
+            for operators in (statement.get("Condition") or {}).values():
+                for key, values in operators.items():
+                    self._conditions.setdefault(key.lower(), {}).setdefault(
+                        index, set()
+                    ).update(str(v) for v in _as_list(values))
+
+    def _index_principals(self, index: int, principal: Any) -> None:
+        if principal == "*":
+            self._principals.setdefault((AWS, "*"), set()).add(index)
+            return
+        for kind, values in (principal or {}).items():
+            for value in _as_list(values):
+                self._principals.setdefault((kind, value), set()).add(index)
+                if kind == AWS and value != "*":
+                    account = get_principal_account(value)
+                    self._principals.setdefault(("account", account), set()).add(index)
+
+    def _get_action_statements(self, action: str) -> Set[int]:
+        action = action.lower()
+        statements = set(self._actions.get(action, ()))
+        statements.update(
+            index
+            for pattern, index in self._action_patterns
+            if fnmatchcase(action, pattern)
+        )
+        return statements
+
+    def get_statements(
+        self, kind: str, principal: str, action: str = ASSUME_ROLE
+    ) -> Set[int]:
+        """Get the statements allowing a principal the action, if none denies it."""
+        statements = self._principals.get((kind, principal), set())
+        if kind in (AWS, "account"):
+            statements = statements | self._principals.get((AWS, "*"), set())
+        statements = statements & self._get_action_statements(action)
+        if statements - self.allowed:
+            return set()
+        return statements
+
+    def trusts_service(self, service: str, action: str = ASSUME_ROLE) -> bool:
+        """Check if a service, as ec2.amazonaws.com, is trusted."""
+        return bool(self.get_statements(SERVICE, service, action))
+
+    def trusts_account(self, account_id: str, action: str = ASSUME_ROLE) -> bool:
+        """Check if the principals of an account are trusted."""
+        return bool(self.get_statements("account", str(account_id), action))
+
+    def get_condition_values(
+        self, key: str, statements: Iterable[int] = None
+    ) -> Dict[int, Set[str]]:
+        """Get the values of a condition key, by statement setting it."""
+        values = self._conditions.get(key.lower(), {})
+        if statements is None:
+            return dict(values)
+        return {index: values[index] for index in statements if index in values}
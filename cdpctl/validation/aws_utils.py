@@ -41,13 +41,36 @@
 ###
 """AWS Specific Utils."""
 import re
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 import boto3
+from boto3_type_annotations.ec2 import Client as EC2Client
 from boto3_type_annotations.iam import Client as IAMClient
+from boto3_type_annotations.s3 import Client as S3Client
 from botocore.exceptions import ClientError, ProfileNotFound
 
-from cdpctl.validation import UnrecoverableValidationError, fail, get_config_value
+from cdpctl.validation import (
+    UnrecoverableValidationError,
+    fail,
+    get_config_value,
+    has_config_value,
+)
+from cdpctl.validation.aws_trust import TrustPolicy
+from cdpctl.validation.cache import get_client_pool, get_resource_cache, resource_reads
+from cdpctl.validation.deadline import register_aws_breaker
 from cdpctl.validation.issues import (
     AWS_INSTANCE_PROFILE_NOT_FOUND,
     AWS_MISSING_ACTIONS,
@@ -57,6 +80,12 @@ from cdpctl.validation.issues import (
     AWS_REGION_NOT_DEFINED,
     AWS_ROLE_MISSING,
 )
+from cdpctl.validation.policies import (
+    get_document_hash,
+    get_policy_document_cache,
+    normalize_policy_document,
+)
+from cdpctl.validation.ratelimit import register_aws_client
 
 
 def get_client(client_type: str, config):
@@ -66,6 +95,8 @@ def get_client(client_type: str, config):
     If a profile is defined, it will create a client using it.
     Otherwise, it will create a client using the specified region.
     If neither are defined, it will throw an exception.
+    The client shares the rate limiter and the circuit breaker of its service
+    and profile, and is pooled when the client pool is enabled.
     """
     profile_name: Optional[str] = get_config_value(
         config,
@@ -83,15 +114,40 @@ def get_client(client_type: str, config):
     )
 
     if region_name:
-        if profile_name:
-            session = boto3.session.Session(profile_name=profile_name)
-            return session.client(client_type, region_name=region_name)
-        return boto3.client(client_type, region_name=region_name)
+        return get_client_pool().get(
+            ("aws", client_type, profile_name, region_name),
+            lambda: _create_client(client_type, profile_name, region_name),
+        )
     raise UnrecoverableValidationError(
         "No AWS region name has been defined for the config option infra:aws:region."
     )
 
 
+def get_client_scope(profile_name: Optional[str], region_name: str) -> str:
+    """
+    Get the scope of the rate limits and circuit breakers of a client.
+
+    The clients of a profile and region share their limits, keyed without
+    any lookup of the account of the credentials.
+    """
+    return f"{profile_name or 'default'}:{region_name}"
+
+
+def _create_client(
+    client_type: str, profile_name: Optional[str], region_name: str
+) -> Any:
+    """Create an AWS client behind the rate limiter and the circuit breaker."""
+    if profile_name:
+        session = boto3.session.Session(profile_name=profile_name)
+        client = session.client(client_type, region_name=region_name)
+    else:
+        client = boto3.client(client_type, region_name=region_name)
+    scope = get_client_scope(profile_name, region_name)
+    register_aws_client(client, scope=scope)
+    register_aws_breaker(client, scope=scope)
+    return client
+
+
 def parse_arn(arn: str) -> Dict[str, str]:
     """Parse an AWS ARN to dict of components."""
     # http://docs.aws.amazon.com/general/latest/gr/aws-arns-and-namespaces.html
@@ -135,6 +191,28 @@ def is_valid_s3a_url(s3a_url: str) -> bool:
     return bool(re.match("^s3a://([^/]+).*", s3a_url))
 
 
+class S3Location(NamedTuple):
+    """A S3A location with the ARNs of the location and of its bucket."""
+
+    url: str
+    bucket_name: str
+    arn: str
+    bucket_arn: str
+
+
+@lru_cache(maxsize=None)
+def get_s3_location(s3a_url: str) -> S3Location:
+    """Parse a S3A url, once per url."""
+    arn = convert_s3a_to_arn(s3a_url)
+    bucket_name = parse_arn(arn)["resource_type"]
+    return S3Location(
+        url=s3a_url,
+        bucket_name=bucket_name,
+        arn=arn,
+        bucket_arn=convert_s3a_to_arn(f"s3a://{bucket_name}"),
+    )
+
+
 def simulate_policy(
     iam_client: IAMClient,
     policy_source_arn: str,
@@ -150,11 +228,24 @@ def simulate_policy(
     in missing_actions_message. The first string-formatted argument is the
     list of actions that were missing from the required list.
     """
-    response = iam_client.simulate_principal_policy(
-        PolicySourceArn=policy_source_arn,
-        ActionNames=needed_actions,
-        ResourceArns=resource_arns,
+    # The result only depends on the policies of the source role or profile
+    source = parse_arn(policy_source_arn)
+    source_kind = {"role": "role", "instance-profile": "instance_profile"}.get(
+        source["resource_type"]
+    )
+    tracking = (
+        resource_reads.tracked(
+            _resource_key(iam_client, source_kind, source["resource"].split("/")[-1])
+        )
+        if source_kind
+        else nullcontext()
     )
+    with tracking:
+        response = iam_client.simulate_principal_policy(
+            PolicySourceArn=policy_source_arn,
+            ActionNames=needed_actions,
+            ResourceArns=resource_arns,
+        )
 
     missing_actions = [
         action["EvalActionName"]
@@ -168,10 +259,449 @@ def simulate_policy(
         )
 
 
+def _resource_key(client: Any, kind: str, resource_id: str) -> Tuple[str, ...]:
+    """Get the resource cache key of an AWS resource."""
+    return ("aws", client.meta.region_name, kind, resource_id)
+
+
+def _fetch_by_ids(
+    client: Any,
+    kind: str,
+    resource_ids: List[str],
+    describe: Callable[[List[str]], List[Dict]],
+    id_key: str,
+) -> List[Dict]:
+    """Fetch resources by id through the resource cache, describing the misses."""
+    cache = get_resource_cache()
+    resources: List[Dict] = []
+    missing_ids: List[str] = []
+    for resource_id in resource_ids:
+        key = _resource_key(client, kind, resource_id)
+        resource_reads.record(key)
+        if key in cache:
+            resources.append(cache.lookup(key))
+        else:
+            missing_ids.append(resource_id)
+    if missing_ids:
+        described = cache.coalesce(
+            ("aws", client.meta.region_name, kind, tuple(missing_ids)),
+            lambda: describe(missing_ids),
+        )
+        for resource in described:
+            if id_key in resource:
+                cache.put(_resource_key(client, kind, resource[id_key]), resource)
+        resources.extend(described)
+    return resources
+
+
+def fetch_role(iam_client: IAMClient, role_name: str) -> Dict:
+    """Fetch the get_role response of a role through the resource cache."""
+    return get_resource_cache().get(
+        _resource_key(iam_client, "role", role_name),
+        lambda: iam_client.get_role(RoleName=role_name),
+    )
+
+
+def fetch_policy_version(iam_client: IAMClient, policy_arn: str) -> str:
+    """Fetch the default version id of a managed policy through the resource cache."""
+    return get_resource_cache().get(
+        _resource_key(iam_client, "policy", policy_arn),
+        lambda: iam_client.get_policy(PolicyArn=policy_arn)["Policy"][
+            "DefaultVersionId"
+        ],
+    )
+
+
+def fetch_policy_hash(iam_client: IAMClient, policy_arn: str) -> str:
+    """
+    Fetch the content hash of the default version of a managed policy.
+
+    The document of a version is fetched once, and kept between runs, for all
+    the roles attaching the policy.
+    """
+    version_id = fetch_policy_version(iam_client, policy_arn)
+    return get_policy_document_cache().get_hash(
+        parse_arn(policy_arn)["account"],
+        policy_arn,
+        version_id,
+        lambda: iam_client.get_policy_version(
+            PolicyArn=policy_arn, VersionId=version_id
+        )["PolicyVersion"]["Document"],
+    )
+
+
+def fetch_role_policies(iam_client: IAMClient, role_name: str) -> Dict:
+    """
+    Fetch the content hashes of the attached and inline policies of a role.
+
+    The policies are listed page by page, and the hashes are kept once per run
+    for the role.
+    """
+
+    def fetch() -> Dict:
+        attached: Dict[str, str] = {}
+        for page in iam_client.get_paginator("list_attached_role_policies").paginate(
+            RoleName=role_name
+        ):
+            for policy in page["AttachedPolicies"]:
+                attached[policy["PolicyArn"]] = fetch_policy_hash(
+                    iam_client, policy["PolicyArn"]
+                )
+        inline: Dict[str, str] = {}
+        for page in iam_client.get_paginator("list_role_policies").paginate(
+            RoleName=role_name
+        ):
+            for policy_name in page["PolicyNames"]:
+                inline[policy_name] = get_document_hash(
+                    normalize_policy_document(
+                        iam_client.get_role_policy(
+                            RoleName=role_name, PolicyName=policy_name
+                        )["PolicyDocument"]
+                    )
+                )
+        return {"attached": attached, "inline": inline}
+
+    return get_resource_cache().get(
+        _resource_key(iam_client, "role_policies", role_name), fetch
+    )
+
+
+def fetch_instance_profile(iam_client: IAMClient, name: str) -> Dict:
+    """Fetch the get_instance_profile response through the resource cache."""
+    return get_resource_cache().get(
+        _resource_key(iam_client, "instance_profile", name),
+        lambda: iam_client.get_instance_profile(InstanceProfileName=name),
+    )
+
+
+def fetch_subnets(ec2_client: EC2Client, subnet_ids: List[str]) -> List[Dict]:
+    """Fetch the subnets found for the ids through the resource cache."""
+    return _fetch_by_ids(
+        ec2_client,
+        "subnet",
+        subnet_ids,
+        lambda ids: ec2_client.describe_subnets(SubnetIds=ids)["Subnets"],
+        "SubnetId",
+    )
+
+
+def fetch_security_groups(ec2_client: EC2Client, group_ids: List[str]) -> List[Dict]:
+    """Fetch the security groups found for the ids through the resource cache."""
+    return _fetch_by_ids(
+        ec2_client,
+        "security_group",
+        group_ids,
+        lambda ids: ec2_client.describe_security_groups(GroupIds=ids)["SecurityGroups"],
+        "GroupId",
+    )
+
+
+def fetch_vpcs(ec2_client: EC2Client, vpc_ids: List[str]) -> List[Dict]:
+    """Fetch the VPCs found for the ids through the resource cache."""
+    return _fetch_by_ids(
+        ec2_client,
+        "vpc",
+        vpc_ids,
+        lambda ids: ec2_client.describe_vpcs(VpcIds=ids)["Vpcs"],
+        "VpcId",
+    )
+
+
+def fetch_key_pairs(ec2_client: EC2Client, key_pair_ids: List[str]) -> List[Dict]:
+    """Fetch the key pairs found for the ids through the resource cache."""
+    return _fetch_by_ids(
+        ec2_client,
+        "key_pair",
+        key_pair_ids,
+        lambda ids: ec2_client.describe_key_pairs(KeyPairIds=ids)["KeyPairs"],
+        "KeyPairId",
+    )
+
+
+EC2_PAGE_SIZE = 100
+
+
+class RouteTableTargets(NamedTuple):
+    """The gateways an EC2 route table routes to."""
+
+    route_table_id: str
+    gateway_ids: FrozenSet[str]
+    nat_gateway_ids: FrozenSet[str]
+
+
+def _paginate(
+    client: Any,
+    operation: str,
+    result_key: str,
+    project: Callable[[Dict], Any],
+    **kwargs: Any,
+) -> Iterator[Any]:
+    """
+    Iterate the items of a describe call page by page, projected by project.
+
+    Only a page of the response is held at a time, so the caller can stop once
+    it has its answer without the remaining pages being requested.
+    """
+    paginator = client.get_paginator(operation)
+    for page in paginator.paginate(
+        PaginationConfig={"PageSize": EC2_PAGE_SIZE}, **kwargs
+    ):
+        for item in page.get(result_key, []):
+            yield project(item)
+
+
+def iter_route_tables(
+    ec2_client: EC2Client, subnet_ids: List[str]
+) -> Iterator[RouteTableTargets]:
+    """Iterate the targets of the route tables with active routes of the subnets."""
+    return _paginate(
+        ec2_client,
+        "describe_route_tables",
+        "RouteTables",
+        lambda table: RouteTableTargets(
+            table["RouteTableId"],
+            frozenset(r["GatewayId"] for r in table["Routes"] if "GatewayId" in r),
+            frozenset(
+                r["NatGatewayId"] for r in table["Routes"] if "NatGatewayId" in r
+            ),
+        ),
+        Filters=[
+            {"Name": "association.subnet-id", "Values": subnet_ids},
+            {"Name": "route.state", "Values": ["active"]},
+        ],
+    )
+
+
+def iter_internet_gateway_ids(ec2_client: EC2Client, vpc_id: str) -> Iterator[str]:
+    """Iterate the ids of the internet gateways attached to the VPC."""
+    return _paginate(
+        ec2_client,
+        "describe_internet_gateways",
+        "InternetGateways",
+        lambda gateway: gateway["InternetGatewayId"],
+        Filters=[
+            {"Name": "attachment.vpc-id", "Values": [vpc_id]},
+            {"Name": "attachment.state", "Values": ["available"]},
+        ],
+    )
+
+
+def iter_nat_gateway_ids(ec2_client: EC2Client, vpc_id: str) -> Iterator[str]:
+    """Iterate the ids of the available NAT gateways of the VPC."""
+    return _paginate(
+        ec2_client,
+        "describe_nat_gateways",
+        "NatGateways",
+        lambda gateway: gateway["NatGatewayId"],
+        Filter=[
+            {"Name": "vpc-id", "Values": [vpc_id]},
+            {"Name": "state", "Values": ["available"]},
+        ],
+    )
+
+
+def iter_vpc_subnet_ids(ec2_client: EC2Client, vpc_id: str) -> Iterator[str]:
+    """Iterate the ids of the subnets of the VPC."""
+    return _paginate(
+        ec2_client,
+        "describe_subnets",
+        "Subnets",
+        lambda subnet: subnet["SubnetId"],
+        Filters=[{"Name": "vpc-id", "Values": [vpc_id]}],
+    )
+
+
+def iter_vpc_route_table_ids(ec2_client: EC2Client, vpc_id: str) -> Iterator[str]:
+    """Iterate the ids of the route tables of the VPC, but its main one."""
+    main_ids = set(
+        _paginate(
+            ec2_client,
+            "describe_route_tables",
+            "RouteTables",
+            lambda table: table["RouteTableId"],
+            Filters=[
+                {"Name": "vpc-id", "Values": [vpc_id]},
+                {"Name": "association.main", "Values": ["true"]},
+            ],
+        )
+    )
+    return (
+        route_table_id
+        for route_table_id in _paginate(
+            ec2_client,
+            "describe_route_tables",
+            "RouteTables",
+            lambda table: table["RouteTableId"],
+            Filters=[{"Name": "vpc-id", "Values": [vpc_id]}],
+        )
+        if route_table_id not in main_ids
+    )
+
+
+def iter_vpc_security_group_ids(ec2_client: EC2Client, vpc_id: str) -> Iterator[str]:
+    """Iterate the ids of the security groups of the VPC, but its default one."""
+    return (
+        group["GroupId"]
+        for group in _paginate(
+            ec2_client,
+            "describe_security_groups",
+            "SecurityGroups",
+            lambda group: group,
+            Filters=[{"Name": "vpc-id", "Values": [vpc_id]}],
+        )
+        if group["GroupName"] != "default"
+    )
+
+
+S3_LOCATION_KEYS = [
+    "infra:aws:vpc:existing:storage:data",
+    "infra:aws:vpc:existing:storage:logs",
+    "infra:aws:vpc:existing:storage:backup",
+    "infra:aws:vpc:existing:storage:ranger_audit",
+]
+S3_RESOLVE_MAX_WORKERS = 8
+# Buckets whose location constraint is not their region name
+S3_LEGACY_LOCATIONS = {None: "us-east-1", "": "us-east-1", "EU": "eu-west-1"}
+S3_FORBIDDEN_ERROR_CODES = {"403", "AccessDenied", "AllAccessDisabled"}
+
+
+class BucketStatus(NamedTuple):
+    """Existence, access and region of a S3 bucket."""
+
+    bucket_name: str
+    region: Optional[str] = None
+    error_code: Optional[str] = None
+
+    @property
+    def exists(self) -> bool:
+        """Check if the bucket exists, even if it is forbidden."""
+        return self.error_code != "NoSuchBucket"
+
+    @property
+    def forbidden(self) -> bool:
+        """Check if the access to the bucket is forbidden."""
+        return self.error_code in S3_FORBIDDEN_ERROR_CODES
+
+
+def fetch_bucket_status(s3_client: S3Client, bucket_name: str) -> BucketStatus:
+    """
+    Fetch the status of a bucket through the resource cache.
+
+    A single get_bucket_location call tells if the bucket exists, if it can be
+    accessed and its region. Other errors are raised, and fetched again by the
+    next caller.
+    """
+
+    def fetch() -> BucketStatus:
+        try:
+            location = s3_client.get_bucket_location(Bucket=bucket_name)[
+                "LocationConstraint"
+            ]
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            if error_code != "NoSuchBucket" and error_code not in (
+                S3_FORBIDDEN_ERROR_CODES
+            ):
+                raise
+            return BucketStatus(bucket_name, error_code=error_code)
+        return BucketStatus(bucket_name, S3_LEGACY_LOCATIONS.get(location, location))
+
+    return get_resource_cache().get(
+        _resource_key(s3_client, "bucket_status", bucket_name), fetch
+    )
+
+
+class S3LocationResolver:
+    """
+    The S3 locations of a config, grouped by bucket.
+
+    The locations are parsed once and the status of their buckets is fetched
+    concurrently, with one call per bucket, on first use. It is shared by every
+    S3 validation of the run.
+    """
+
+    def __init__(self, s3_client: S3Client, locations: Dict[str, str]) -> None:
+        """Initialize the S3LocationResolver."""
+        self.s3_client = s3_client
+        self.locations: Dict[str, S3Location] = {
+            key: get_s3_location(url)
+            for key, url in locations.items()
+            if is_valid_s3a_url(url)
+        }
+        self.buckets: Dict[str, List[str]] = {}
+        for key, location in self.locations.items():
+            self.buckets.setdefault(location.bucket_name, []).append(key)
+        self._resolved = False
+
+    def resolve(self, max_workers: int = S3_RESOLVE_MAX_WORKERS) -> None:
+        """
+        Fetch the status of all the buckets concurrently.
+
+        A failed fetch is left to the validation needing the bucket, which
+        fetches it again and reports the problem.
+        """
+        if self._resolved:
+            return
+        self._resolved = True
+
+        def try_fetch(bucket_name: str) -> None:
+            try:
+                fetch_bucket_status(self.s3_client, bucket_name)
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(self.buckets)))
+        ) as executor:
+            list(executor.map(try_fetch, sorted(self.buckets)))
+
+    def get_bucket_status(self, bucket_name: str) -> BucketStatus:
+        """Get the status of a bucket, resolving all the buckets on first use."""
+        self.resolve()
+        return fetch_bucket_status(self.s3_client, bucket_name)
+
+
+def get_s3_location_resolver(
+    config: Dict[str, Any], s3_client: S3Client
+) -> S3LocationResolver:
+    """Get the resolver of the configured S3 locations."""
+    locations: Dict[str, str] = {}
+    for key in S3_LOCATION_KEYS:
+        if has_config_value(config, key):
+            url = get_config_value(config, key, key_value_expected=False)
+            if isinstance(url, str) and url:
+                locations[key] = url
+    cache = get_resource_cache()
+    # Not a cloud resource: looked up without recording a read
+    cache_key = (
+        "aws",
+        s3_client.meta.region_name,
+        "s3_location_resolver",
+        tuple(sorted(locations.items())),
+    )
+    resolver = cache.lookup(cache_key)
+    if resolver is None:
+        resolver = S3LocationResolver(s3_client, locations)
+        cache.put(cache_key, resolver)
+    return resolver
+
+
+def get_trust_policy(role: Dict) -> TrustPolicy:
+    """Get the trust policy of a fetched role, parsed once per run."""
+    cache = get_resource_cache()
+    # Parsed from a role already read: looked up without recording a read
+    key = ("aws", "global", "trust_policy", role["Arn"], role.get("RoleId", ""))
+    trust_policy = cache.lookup(key)
+    if trust_policy is None:
+        trust_policy = TrustPolicy(role["AssumeRolePolicyDocument"])
+        cache.put(key, trust_policy)
+    return trust_policy
+
+
 def get_instance_profile(iam_client: IAMClient, name: str) -> Dict:
     """Get the instance profile form AWS configs."""
     try:
-        instance_profile = iam_client.get_instance_profile(InstanceProfileName=name)
+        instance_profile = fetch_instance_profile(iam_client, name)
     except iam_client.exceptions.NoSuchEntityException:
         fail(AWS_INSTANCE_PROFILE_NOT_FOUND, name)
     except iam_client.exceptions.ServiceFailureException as e:
@@ -193,7 +723,7 @@ def get_role(
 
     role: Dict
     try:
-        role = iam_client.get_role(RoleName=role_name)
+        role = fetch_role(iam_client, role_name)
     except iam_client.exceptions.NoSuchEntityException:
         fail(template=missing_issue, resources=[role_name])
     except iam_client.exceptions.ServiceFailureException as e:
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  azure_permissions.py
+###
+"""Effective Permissions of the Azure Identities."""
+import re
+import threading
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+)
+
+ACTION = "action"
+DATA_ACTION = "data_action"
+
+
+def _compile_operations(operations: Optional[Iterable[str]]) -> Optional[Pattern[str]]:
+    """Compile the operations of a permission, with their * wildcards."""
+    operations = list(operations or [])
+    if not operations:
+        return None
+    return re.compile(
+        "|".join(
+            "(?:" + re.escape(operation).replace(r"\*", ".*") + ")"
+            for operation in operations
+        ),
+        re.IGNORECASE,
+    )
+
+
+def _matches(pattern: Optional[Pattern[str]], operation: str) -> bool:
+    return pattern is not None and pattern.fullmatch(operation) is not None
+
+
+class OperationRegistry:
+    """
+    Bit positions of the operations checked against the permissions.
+
+    A set of operations is a mask over the registered operations, so finding
+    the required operations not granted is a bitwise operation.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the OperationRegistry."""
+        self._bits: Dict[Tuple[str, str], int] = {}
+        self.operations: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def get_mask(self, kind: str, operations: Iterable[str]) -> int:
+        """Get the mask of operations of a kind, registering the new ones."""
+        mask = 0
+        with self._lock:
+            for operation in operations:
+                key = (kind, operation)
+                if key not in self._bits:
+                    self._bits[key] = 1 << len(self.operations)
+                    self.operations.append(key)
+                mask |= self._bits[key]
+        return mask
+
+    def iterate(self, mask: int) -> Iterator[Tuple[int, str, str]]:
+        """Iterate over the bits of a mask, with their kind and operation."""
+        while mask:
+            bit = mask & -mask
+            kind, operation = self.operations[bit.bit_length() - 1]
+            yield bit, kind, operation
+            mask ^= bit
+
+
+_operation_registry: OperationRegistry = OperationRegistry()
+
+
+def get_operation_registry() -> OperationRegistry:
+    """Get the registry of the operations checked by the validations."""
+    return _operation_registry
+
+
+def get_scope_segments(scope: str) -> List[str]:
+    """Get the path segments of an ARM scope, which are case insensitive."""
+    return [segment.lower() for segment in scope.split("/") if segment]
+
+
+class PermissionMatcher:
+    """Actions and data actions granted by a permission of a role definition."""
+
+    def __init__(self, permission: Any) -> None:
+        """Initialize the PermissionMatcher from a role definition permission."""
+        self.operations = [
+            list(getattr(permission, name, None) or [])
+            for name in ("actions", "not_actions", "data_actions", "not_data_actions")
+        ]
+        (
+            self._actions,
+            self._not_actions,
+            self._data_actions,
+            self._not_data_actions,
+        ) = [_compile_operations(operations) for operations in self.operations]
+
+    def allows_action(self, action: str) -> bool:
+        """Check if the permission grants an action."""
+        return _matches(self._actions, action) and not _matches(
+            self._not_actions, action
+        )
+
+    def allows(self, kind: str, operation: str) -> bool:
+        """Check if the permission grants an action or a data action."""
+        if kind == DATA_ACTION:
+            return self.allows_data_action(operation)
+        return self.allows_action(operation)
+
+    def allows_data_action(self, data_action: str) -> bool:
+        """Check if the permission grants a data action."""
+        return _matches(self._data_actions, data_action) and not _matches(
+            self._not_data_actions, data_action
+        )
+
+
+class _ScopeNode:
+    """Scope of the permission index."""
+
+    __slots__ = ("children", "matchers")
+
+    def __init__(self) -> None:
+        """Initialize the _ScopeNode."""
+        self.children: Dict[str, "_ScopeNode"] = {}
+        self.matchers: List[PermissionMatcher] = []
+
+
+class PermissionIndex:
+    """
+    Effective permissions of a principal, indexed by their ARM scope.
+
+    The role assignments are kept in a prefix trie over the path segments of
+    their scope, each node holding the matchers of the roles assigned at its
+    scope. As role assignments are inherited by the child scopes, the
+    permissions at a scope are the ones found walking its path from the root.
+
+    The operations granted at each scope checked are kept as a bitset row
+    over the operation registry, each operation being evaluated at most once
+    per scope, so checking the required operations is a bitwise operation.
+    """
+
+    def __init__(self, registry: Optional[OperationRegistry] = None) -> None:
+        """Initialize the PermissionIndex."""
+        self.registry = registry or get_operation_registry()
+        self._root = _ScopeNode()
+        self._rows: Dict[Tuple[str, ...], Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self.assignments: List[Tuple[str, str, List[List[List[str]]]]] = []
+
+    @classmethod
+    def from_assignments(
+        cls,
+        role_assignments: Iterable[Any],
+        get_role_definition: Callable[[str], Any],
+    ) -> "PermissionIndex":
+        """Build the index of role assignments, getting their role definitions."""
+        index = cls()
+        for role_assignment in role_assignments:
+            role_definition = get_role_definition(role_assignment.role_definition_id)
+            index.add(
+                role_assignment.scope,
+                role_assignment.role_definition_id,
+                role_definition.permissions or [],
+            )
+        return index
+
+    def add(
+        self, scope: str, role_definition_id: str, permissions: Iterable[Any]
+    ) -> None:
+        """Add the permissions of a role assigned at a scope."""
+        node = self._root
+        for segment in get_scope_segments(scope):
+            node = node.children.setdefault(segment, _ScopeNode())
+        matchers = [PermissionMatcher(permission) for permission in permissions]
+        node.matchers.extend(matchers)
+        with self._lock:
+            self._rows.clear()
+        self.assignments.append(
+            (scope, role_definition_id, [matcher.operations for matcher in matchers])
+        )
+
+    def get_matchers(self, scope: str) -> List[PermissionMatcher]:
+        """Get the matchers of the roles assigned at a scope or its parents."""
+        node = self._root
+        matchers = list(node.matchers)
+        for segment in get_scope_segments(scope):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            matchers.extend(node.matchers)
+        return matchers
+
+    def get_granted(self, scope: str, mask: int) -> int:
+        """Get the operations of a mask granted at a scope."""
+        key = tuple(get_scope_segments(scope))
+        with self._lock:
+            evaluated, granted = self._rows.get(key, (0, 0))
+            pending = mask & ~evaluated
+            if pending:
+                matchers = self.get_matchers(scope)
+                for bit, kind, operation in self.registry.iterate(pending):
+                    if any(matcher.allows(kind, operation) for matcher in matchers):
+                        granted |= bit
+                self._rows[key] = (evaluated | pending, granted)
+        return granted & mask
+
+    def get_missing_actions(
+        self,
+        scope: str,
+        required_actions: Iterable[str],
+        required_data_actions: Iterable[str],
+    ) -> Tuple[List[str], List[str]]:
+        """Get the required actions and data actions not granted at a scope."""
+        required = self.registry.get_mask(
+            ACTION, required_actions
+        ) | self.registry.get_mask(DATA_ACTION, required_data_actions)
+        missing: Dict[str, List[str]] = {ACTION: [], DATA_ACTION: []}
+        for _, kind, operation in self.registry.iterate(
+            required & ~self.get_granted(scope, required)
+        ):
+            missing[kind].append(operation)
+        return sorted(missing[ACTION]), sorted(missing[DATA_ACTION])
+
+    def get_state(self) -> List[Any]:
+        """Get the assignments and their permissions, to detect changes."""
+        return sorted(
+            [scope.lower(), role_id.lower(), ops]
+            for scope, role_id, ops in self.assignments
+        )
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  azure_policies.py
+###
+"""Azure Pipeline Policies of the Rate Limiter and the Circuit Breaker."""
+import sys
+from typing import Any, Dict
+
+from azure.core.exceptions import ServiceRequestError, ServiceResponseError
+from azure.core.pipeline import PipelineRequest, PipelineResponse
+from azure.core.pipeline.policies import RetryPolicy, SansIOHTTPPolicy
+
+from cdpctl.validation.cache import resource_reads
+from cdpctl.validation.deadline import SERVER_ERROR_STATUS_CODE, get_circuit_breaker
+from cdpctl.validation.ratelimit import (
+    AZURE_DEFAULT_RATE,
+    THROTTLE_STATUS_CODES,
+    ThrottleEvent,
+    get_backoff_time,
+    get_rate_limiter,
+    parse_retry_after,
+)
+
+AZURE_FAILURE_EXCEPTIONS = (ServiceRequestError, ServiceResponseError)
+
+
+class AzureRateLimitPolicy(SansIOHTTPPolicy):
+    """Pipeline policy putting every Azure request behind the rate limiter."""
+
+    def __init__(self, scope: str, service: str) -> None:
+        """Initialize the AzureRateLimitPolicy."""
+        super().__init__()
+        self.scope = scope
+        self.service = service
+        self.bucket = get_rate_limiter().get_bucket(
+            "azure", scope, service, AZURE_DEFAULT_RATE
+        )
+
+    def on_request(self, request: PipelineRequest) -> None:
+        """Take a token before sending the request."""
+        resource_reads.record_request()
+        self.bucket.acquire()
+
+    def on_response(self, request: PipelineRequest, response: PipelineResponse) -> None:
+        """Record the throttling responses and adapt the rate."""
+        http_response = response.http_response
+        if http_response.status_code not in THROTTLE_STATUS_CODES:
+            self.bucket.on_success()
+            return
+        retry_after = parse_retry_after(http_response.headers.get("Retry-After"))
+        get_rate_limiter().record_throttle(
+            ThrottleEvent(
+                "azure",
+                self.scope,
+                self.service,
+                request.http_request.url,
+                retry_after,
+            )
+        )
+        self.bucket.on_throttle(retry_after or 0.0)
+
+
+class AzureThrottleRetryPolicy(RetryPolicy):
+    """Retry policy using the jittered backoff of the rate limiter."""
+
+    def get_backoff_time(self, settings: Dict[str, Any]) -> float:
+        """Get the jittered backoff for the current attempt."""
+        if len(settings["history"]) <= 1:
+            return 0
+        return get_backoff_time(len(settings["history"]) - 1)
+
+
+class AzureCircuitBreakerPolicy(SansIOHTTPPolicy):
+    """Pipeline policy putting every Azure request behind the circuit breaker."""
+
+    def __init__(self, scope: str, service: str) -> None:
+        """Initialize the AzureCircuitBreakerPolicy."""
+        super().__init__()
+        self.endpoint = ("azure", scope, service)
+
+    def on_request(self, request: PipelineRequest) -> None:
+        """Fail fast when the endpoint is opened."""
+        get_circuit_breaker().begin(self.endpoint)
+
+    def on_response(self, request: PipelineRequest, response: PipelineResponse) -> None:
+        """Record the server errors as failures."""
+        breaker = get_circuit_breaker()
+        breaker.end(self.endpoint)
+        if response.http_response.status_code >= SERVER_ERROR_STATUS_CODE:
+            breaker.record_failure(self.endpoint)
+        else:
+            breaker.record_success(self.endpoint)
+
+    def on_exception(self, request: PipelineRequest) -> None:
+        """Record the connection errors as failures."""
+        breaker = get_circuit_breaker()
+        breaker.end(self.endpoint)
+        # Called from the handler of the exception raised by the next policies
+        if isinstance(sys.exc_info()[1], AZURE_FAILURE_EXCEPTIONS):
+            breaker.record_failure(self.endpoint)
@@ -42,19 +42,32 @@
 """Azure Specific Utils."""
 import csv
 import os
-import re
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
 
-from azure.core.exceptions import ResourceNotFoundError
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
 from azure.identity import AzureCliCredential
 from azure.mgmt.authorization import AuthorizationManagementClient
 from azure.mgmt.authorization.models import RoleAssignmentListResult
 from azure.mgmt.network import NetworkManagementClient
+from azure.mgmt.network.models import NetworkSecurityGroup, VirtualNetwork
 from azure.mgmt.resource import ResourceManagementClient
 from azure.storage.filedatalake import DataLakeServiceClient
 
-from cdpctl.validation import UnrecoverableValidationError, fail, get_config_value
+from cdpctl.validation import (
+    UnrecoverableValidationError,
+    fail,
+    get_config_value,
+    has_config_value,
+)
+from cdpctl.validation.azure_permissions import PermissionIndex
+from cdpctl.validation.azure_policies import (
+    AzureCircuitBreakerPolicy,
+    AzureRateLimitPolicy,
+    AzureThrottleRetryPolicy,
+)
+from cdpctl.validation.cache import get_client_pool, get_resource_cache, resource_reads
 from cdpctl.validation.infra.issues import AZURE_IDENTITY_NOT_FOUND
 from cdpctl.validation.issues import AZURE_NO_SUBSCRIPTION_HAS_BEEN_DEFINED
 
@@ -64,6 +77,8 @@ def get_client(client_type: str, config, url=None):
     Get an Azure client for the specified type.
 
     If the subscription_id is not defined, it will throw an exception.
+    The client shares the rate limiter and the circuit breaker of its service
+    and subscription, and is pooled when the client pool is enabled.
     """
     subscription_id: Optional[str] = get_config_value(
         config,
@@ -71,25 +86,48 @@ def get_client(client_type: str, config, url=None):
         key_value_expected=True,
         data_expected_issue=AZURE_NO_SUBSCRIPTION_HAS_BEEN_DEFINED,
     )
+    return get_client_pool().get(
+        ("azure", client_type, subscription_id, url),
+        lambda: _create_client(client_type, subscription_id, url),
+    )
+
 
+def _create_client(client_type: str, subscription_id: str, url: Optional[str]):
+    """Create an Azure client behind the rate limiter and the circuit breaker."""
     credential = AzureCliCredential()
+    rate_limit_policy = AzureRateLimitPolicy(
+        scope=str(subscription_id), service=client_type
+    )
+    breaker_policy = AzureCircuitBreakerPolicy(
+        scope=str(subscription_id), service=client_type
+    )
+    arm_policies = {
+        "per_retry_policies": [breaker_policy, rate_limit_policy],
+        "retry_policy": AzureThrottleRetryPolicy(),
+    }
 
     if client_type == "resource":
-        return ResourceManagementClient(credential, subscription_id)
+        return ResourceManagementClient(credential, subscription_id, **arm_policies)
 
     if client_type == "auth":
         return AuthorizationManagementClient(
             credential=credential,
             subscription_id=subscription_id,
             api_version="2018-01-01-preview",
+            **arm_policies,
         )
 
     if client_type == "datalake":
-        return DataLakeServiceClient(url, credential)
+        # Storage clients add extra policies after their own retry policy
+        return DataLakeServiceClient(
+            url,
+            credential,
+            _additional_pipeline_policies=[breaker_policy, rate_limit_policy],
+        )
 
     if client_type == "network":
         return NetworkManagementClient(
-            credential=credential, subscription_id=subscription_id
+            credential=credential, subscription_id=subscription_id, **arm_policies
         )
 
     raise Exception(f"Unable to create Azure client for type {client_type}")
@@ -103,6 +141,224 @@ def validate_azure_config(config):
         raise UnrecoverableValidationError(ex) from ex
 
 
+class AzureNetworkSnapshot:
+    """
+    Snapshot of the VNet and Network Security Groups of a resource group.
+
+    The VNet (with its subnets, service endpoints and delegations) and the
+    NSGs are each fetched once, on first use, and shared by every network
+    validation of the run.
+    """
+
+    def __init__(
+        self,
+        network_client: NetworkManagementClient,
+        resource_group_name: str,
+        vnet_name: str,
+    ) -> None:
+        """Initialize the AzureNetworkSnapshot."""
+        self.network_client = network_client
+        self.resource_group_name = resource_group_name
+        self.vnet_name = vnet_name
+        self._vnet: Optional[VirtualNetwork] = None
+        self._security_groups: Optional[Dict[str, NetworkSecurityGroup]] = None
+
+    def get_vnet(self) -> VirtualNetwork:
+        """Get the VNet, raising ResourceNotFoundError if it does not exist."""
+        if self._vnet is None:
+            with resource_reads.tracked():
+                self._vnet = self.network_client.virtual_networks.get(
+                    virtual_network_name=self.vnet_name,
+                    resource_group_name=self.resource_group_name,
+                )
+        return self._vnet
+
+    def get_security_groups(self) -> Dict[str, NetworkSecurityGroup]:
+        """Get the NSGs of the resource group indexed by lower-cased name."""
+        if self._security_groups is None:
+            with resource_reads.tracked():
+                self._security_groups = {
+                    nsg.name.lower(): nsg
+                    for nsg in self.network_client.network_security_groups.list(
+                        resource_group_name=self.resource_group_name
+                    )
+                }
+        return self._security_groups
+
+    def get_security_group(self, nsg_name: str) -> Optional[NetworkSecurityGroup]:
+        """Get a NSG of the resource group by name."""
+        return self.get_security_groups().get(nsg_name.lower())
+
+
+def get_network_snapshot(
+    config: Dict[str, Any], network_client: NetworkManagementClient
+) -> AzureNetworkSnapshot:
+    """Get the network snapshot for the configured VNet and metagroup."""
+    subscription_id: str = get_config_value(
+        config=config, key="infra:azure:subscription_id"
+    )
+    resource_group_name: str = get_config_value(
+        config=config, key="infra:azure:metagroup:name"
+    )
+    vnet_name: str = get_config_value(config=config, key="infra:vpc:name")
+
+    return get_resource_cache().get(
+        (
+            "azure",
+            str(subscription_id),
+            "network_snapshot",
+            resource_group_name.lower(),
+            vnet_name.lower(),
+        ),
+        lambda: AzureNetworkSnapshot(
+            network_client=network_client,
+            resource_group_name=resource_group_name,
+            vnet_name=vnet_name,
+        ),
+    )
+
+
+def get_identity_id(subscription_id: str, resource_group: str, identity_name: str):
+    """Get Azure managed identity resource id string."""
+    return f"/subscriptions/{subscription_id}/resourcegroups/{resource_group}/providers/Microsoft.ManagedIdentity/userAssignedIdentities/{identity_name}"  # noqa: E501
+
+
+def fetch_identity(resource_client: ResourceManagementClient, identity_id: str) -> Any:
+    """Fetch a managed identity through the resource cache."""
+    return get_resource_cache().get(
+        ("azure", "arm", "identity", identity_id.lower()),
+        lambda: resource_client.resources.get_by_id(
+            resource_id=identity_id, api_version="2018-11-30"
+        ),
+    )
+
+
+def fetch_container_exists(
+    service_client: DataLakeServiceClient, container: str
+) -> bool:
+    """Fetch if an ADLS storage container exists through the resource cache."""
+    return get_resource_cache().get(
+        ("azure", service_client.url, "container", container),
+        lambda: service_client.get_file_system_client(file_system=container).exists(),
+    )
+
+
+ADLS_PATH_KEYS = [
+    "env:azure:storage:path:data",
+    "env:azure:storage:path:logs",
+    "env:azure:storage:path:backup",
+]
+ADLS_RESOLVE_MAX_WORKERS = 8
+
+
+def fetch_file_systems(service_client: DataLakeServiceClient) -> FrozenSet[str]:
+    """Fetch the names of the file systems of a storage account."""
+    return get_resource_cache().get(
+        ("azure", service_client.url, "file_systems"),
+        lambda: frozenset(
+            file_system.name for file_system in service_client.list_file_systems()
+        ),
+    )
+
+
+def get_adls_account_url(url: str) -> str:
+    """Get the url of the storage account of a parsed ADLS path."""
+    return "/".join(url.split("/", 3)[:3])
+
+
+class AdlsAccountResolver:
+    """
+    The ADLS paths of a config, grouped by storage account.
+
+    Each account has one service client, and its file systems are listed once,
+    concurrently across the accounts, on first use. The listing answers all the
+    container checks of the account. An account whose file systems cannot be
+    listed by the identity falls back to checking each container.
+    """
+
+    def __init__(
+        self,
+        paths: Dict[str, str],
+        create_client: Callable[[str], DataLakeServiceClient],
+    ) -> None:
+        """Initialize the AdlsAccountResolver."""
+        self.locations: Dict[str, Tuple[str, str]] = {}
+        for key, path in paths.items():
+            try:
+                url, container = parse_adls_path(path)
+            except ValueError:
+                continue
+            self.locations[key] = (get_adls_account_url(url), container)
+        self.accounts: Dict[str, List[str]] = {}
+        for account_url, container in self.locations.values():
+            containers = self.accounts.setdefault(account_url, [])
+            if container not in containers:
+                containers.append(container)
+        self._create_client = create_client
+        self._clients: Dict[str, DataLakeServiceClient] = {}
+        self._resolved = False
+
+    def get_service_client(self, account_url: str) -> DataLakeServiceClient:
+        """Get the service client of a storage account."""
+        if account_url not in self._clients:
+            self._clients[account_url] = self._create_client(account_url)
+        return self._clients[account_url]
+
+    def resolve(self, max_workers: int = ADLS_RESOLVE_MAX_WORKERS) -> None:
+        """
+        List the file systems of all the accounts concurrently.
+
+        A failed listing is left to the validation needing the account, which
+        lists it again and reports the problem.
+        """
+        if self._resolved:
+            return
+        self._resolved = True
+        clients = [self.get_service_client(url) for url in sorted(self.accounts)]
+
+        def try_fetch(service_client: DataLakeServiceClient) -> None:
+            try:
+                fetch_file_systems(service_client)
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(clients)))
+        ) as executor:
+            list(executor.map(try_fetch, clients))
+
+    def container_exists(self, account_url: str, container: str) -> bool:
+        """Check if a container exists, listing all the accounts on first use."""
+        self.resolve()
+        service_client = self.get_service_client(get_adls_account_url(account_url))
+        try:
+            return container in fetch_file_systems(service_client)
+        except HttpResponseError as e:
+            if e.status_code != 403:
+                raise
+        return fetch_container_exists(service_client, container)
+
+
+def get_adls_resolver(
+    config: Dict[str, Any], create_client: Callable[[str], DataLakeServiceClient]
+) -> AdlsAccountResolver:
+    """Get the resolver of the configured ADLS paths."""
+    paths: Dict[str, str] = {}
+    for key in ADLS_PATH_KEYS:
+        if has_config_value(config, key):
+            path = get_config_value(config, key, key_value_expected=False)
+            if isinstance(path, str) and path:
+                paths[key] = path
+    cache = get_resource_cache()
+    # Not a cloud resource: looked up without recording a read
+    cache_key = ("azure", "adls", "account_resolver", tuple(sorted(paths.items())))
+    resolver = cache.lookup(cache_key)
+    if resolver is None:
+        resolver = AdlsAccountResolver(paths, create_client)
+        cache.put(cache_key, resolver)
+    return resolver
+
+
 class AzureSupportedRegionFeatures(Enum):
     """Enum of CDP Features."""
 
@@ -172,86 +428,78 @@ def get_resource_group_scope(subscription_id: str, resource_group: str):
     return f"/subscriptions/{subscription_id}/resourceGroups/{resource_group}"
 
 
-def get_role_assignments(
-    auth_client: AuthorizationManagementClient,
+def _get_principal_id(
     resource_client: ResourceManagementClient,
     identity_name: str,
     subscription_id: str,
     resource_group: str,
-) -> Iterable[RoleAssignmentListResult]:
-    """Get Azure role assigments for identity."""
-    identity_id = f"/subscriptions/{subscription_id}/resourcegroups/{resource_group}/providers/Microsoft.ManagedIdentity/userAssignedIdentities/{identity_name}"  # noqa: E501
+) -> str:
+    """Get the principal id of an identity, failing if it does not exist."""
+    identity_id = get_identity_id(subscription_id, resource_group, identity_name)
 
     try:
-        identity = resource_client.resources.get_by_id(
-            resource_id=identity_id, api_version="2018-11-30"
-        )
+        identity = fetch_identity(resource_client, identity_id)
     except ResourceNotFoundError:
         fail(AZURE_IDENTITY_NOT_FOUND, identity_name)
 
-    identity_pricipalid = identity.properties["principalId"]
+    return identity.properties["principalId"]
+
+
+def iter_role_assignments(
+    auth_client: AuthorizationManagementClient, principal_id: str
+) -> Iterator[RoleAssignmentListResult]:
+    """
+    Iterate the Azure role assigments of a principal.
+
+    The assignments are filtered by the service and requested page by page as
+    they are iterated.
+    """
+    yield from auth_client.role_assignments.list(
+        filter=f"principalId eq '{principal_id}'"
+    )
 
-    role_assignments = auth_client.role_assignments.list(
-        filter=f"principalId eq '{identity_pricipalid}'"
+
+def fetch_role_definition(
+    auth_client: AuthorizationManagementClient, role_definition_id: str
+) -> Any:
+    """Fetch a role definition through the resource cache."""
+    return get_resource_cache().get(
+        ("azure", "arm", "role_definition", role_definition_id.lower()),
+        lambda: auth_client.role_definitions.get_by_id(role_definition_id),
     )
 
-    return list(role_assignments)
 
+def fetch_permission_index(
+    auth_client: AuthorizationManagementClient, principal_id: str
+) -> PermissionIndex:
+    """Fetch the permission index of a principal through the resource cache."""
+    return get_resource_cache().get(
+        ("azure", "arm", "permissions", principal_id),
+        lambda: PermissionIndex.from_assignments(
+            iter_role_assignments(auth_client, principal_id),
+            lambda role_definition_id: fetch_role_definition(
+                auth_client, role_definition_id
+            ),
+        ),
+    )
 
-def check_for_actions(
+
+def get_permission_index(
     auth_client: AuthorizationManagementClient,
-    role_assigments: Iterable[RoleAssignmentListResult],
-    proper_scope: str,
-    required_actions: List[str],
-    required_data_actions: List[str],
-):
-    """Check if the role assignments passed have all the required actions."""
-    found_required_actions = []
-    found_required_data_actions = []
-
-    for role_assignment in role_assigments:
-        if role_assignment.scope == proper_scope:
-            role_definition = auth_client.role_definitions.get_by_id(
-                role_assignment.role_definition_id
-            )
-            for permissions in role_definition.permissions:
-                for action in permissions.actions:
-                    ar = re.compile(
-                        action.replace(".", r"\.").replace("*", r".*")
-                    )  # noqa: W605
-                    for matched_action in list(filter(ar.match, required_actions)):
-                        found_required_actions.append(matched_action)
-
-                for not_action in permissions.not_actions:
-                    nar = re.compile(
-                        not_action.replace(".", r"\.").replace("*", r".*")
-                    )  # noqa: W605
-                    for matched_not_action in list(
-                        filter(nar.match, found_required_actions)
-                    ):
-                        found_required_actions.remove(matched_not_action)
-
-                for data_action in permissions.data_actions:
-                    dar = re.compile(
-                        data_action.replace(".", r"\.").replace("*", r".*")
-                    )  # noqa: W605
-                    for matched_data_action in list(
-                        filter(dar.match, required_data_actions)
-                    ):
-                        found_required_data_actions.append(matched_data_action)
-
-                for not_data_action in permissions.not_data_actions:
-                    ndar = re.compile(
-                        not_data_action.replace(".", r"\.").replace("*", r".*")
-                    )  # noqa: W605
-                    for matched_not_data_action in list(
-                        filter(ndar.match, found_required_data_actions)
-                    ):
-                        found_required_data_actions.remove(matched_not_data_action)
-
-    missing_actions = list(sorted(set(required_actions) - set(found_required_actions)))
-    missing_data_actions = list(
-        sorted(set(required_data_actions) - set(found_required_data_actions))
-    )
+    resource_client: ResourceManagementClient,
+    identity_name: str,
+    subscription_id: str,
+    resource_group: str,
+) -> PermissionIndex:
+    """
+    Get the effective permissions of an identity.
 
-    return missing_actions, missing_data_actions
+    The index is built once per run and shared by all the validations of the
+    identity.
+    """
+    return fetch_permission_index(
+        auth_client,
+        _get_principal_id(
+            resource_client, identity_name, subscription_id, resource_group
+        ),
+    )
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  cache.py
+###
+"""Per-run Resource Cache."""
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Set
+
+
+class _Call:
+    """Call in flight."""
+
+    def __init__(self) -> None:
+        """Initialize the _Call."""
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls into a single in-flight call.
+
+    Concurrent callers of a key wait on the call already in flight and share
+    its result, or its exception. Nothing is kept once the call is done.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the SingleFlight."""
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Run the fetch, or wait on the identical call in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = fetch()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class ResourceReads:
+    """
+    Cached resources read by each validation.
+
+    A validation sending a cloud request that is not a fetch of the resource
+    cache is marked as untracked, its result depends on more than the
+    resources recorded. The validation being recorded is kept per thread.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the ResourceReads."""
+        self.keys: Dict[str, Set[Hashable]] = {}
+        self.untracked: Set[str] = set()
+        self._local = threading.local()
+
+    @property
+    def nodeid(self) -> Optional[str]:
+        """Get the validation recorded by the current thread."""
+        return getattr(self._local, "nodeid", None)
+
+    @nodeid.setter
+    def nodeid(self, nodeid: Optional[str]) -> None:
+        self._local.nodeid = nodeid
+
+    def start(self, nodeid: str) -> None:
+        """Start recording the resources read by a validation."""
+        self.nodeid = nodeid
+        self.keys[nodeid] = set()
+        self.untracked.discard(nodeid)
+
+    def stop(self) -> None:
+        """Stop recording the resources read."""
+        self.nodeid = None
+
+    def record(self, key: Hashable) -> None:
+        """Record a resource read by the current validation."""
+        nodeid = self.nodeid
+        if nodeid is not None:
+            self.keys[nodeid].add(key)
+
+    @contextmanager
+    def tracked(self, key: Optional[Hashable] = None) -> Iterator[None]:
+        """Send the requests made in the context as reads of the resource."""
+        if key is not None:
+            self.record(key)
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+
+    def record_request(self) -> None:
+        """Record a cloud request sent by the current validation."""
+        nodeid = self.nodeid
+        if nodeid is not None and not getattr(self._local, "depth", 0):
+            self.untracked.add(nodeid)
+
+    def clear(self) -> None:
+        """Clear all the recorded resources."""
+        self.nodeid = None
+        self.keys.clear()
+        self.untracked.clear()
+
+
+resource_reads: ResourceReads = ResourceReads()
+
+
+class ResourceCache:
+    """
+    Cache of the cloud resources fetched during a validation run.
+
+    Only successful fetches are stored, so a lookup that raised is retried
+    (and reported) by the validation that needs it. Concurrent misses of a
+    resource share a single fetch.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the ResourceCache."""
+        self._values: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check if a resource is cached."""
+        with self._lock:
+            return key in self._values
+
+    def lookup(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Get a cached resource, or the default if it was not fetched."""
+        with self._lock:
+            return self._values.get(key, default)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a fetched resource."""
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Get a cached resource, fetching and storing it on a miss."""
+        resource_reads.record(key)
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+
+        def fetch_and_put() -> Any:
+            with self._lock:
+                if key in self._values:
+                    return self._values[key]
+            with resource_reads.tracked():
+                value = fetch()
+            self.put(key, value)
+            return value
+
+        return self._flights.do(key, fetch_and_put)
+
+    def coalesce(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Share a fetch with the identical concurrent calls, without caching."""
+
+        def tracked_fetch() -> Any:
+            with resource_reads.tracked():
+                return fetch()
+
+        return self._flights.do(key, tracked_fetch)
+
+    def clear(self) -> None:
+        """Clear all the cached resources."""
+        with self._lock:
+            self._values.clear()
+
+
+_resource_cache: ResourceCache = ResourceCache()
+
+
+def get_resource_cache() -> ResourceCache:
+    """Get the resource cache of the validation run."""
+    return _resource_cache
+
+
+class ClientPool:
+    """
+    Cloud clients kept across the runs of a long-running process.
+
+    Disabled by default, each run creates its own clients. Once enabled, the
+    clients keep their credentials, tokens and connections warm for the next
+    runs with the same settings.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the ClientPool."""
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._clients: Dict[Hashable, Any] = {}
+
+    def get(self, key: Hashable, create: Callable[[], Any]) -> Any:
+        """Get the pooled client for a key, creating it if needed."""
+        if not self.enabled:
+            return create()
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = create()
+            return self._clients[key]
+
+    def clear(self) -> None:
+        """Drop all the pooled clients."""
+        with self._lock:
+            self._clients.clear()
+
+
+_client_pool: ClientPool = ClientPool()
+
+
+def get_client_pool() -> ClientPool:
+    """Get the pool of the cloud clients."""
+    return _client_pool
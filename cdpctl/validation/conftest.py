@@ -42,7 +42,8 @@
 # type: ignore[attr-defined]
 """Provide validation configs."""
 import sys
-from typing import Any, Dict, Mapping, Optional, Tuple, Union
+import time
+from typing import Any, Dict, Generator, List, Mapping, Optional, Tuple, Union
 
 import click
 import emoji
@@ -55,11 +56,38 @@ from pytest import Collector, ExitCode, Item, Session
 
 from cdpctl.utils import load_config
 
-from . import IssueType, UnrecoverableValidationError, current_context, get_config_value
+from . import (
+    IssueType,
+    NotEvaluatedError,
+    UnrecoverableValidationError,
+    config_reads,
+    current_context,
+    get_config_value,
+    get_issues,
+    restore_issues,
+    warn,
+)
+from .cache import resource_reads
+from .deadline import DEFAULT_VALIDATION_TIMEOUT, validation_deadline
+from .issues import VALIDATION_NOT_EVALUATED
+from .plan import ValidationPlan, get_validation_name
 
 this = sys.modules[__name__]
 this.config_file = "config.yaml"
 this.run_validations = 0
+this.plan = None
+this.shard = None
+this.result_cache = None
+this.replays = {}
+this.outcomes = {}
+this.not_evaluated = set()
+this.timings = None
+this.weigh_shards = False
+this.shard_costs = None
+this.fail_fast = False
+this.durations = {}
+this.started_at = {}
+this.memprofile = None
 
 
 def pytest_runtestloop(
@@ -69,6 +97,77 @@ def pytest_runtestloop(
     pass
 
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection_modifyitems(
+    session: Session,  # pylint: disable=unused-argument
+    config: Config,  # pylint: disable=redefined-outer-name
+    items: List[Item],
+) -> Generator[None, None, None]:
+    """Plan, shard and order the validations selected by all the plugins."""
+    yield
+    if this.plan is None:
+        this.plan = ValidationPlan.from_items(items)
+    costs = this.timings.get_costs(this.plan.nodeids) if this.timings else {}
+    this.shard_costs = costs if this.weigh_shards and costs else None
+    if this.shard is not None:
+        selected = set(this.plan.get_shard(*this.shard, costs=this.shard_costs))
+        deselected = [item for item in items if item.nodeid not in selected]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if item.nodeid in selected]
+    this.outcomes = {}
+    this.not_evaluated = set()
+    this.durations = {}
+    this.replays = (
+        this.result_cache.get_replays(items, this.plan) if this.result_cache else {}
+    )
+    for item in items:
+        if item.nodeid in this.replays:
+            # Only the call is replayed, the fixtures are not set up
+            item.funcargs.update(
+                {name: None for name in item.fixturenames if name not in item.funcargs}
+            )
+    if costs:
+        # Replayed validations take no time
+        costs.update({nodeid: 0.0 for nodeid in this.replays})
+        position = {
+            nodeid: index for index, nodeid in enumerate(this.plan.get_order(costs))
+        }
+        items.sort(key=lambda item: position.get(item.nodeid, len(position)))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: Item) -> Optional[bool]:
+    """Replay the cached result of a validation whose inputs did not change."""
+    entry = this.replays.get(pyfuncitem.nodeid)
+    if entry is None:
+        return None
+    restore_issues(entry["issues"])
+    if entry["outcome"] == "failed":
+        pytest.fail(current_context.last_message, False)
+    return True
+
+
+def get_validation_timeout(item: Item) -> float:
+    """Get the timeout of a validation, set by its validation_timeout marker."""
+    marker = item.get_closest_marker("validation_timeout")
+    if marker is None:
+        return DEFAULT_VALIDATION_TIMEOUT
+    return float(marker.kwargs.get("seconds", DEFAULT_VALIDATION_TIMEOUT))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item: Item) -> Generator[None, None, None]:
+    """Run the validation until its timeout or the deadline of the run."""
+    if item.nodeid in this.replays:
+        yield
+        return
+    with validation_deadline(
+        get_validation_timeout(item), this.started_at.get(item.nodeid)
+    ):
+        yield
+
+
 def pytest_sessionstart(session: Session) -> None:
     """Start a validation capture session."""
     session.issues = dict()
@@ -80,31 +179,108 @@ def pytest_runtest_makereport(item: Item, call: CallInfo[None]) -> TestReport:
     """Catch the report on results."""
     outcome = yield
     result = outcome.get_result()
+    this.durations[item.nodeid] = this.durations.get(item.nodeid, 0.0) + call.duration
 
     node = item.obj
 
     if call.when == "setup":  # Validation is starting
         current_context.clear()
         suf = node.__doc__.strip() if node.__doc__ else node.__name__
-        if result.failed:
+        if call.excinfo is not None and isinstance(
+            call.excinfo.value, NotEvaluatedError
+        ):
+            # The fixtures of the validation did not set up before its deadline
+            current_context.validation_name = suf
+            current_context.function = item.name
+            current_context.nodeid = item.nodeid
+            this.not_evaluated.add(item.nodeid)
+            warn(VALIDATION_NOT_EVALUATED, subjects=[str(call.excinfo.value)])
+            click.echo(
+                f"{suf} {emoji.emojize(':red_exclamation_mark:')} (not evaluated)",
+                err=True,
+            )
+        elif result.failed:
             click.echo(f"Unable to setup validation '{suf}'", err=True)
         if result.passed:
             current_context.validation_name = suf
             current_context.function = item.name
             current_context.nodeid = item.nodeid
             click.echo(suf, nl=False, err=True)
+        if this.memprofile is not None:
+            this.memprofile.begin(item.nodeid)
     elif call.when == "call":  # Validation was called
+        if call.excinfo is not None and isinstance(
+            call.excinfo.value, NotEvaluatedError
+        ):
+            this.not_evaluated.add(item.nodeid)
+            warn(VALIDATION_NOT_EVALUATED, subjects=[str(call.excinfo.value)])
+        suffix = " (cached)" if item.nodeid in this.replays else ""
+        if item.nodeid in this.not_evaluated:
+            suffix = " (not evaluated)"
         if current_context.state == IssueType.PROBLEM:
-            click.echo(f" {emoji.emojize(':cross_mark:')}", err=True)
+            click.echo(f" {emoji.emojize(':cross_mark:')}{suffix}", err=True)
         elif current_context.state == IssueType.WARNING:
-            click.echo(f" {emoji.emojize(':red_exclamation_mark:')}", err=True)
+            click.echo(f" {emoji.emojize(':red_exclamation_mark:')}{suffix}", err=True)
         else:
-            click.echo(f" {emoji.emojize(':check_mark:')}", err=True)
+            click.echo(f" {emoji.emojize(':check_mark:')}{suffix}", err=True)
+        this.outcomes[item.nodeid] = result.outcome
+        if (
+            this.fail_fast
+            and result.failed
+            and item.nodeid not in this.not_evaluated
+            and not item.session.shouldstop
+        ):
+            remaining = len(item.session.items) - item.session.items.index(item) - 1
+            item.session.shouldstop = (
+                f"stopped as '{current_context.validation_name}' failed, "
+                f"{remaining} validation(s) were not run"
+            )
     elif call.when == "teardown":
         this.run_validations += 1
+        config_reads.stop()
+        resource_reads.stop()
+        _store_result(item)
+        _record_duration(item)
+        if this.memprofile is not None:
+            this.memprofile.end(item.nodeid, name=get_validation_name(item))
     sys.stdout.flush()
 
 
+def _store_result(item: Item) -> None:
+    """Store the result of a validation in the result cache."""
+    outcome = this.outcomes.get(item.nodeid)
+    if (
+        this.result_cache is None
+        or item.nodeid in this.replays
+        or item.nodeid in this.not_evaluated
+        or outcome not in ("passed", "failed")
+        or item.nodeid in resource_reads.untracked
+    ):
+        return
+    issues = get_issues().get(this.plan.names.get(item.nodeid), {})
+    this.result_cache.store(
+        item=item,
+        outcome=outcome,
+        config_keys=config_reads.keys.get(item.nodeid, set()),
+        resource_keys=resource_reads.keys.get(item.nodeid, set()),
+        issues={
+            issue_type: [issue.to_dict() for issue in type_issues]
+            for issue_type, type_issues in issues.items()
+        },
+    )
+
+
+def _record_duration(item: Item) -> None:
+    """Record the seconds a validation took in the timing history."""
+    if (
+        this.timings is None
+        or item.nodeid in this.replays
+        or item.nodeid in this.not_evaluated
+    ):
+        return
+    this.timings.record(item.nodeid, this.durations.get(item.nodeid, 0.0))
+
+
 def pytest_exception_interact(
     node: Union[Item, Collector],
     call: CallInfo[Any],
@@ -131,6 +307,8 @@ def pytest_sessionfinish(
     exitstatus: Union[int, ExitCode],  # pylint: disable=unused-argument
 ) -> None:
     """Finish the validation session."""
+    if this.timings is not None:
+        this.timings.save()
     if session.exitstatus != ExitCode.INTERRUPTED:
         click.echo("")
 
@@ -159,14 +337,32 @@ def config() -> Dict[str, Any]:
     return load_config(this.config_file)
 
 
-def pytest_runtest_setup(item):
-    """Check for the dynamic markers."""
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item: Item) -> Generator[None, None, None]:
+    """Check for the dynamic markers, and set up the validation until its timeout."""
+    config_reads.start(item.nodeid)
+    resource_reads.start(item.nodeid)
+    _check_markers(item)
+    if item.nodeid in this.replays:
+        yield
+        return
+    # The fixtures and the call of the validation share its timeout
+    this.started_at[item.nodeid] = time.monotonic()
+    with validation_deadline(
+        get_validation_timeout(item), this.started_at[item.nodeid]
+    ):
+        yield
+
+
+def _check_markers(item: Item) -> None:
+    """Skip the validation if its dynamic markers do not match the config."""
     configuration = load_config(this.config_file)
 
     # Handle Network Types
     network_types_marker = item.get_closest_marker("network_types")
     if network_types_marker is not None:
         network_types = network_types_marker.kwargs.get("types")
+        config_reads.record("network_type")
         config_type = configuration["network_type"]
         if config_type not in network_types:
             pytest.skip(f"not supported for network type {config_type}")
@@ -204,3 +400,8 @@ def pytest_configure(config):  # pylint: disable=redefined-outer-name
         "config_value(path=None, value=None): "
         "mark the network type a validation is target for.",
     )
+    config.addinivalue_line(
+        "markers",
+        "validation_timeout(seconds=None): mark the seconds a validation can run "
+        "before being reported as not evaluated.",
+    )
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  deadline.py
+###
+"""Validation Deadlines, Run Budget and Circuit Breaking."""
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from cdpctl.validation import NotEvaluatedError
+
+DEFAULT_VALIDATION_TIMEOUT = 60.0
+BREAKER_FAILURE_THRESHOLD = 3
+SERVER_ERROR_STATUS_CODE = 500
+
+# (cloud, scope, service) of a cloud service endpoint
+Endpoint = Tuple[str, str, str]
+
+
+class ValidationTimeoutError(NotEvaluatedError):
+    """The validation did not finish before its deadline."""
+
+    pass
+
+
+class RunBudget:
+    """Time left to the deadline of the validation run."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize the RunBudget."""
+        self.clock = clock
+        self.ends_at: Optional[float] = None
+
+    def start(self, deadline: Optional[float]) -> None:
+        """Start the budget of a run, lasting deadline seconds if given."""
+        self.ends_at = self.clock() + deadline if deadline else None
+
+    def get_remaining(self) -> Optional[float]:
+        """Get the seconds left to the deadline, None without a deadline."""
+        if self.ends_at is None:
+            return None
+        return max(0.0, self.ends_at - self.clock())
+
+    def get_timeout(self, timeout: float) -> float:
+        """Get the timeout of a step, shortened to end by the deadline."""
+        remaining = self.get_remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+
+class CircuitBreaker:
+    """
+    Breaker of the cloud service endpoints failing repeatedly.
+
+    An endpoint is opened once its requests failed or timed out
+    BREAKER_FAILURE_THRESHOLD times in a row, and stays opened for the rest
+    of the run: every later request to it raises a NotEvaluatedError.
+    """
+
+    def __init__(self, threshold: int = BREAKER_FAILURE_THRESHOLD) -> None:
+        """Initialize the CircuitBreaker."""
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._failures: Dict[Endpoint, int] = {}
+        self._opened: Dict[Endpoint, bool] = {}
+        self._local = threading.local()
+
+    def _get_in_flight(self) -> List[Endpoint]:
+        if not hasattr(self._local, "endpoints"):
+            self._local.endpoints = []
+        return self._local.endpoints
+
+    def is_open(self, endpoint: Endpoint) -> bool:
+        """Check if an endpoint is opened."""
+        with self._lock:
+            return self._opened.get(endpoint, False)
+
+    def check(self, endpoint: Endpoint) -> None:
+        """Raise a NotEvaluatedError if an endpoint is opened."""
+        if self.is_open(endpoint):
+            cloud, scope, service = endpoint
+            raise NotEvaluatedError(
+                f"{cloud} {service} ({scope}) stopped responding during the run"
+            )
+
+    def begin(self, endpoint: Endpoint) -> None:
+        """Check an endpoint and record a request in flight to it."""
+        self.check(endpoint)
+        self._get_in_flight().append(endpoint)
+
+    def end(self, endpoint: Endpoint) -> None:
+        """Record the end of a request to an endpoint."""
+        in_flight = self._get_in_flight()
+        if endpoint in in_flight:
+            in_flight.remove(endpoint)
+
+    def record_success(self, endpoint: Endpoint) -> None:
+        """Record a successful request to an endpoint."""
+        with self._lock:
+            self._failures[endpoint] = 0
+
+    def record_failure(self, endpoint: Endpoint) -> None:
+        """Record a failed request to an endpoint."""
+        with self._lock:
+            self._failures[endpoint] = self._failures.get(endpoint, 0) + 1
+            if self._failures[endpoint] >= self.threshold:
+                self._opened[endpoint] = True
+
+    def record_timeout(self) -> None:
+        """Record a failure of the requests in flight of the current thread."""
+        in_flight = self._get_in_flight()
+        for endpoint in set(in_flight):
+            self.record_failure(endpoint)
+        in_flight.clear()
+
+    def get_opened(self) -> List[Endpoint]:
+        """Get the opened endpoints."""
+        with self._lock:
+            return sorted(
+                endpoint for endpoint, opened in self._opened.items() if opened
+            )
+
+    def clear(self) -> None:
+        """Close all the endpoints."""
+        with self._lock:
+            self._failures.clear()
+            self._opened.clear()
+        self._get_in_flight().clear()
+
+
+run_budget: RunBudget = RunBudget()
+_circuit_breaker: CircuitBreaker = CircuitBreaker()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Get the circuit breaker shared by all the clients of the run."""
+    return _circuit_breaker
+
+
+def _can_use_alarm() -> bool:
+    return (
+        hasattr(signal, "SIGALRM")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+@contextmanager
+def validation_deadline(
+    timeout: float, started_at: Optional[float] = None
+) -> Iterator[None]:
+    """
+    Run a validation until its timeout, or the deadline of the run.
+
+    The timeout is counted from started_at, a time.monotonic() time, for the
+    steps of a validation to share it, and from now without it. Raise a
+    NotEvaluatedError if the run deadline is already reached, and a
+    ValidationTimeoutError if the validation is still running at its
+    deadline. The deadline is only enforced on the main thread of platforms
+    supporting SIGALRM.
+    """
+    remaining = run_budget.get_remaining()
+    if remaining is not None and remaining <= 0:
+        raise NotEvaluatedError("the deadline of the run was reached")
+    left = timeout if started_at is None else timeout - (time.monotonic() - started_at)
+    seconds = run_budget.get_timeout(left)
+    reason = (
+        "the deadline of the run was reached"
+        if seconds < left
+        else f"it did not finish within {timeout:g} seconds"
+    )
+    if seconds <= 0:
+        raise ValidationTimeoutError(reason)
+    if not _can_use_alarm():
+        yield
+        return
+
+    def on_alarm(signum: int, frame: Any) -> None:  # pylint: disable=unused-argument
+        get_circuit_breaker().record_timeout()
+        raise ValidationTimeoutError(reason)
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def register_aws_breaker(client: Any, scope: str) -> None:
+    """Put an AWS client behind the circuit breaker of its service."""
+    # Imported with the AWS clients only, Azure runs do not load botocore
+    from botocore.exceptions import ConnectionError as BotocoreConnectionError
+    from botocore.exceptions import HTTPClientError
+
+    endpoint = ("aws", scope, client.meta.service_model.service_name)
+    event_name = client.meta.service_model.service_id.hyphenize()
+    breaker = get_circuit_breaker()
+
+    # pylint: disable=unused-argument
+    def before_send(**kwargs) -> None:
+        breaker.begin(endpoint)
+
+    def needs_retry(response=None, caught_exception=None, **kwargs) -> None:
+        breaker.end(endpoint)
+        if isinstance(caught_exception, (BotocoreConnectionError, HTTPClientError)) or (
+            response is not None and response[0].status_code >= SERVER_ERROR_STATUS_CODE
+        ):
+            breaker.record_failure(endpoint)
+        elif response is not None:
+            breaker.record_success(endpoint)
+
+    client.meta.events.register(f"before-send.{event_name}", before_send)
+    client.meta.events.register(f"needs-retry.{event_name}", needs_retry)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  fingerprint.py
+###
+"""Input Fingerprint Cache of the Validation Results."""
+import hashlib
+import inspect
+import json
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from cdpctl.__version__ import __version__
+from cdpctl.utils import get_cache_dir
+from cdpctl.validation import get_config_value, has_config_value
+from cdpctl.validation.azure_permissions import PermissionMatcher
+from cdpctl.validation.cache import get_resource_cache
+from cdpctl.validation.plan import ValidationPlan
+
+RESULTS_CACHE_DIR_NAME = "results"
+
+# Keys of the cached AWS resources are (cloud, region, kind, id)
+AWS_RESOURCE_SERVICES = {
+    "role": "iam",
+    "role_policies": "iam",
+    "policy": "iam",
+    "instance_profile": "iam",
+    "subnet": "ec2",
+    "security_group": "ec2",
+    "vpc": "ec2",
+    "key_pair": "ec2",
+    "bucket_status": "s3",
+}
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _as_dict(resource: Any) -> Any:
+    return resource.as_dict() if hasattr(resource, "as_dict") else resource
+
+
+class ChangeTokens:
+    """
+    Cheap change tokens of the cloud resources read by the validations.
+
+    A token changes when the resource changes in a way that can change the
+    result of a validation: IAM policy versions and documents, EC2 resource
+    attributes and rules, Azure etags. Tokens are computed once per run.
+    """
+
+    def __init__(self, config: Dict[str, Any]) -> None:
+        """Initialize the ChangeTokens."""
+        self.config = config
+        self._clients: Dict[Tuple[str, ...], Any] = {}
+        self._tokens: Dict[Hashable, str] = {}
+
+    def _get_client(self, cloud: str, client_type: str, url: str = None) -> Any:
+        key = (cloud, client_type, url or "")
+        if key not in self._clients:
+            if cloud == "aws":
+                from cdpctl.validation import aws_utils
+
+                self._clients[key] = aws_utils.get_client(client_type, self.config)
+            else:
+                from cdpctl.validation import azure_utils
+
+                self._clients[key] = azure_utils.get_client(
+                    client_type, self.config, url
+                )
+        return self._clients[key]
+
+    def get(self, key: Tuple[str, ...]) -> str:
+        """Get the change token of a cached resource."""
+        if key not in self._tokens:
+            try:
+                self._tokens[key] = _hash(self._get_state(key))
+            except Exception as e:  # pylint: disable=broad-except
+                self._tokens[key] = f"error:{type(e).__name__}"
+        return self._tokens[key]
+
+    def _get_state(self, key: Tuple[str, ...]) -> Any:
+        if key[0] == "aws":
+            client = self._get_client("aws", AWS_RESOURCE_SERVICES[key[2]])
+            return self._get_aws_state(client, key[2], key[3])
+        return self._get_azure_state(key)
+
+    def _get_azure_state(self, key: Tuple[str, ...]) -> Any:
+        from cdpctl.validation import azure_utils
+
+        scope, kind = key[1], key[2]
+        if kind == "identity":
+            resource_client = self._get_client("azure", "resource")
+            return _as_dict(azure_utils.fetch_identity(resource_client, key[3]))
+        if kind == "file_systems":
+            service_client = self._get_client("azure", "datalake", scope)
+            return sorted(azure_utils.fetch_file_systems(service_client))
+        if kind == "container":
+            service_client = self._get_client("azure", "datalake", scope)
+            return azure_utils.fetch_container_exists(service_client, key[3])
+        if kind == "permissions":
+            auth_client = self._get_client("azure", "auth")
+            return azure_utils.fetch_permission_index(auth_client, key[3]).get_state()
+        if kind == "role_definition":
+            auth_client = self._get_client("azure", "auth")
+            role_definition = azure_utils.fetch_role_definition(auth_client, key[3])
+            return [
+                PermissionMatcher(permission).operations
+                for permission in role_definition.permissions or []
+            ]
+        if kind == "network_snapshot":
+            snapshot = get_resource_cache().get(
+                key,
+                lambda: azure_utils.AzureNetworkSnapshot(
+                    network_client=self._get_client("azure", "network"),
+                    resource_group_name=key[3],
+                    vnet_name=key[4],
+                ),
+            )
+            return [
+                snapshot.get_vnet().etag,
+                sorted(nsg.etag for nsg in snapshot.get_security_groups().values()),
+            ]
+        raise ValueError(f"No change token for the resource kind {kind}")
+
+    def _get_aws_state(self, client: Any, kind: str, resource_id: str) -> Any:
+        from cdpctl.validation import aws_utils
+
+        if kind == "role":
+            role = dict(aws_utils.fetch_role(client, resource_id)["Role"])
+            # The last use of the role changes on every use, not its permissions
+            role.pop("RoleLastUsed", None)
+            return [role, aws_utils.fetch_role_policies(client, resource_id)]
+        if kind == "role_policies":
+            return aws_utils.fetch_role_policies(client, resource_id)
+        if kind == "policy":
+            return aws_utils.fetch_policy_version(client, resource_id)
+        if kind == "instance_profile":
+            profile = aws_utils.fetch_instance_profile(client, resource_id)
+            return [
+                profile,
+                [
+                    self.get(("aws", client.meta.region_name, "role", role["RoleName"]))
+                    for role in profile["InstanceProfile"]["Roles"]
+                ],
+            ]
+        if kind == "bucket_status":
+            return aws_utils.fetch_bucket_status(client, resource_id)
+        fetch: Callable[[Any, List[str]], List[Dict]] = {
+            "subnet": aws_utils.fetch_subnets,
+            "security_group": aws_utils.fetch_security_groups,
+            "vpc": aws_utils.fetch_vpcs,
+            "key_pair": aws_utils.fetch_key_pairs,
+        }[kind]
+        return fetch(client, [resource_id])
+
+
+@lru_cache(maxsize=None)
+def get_shared_source_hash() -> str:
+    """
+    Get the hash of the modules shared by the validations.
+
+    The conftest fixtures, the helper modules and the resource files of the
+    validation package change the results of the validations using them, only
+    the validation modules themselves are left out.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(package_dir):
+        dirs[:] = sorted(name for name in dirs if name != "__pycache__")
+        for name in sorted(files):
+            if name.startswith("validate_") or name.endswith(".pyc"):
+                continue
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, package_dir).encode("utf-8"))
+            with open(path, "rb") as source:
+                digest.update(source.read())
+    return digest.hexdigest()
+
+
+def get_source_hash(item: Any) -> str:
+    """Get the hash of the source module of a validation and its shared modules."""
+    with open(inspect.getfile(item.obj), "rb") as source:
+        digest = hashlib.sha256(source.read())
+    digest.update(get_shared_source_hash().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_fingerprint(
+    item: Any,
+    config: Dict[str, Any],
+    config_keys: Iterable[str],
+    resource_keys: Iterable[Tuple[str, ...]],
+    tokens: ChangeTokens,
+) -> str:
+    """Get the fingerprint of the inputs of a validation."""
+    return _hash(
+        {
+            "version": __version__,
+            "source": get_source_hash(item),
+            "config": {
+                key: (
+                    get_config_value(config, key, key_value_expected=False)
+                    if has_config_value(config, key)
+                    else "<missing>"
+                )
+                for key in sorted(config_keys)
+            },
+            "resources": {
+                "|".join(key): tokens.get(key)
+                for key in sorted(tuple(key) for key in resource_keys)
+            },
+        }
+    )
+
+
+class ResultCache:
+    """Results of the validations cached under the fingerprint of their inputs."""
+
+    def __init__(
+        self,
+        config_file: str,
+        config: Dict[str, Any],
+        cache_dir: str = None,
+        revalidate: bool = False,
+    ) -> None:
+        """Initialize the ResultCache."""
+        self.config_file = os.path.abspath(config_file)
+        self.config = config
+        self.revalidate = revalidate
+        self.cache_dir = cache_dir or get_cache_dir(RESULTS_CACHE_DIR_NAME)
+        self.tokens = ChangeTokens(config)
+
+    def _get_path(self, nodeid: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        name = hashlib.sha256(f"{self.config_file}::{nodeid}".encode("utf-8"))
+        return os.path.join(self.cache_dir, f"{name.hexdigest()}.json")
+
+    def load(self, nodeid: str) -> Optional[Dict[str, Any]]:
+        """Load the cached result of a validation."""
+        path = self._get_path(nodeid)
+        if not path or not os.path.isfile(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as entry_file:
+                return json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+    def store(
+        self,
+        item: Any,
+        outcome: str,
+        config_keys: Iterable[str],
+        resource_keys: Iterable[Tuple[str, ...]],
+        issues: Dict[str, List[Dict[str, Any]]],
+    ) -> None:
+        """Store the result of a validation."""
+        path = self._get_path(item.nodeid)
+        if not path:
+            return
+        entry = {
+            "nodeid": item.nodeid,
+            "config_keys": sorted(config_keys),
+            "resource_keys": sorted(list(key) for key in resource_keys),
+            "fingerprint": get_fingerprint(
+                item, self.config, config_keys, resource_keys, self.tokens
+            ),
+            "outcome": outcome,
+            "issues": issues,
+        }
+        try:
+            with open(path, "w", encoding="utf-8") as entry_file:
+                json.dump(entry, entry_file)
+        except OSError:
+            pass
+
+    def get_hit(self, item: Any) -> Optional[Dict[str, Any]]:
+        """Get the cached result of a validation if its inputs did not change."""
+        entry = self.load(item.nodeid)
+        if entry is None:
+            return None
+        fingerprint = get_fingerprint(
+            item,
+            self.config,
+            entry["config_keys"],
+            [tuple(key) for key in entry["resource_keys"]],
+            self.tokens,
+        )
+        return entry if fingerprint == entry["fingerprint"] else None
+
+    def get_replays(
+        self, items: Iterable[Any], plan: ValidationPlan
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the cached results that can be replayed instead of running.
+
+        A validation is only replayed when all its dependents are replayed
+        too, as they can need the state it sets while running. Nothing is
+        replayed when revalidating.
+        """
+        if self.revalidate:
+            return {}
+        hits = {}
+        for item in items:
+            entry = self.get_hit(item)
+            if entry is not None:
+                hits[item.nodeid] = entry
+        return {
+            nodeid: entry
+            for nodeid, entry in hits.items()
+            if plan.get_dependents([nodeid]) <= set(hits)
+        }
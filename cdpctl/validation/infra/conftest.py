@@ -40,11 +40,14 @@
 # Source File Name:  conftest.py
 ###
 """Fixtures for the AWS CDP bucket access policy."""
-from typing import Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
 import pytest
 
-from cdpctl.validation.azure_utils import read_azure_supported_regions
+if TYPE_CHECKING:
+    from azure.mgmt.network import NetworkManagementClient
+
+    from cdpctl.validation.azure_utils import AzureNetworkSnapshot
 
 
 @pytest.fixture
@@ -301,6 +304,8 @@ def cdp_cidrs() -> List[str]:
 @pytest.fixture
 def azure_supported_regions() -> List[str]:
     """Get the Azure regions supported by CDP."""
+    from cdpctl.validation.azure_utils import read_azure_supported_regions
+
     base_regions, _ = read_azure_supported_regions()
     return base_regions
 
@@ -308,10 +313,30 @@ def azure_supported_regions() -> List[str]:
 @pytest.fixture
 def azure_supported_region_experiences() -> Dict[str, bool]:
     """Get the Azure regions supported by CDP."""
+    from cdpctl.validation.azure_utils import read_azure_supported_regions
+
     _, region_features = read_azure_supported_regions()
     return region_features
 
 
+@pytest.fixture
+def azure_network_client(config: Dict[str, Any]) -> "NetworkManagementClient":
+    """Return an Azure Network Client."""
+    from cdpctl.validation.azure_utils import get_client
+
+    return get_client("network", config)
+
+
+@pytest.fixture
+def azure_network_snapshot(
+    config: Dict[str, Any], azure_network_client: "NetworkManagementClient"
+) -> "AzureNetworkSnapshot":
+    """Get the network snapshot shared by the Azure network validations."""
+    from cdpctl.validation.azure_utils import get_network_snapshot
+
+    return get_network_snapshot(config, azure_network_client)
+
+
 @pytest.fixture
 def azure_data_required_actions() -> List[str]:
     """Get the Azure actions needed for the data identity."""
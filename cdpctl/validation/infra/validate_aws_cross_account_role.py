@@ -46,7 +46,13 @@ import pytest
 from boto3_type_annotations.iam import Client as IAMClient
 
 from cdpctl.validation import fail, get_config_value
-from cdpctl.validation.aws_utils import get_client, get_role, simulate_policy
+from cdpctl.validation.aws_trust import EXTERNAL_ID
+from cdpctl.validation.aws_utils import (
+    get_client,
+    get_role,
+    get_trust_policy,
+    simulate_policy,
+)
 from cdpctl.validation.infra.issues import (
     AWS_ACCOUNT_ID_NOT_IN_CROSS_ACCOUNT_ROLE,
     AWS_CROSS_ACCOUNT_ROLE_MISSING,
@@ -95,20 +101,8 @@ def aws_cross_account_role_account_id_validation(
         config,
         "env:cdp:cross_account:account_id",
     )
-    found_account_id = False
-    for s in cross_account_role_data["role"]["Role"]["AssumeRolePolicyDocument"][
-        "Statement"
-    ]:
-        if "Principal" in s and "AWS" in s["Principal"]:
-            if isinstance(s["Principal"]["AWS"], str):
-                if str(account_id) in s["Principal"]["AWS"].split(":"):
-                    found_account_id = True
-            else:
-                for arn in s["Principal"]["AWS"]:
-                    if str(account_id) in arn.split(":"):
-                        found_account_id = True
-
-    if not found_account_id:
+    trust_policy = get_trust_policy(cross_account_role_data["role"]["Role"])
+    if not trust_policy.trusts_account(account_id):
         fail(
             template=AWS_ACCOUNT_ID_NOT_IN_CROSS_ACCOUNT_ROLE,
             subjects=[account_id, cross_account_role_data["cross_account_role"]],
@@ -126,19 +120,19 @@ def aws_cross_account_role_external_id_validation(
         config,
         "env:cdp:cross_account:external_id",
     )
-    for s in cross_account_role_data["role"]["Role"]["AssumeRolePolicyDocument"][
-        "Statement"
-    ]:
-        if "Condition" in s.keys():
-            if s["Condition"]["StringEquals"]["sts:ExternalId"]:
-                if external_id not in s["Condition"]["StringEquals"]["sts:ExternalId"]:
-                    fail(
-                        template=AWS_EXTERNAL_ID_NOT_IN_CROSS_ACCOUNT_ROLE,
-                        subjects=[
-                            external_id,
-                            cross_account_role_data["cross_account_role"],
-                        ],
-                    )
+    trust_policy = get_trust_policy(cross_account_role_data["role"]["Role"])
+    # The statements setting an external id must accept the configured one
+    for external_ids in trust_policy.get_condition_values(
+        EXTERNAL_ID, trust_policy.allowed
+    ).values():
+        if str(external_id) not in external_ids:
+            fail(
+                template=AWS_EXTERNAL_ID_NOT_IN_CROSS_ACCOUNT_ROLE,
+                subjects=[
+                    external_id,
+                    cross_account_role_data["cross_account_role"],
+                ],
+            )
 
 
 @pytest.mark.aws
@@ -47,10 +47,9 @@ from boto3_type_annotations.iam import Client as IAMClient
 
 from cdpctl.validation import get_config_value, validator
 from cdpctl.validation.aws_utils import (
-    convert_s3a_to_arn,
     get_client,
     get_role,
-    parse_arn,
+    get_s3_location,
     simulate_policy,
 )
 from cdpctl.validation.infra.issues import (
@@ -191,9 +190,9 @@ def aws_datalake_admin_role_has_bucket_access_policy(
         "infra:aws:vpc:existing:storage:data",
     )
 
-    data_location_arn = convert_s3a_to_arn(data_location)
-    bucket_name = parse_arn(data_location_arn)["resource_type"]
-    bucket_arn = convert_s3a_to_arn(f"s3a://{bucket_name}")
+    s3_location = get_s3_location(data_location)
+    bucket_name = s3_location.bucket_name
+    bucket_arn = s3_location.bucket_arn
 
     datalake_admin_role = get_role(iam_client, datalake_admin_role_name)
     datalake_admin_role_arn = datalake_admin_role["Role"]["Arn"]
@@ -292,7 +291,7 @@ def aws_datalake_admin_role_has_s3_policy(
         "infra:aws:vpc:existing:storage:data",
     )
 
-    data_location_arn = convert_s3a_to_arn(data_location)
+    data_location_arn = get_s3_location(data_location).arn
 
     datalake_admin_role = get_role(iam_client, datalake_admin_role_name)
     datalake_admin_role_arn = datalake_admin_role["Role"]["Arn"]
@@ -344,9 +343,9 @@ def aws_datalake_admin_role_has_backup_bucket_access_policy(
         "infra:aws:vpc:existing:storage:backup",
     )
 
-    data_location_arn = convert_s3a_to_arn(data_location)
-    bucket_name = parse_arn(data_location_arn)["resource_type"]
-    bucket_arn = convert_s3a_to_arn(f"s3a://{bucket_name}")
+    s3_location = get_s3_location(data_location)
+    bucket_name = s3_location.bucket_name
+    bucket_arn = s3_location.bucket_arn
 
     datalake_admin_role = get_role(iam_client, datalake_admin_role_name)
     datalake_admin_role_arn = datalake_admin_role["Role"]["Arn"]
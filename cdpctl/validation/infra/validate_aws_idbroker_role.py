@@ -40,7 +40,6 @@
 # Source File Name:  validate_aws_idbroker_role.py
 ###
 """Validation of AWS Idbroker Role."""
-import json
 from typing import Any, Dict, List
 
 import pytest
@@ -48,11 +47,11 @@ from boto3_type_annotations.iam import Client as IAMClient
 
 from cdpctl.validation import fail, get_config_value, validator
 from cdpctl.validation.aws_utils import (
-    convert_s3a_to_arn,
     get_client,
     get_instance_profile,
     get_role,
-    parse_arn,
+    get_s3_location,
+    get_trust_policy,
     simulate_policy,
 )
 from cdpctl.validation.infra.issues import (
@@ -126,27 +125,7 @@ def _aws_idbroker_role_has_ec2_trust_policy_validation(
     profile = get_idbroker_instance_profile(config=config, iam_client=iam_client)
 
     role = profile["InstanceProfile"]["Roles"][0]
-    role_assume_policy = role["AssumeRolePolicyDocument"]
-
-    if isinstance(role_assume_policy, str):
-        assume_policy_statement = json.loads(role_assume_policy)["Statement"]
-    else:
-        assume_policy_statement = role_assume_policy["Statement"]
-
-    found_ec2_trust = False
-    for trust_policy in assume_policy_statement:
-        try:
-            if (
-                trust_policy["Effect"] == "Allow"
-                and "ec2.amazonaws.com" in trust_policy["Principal"]["Service"]
-                and trust_policy["Action"] == "sts:AssumeRole"
-            ):
-                found_ec2_trust = True
-                break
-        except KeyError:
-            continue
-
-    if not found_ec2_trust:
+    if not get_trust_policy(role).trusts_service("ec2.amazonaws.com"):
         fail(AWS_IDBROKER_ROLE_NEED_EC2_TRUST_POLICY, role)
 
 
@@ -230,7 +209,7 @@ def _aws_idbroker_role_has_necessary_s3_actions_validation(
         config,
         "infra:aws:vpc:existing:storage:logs",
     )
-    log_location_arn = convert_s3a_to_arn(log_location)
+    log_location_arn = get_s3_location(log_location).arn
 
     simulate_policy(
         iam_client=iam_client,
@@ -276,9 +255,7 @@ def _aws_idbroker_role_has_necessary_s3_bucket_actions_validation(
         "infra:aws:vpc:existing:storage:logs",
     )
 
-    log_location_arn = convert_s3a_to_arn(log_location)
-    log_bucket_name = parse_arn(log_location_arn)["resource_type"]
-    log_bucket_arn = convert_s3a_to_arn(f"s3a://{log_bucket_name}")
+    log_bucket_arn = get_s3_location(log_location).bucket_arn
 
     simulate_policy(
         iam_client=iam_client,
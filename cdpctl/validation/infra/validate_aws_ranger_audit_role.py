@@ -47,10 +47,9 @@ from boto3_type_annotations.iam import Client as IAMClient
 
 from cdpctl.validation import fail, get_config_value
 from cdpctl.validation.aws_utils import (
-    convert_s3a_to_arn,
     get_client,
     get_role,
-    parse_arn,
+    get_s3_location,
     simulate_policy,
 )
 from cdpctl.validation.infra.issues import (
@@ -98,7 +97,7 @@ def aws_ranger_audit_role_data_location_exist_validation(
         "infra:aws:vpc:existing:storage:data",
     )
     # data access s3 bucket arn
-    data_location_arn = convert_s3a_to_arn(data_location)
+    data_location_arn = get_s3_location(data_location).arn
 
     ranger_audit_data["data_location"] = data_location
     ranger_audit_data["data_location_arn"] = data_location_arn
@@ -115,7 +114,7 @@ def aws_ranger_audit_role_backup_location_exist_validation(
         "infra:aws:vpc:existing:storage:backup",
     )
     # backup access s3 bucket arn
-    backup_location_arn = convert_s3a_to_arn(backup_location)
+    backup_location_arn = get_s3_location(backup_location).arn
 
     ranger_audit_data["backup_location"] = backup_location
     ranger_audit_data["backup_location_arn"] = backup_location_arn
@@ -133,9 +132,9 @@ def aws_ranger_audit_role_audit_location_exist_validation(
     )
 
     # ranger audit s3 bucket arn
-    ranger_audit_location_arn = convert_s3a_to_arn(ranger_audit_location)
-    ranger_audit_bucket_name = parse_arn(ranger_audit_location_arn)["resource_type"]
-    ranger_audit_bucket_arn = convert_s3a_to_arn(f"s3a://{ranger_audit_bucket_name}")
+    ranger_audit_s3_location = get_s3_location(ranger_audit_location)
+    ranger_audit_location_arn = ranger_audit_s3_location.arn
+    ranger_audit_bucket_arn = ranger_audit_s3_location.bucket_arn
 
     ranger_audit_data["ranger_audit_location"] = ranger_audit_location
     ranger_audit_data["ranger_audit_bucket_arn"] = ranger_audit_bucket_arn
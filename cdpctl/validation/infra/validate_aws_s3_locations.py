@@ -42,16 +42,16 @@
 """Validation of the storage locations."""
 from typing import Any, Dict
 
-import botocore
 import pytest
 from boto3_type_annotations.s3 import Client as S3Client
 
 from cdpctl.validation import fail, get_config_value, validator
 from cdpctl.validation.aws_utils import (
-    convert_s3a_to_arn,
+    S3LocationResolver,
     get_client,
+    get_s3_location,
+    get_s3_location_resolver,
     is_valid_s3a_url,
-    parse_arn,
 )
 from cdpctl.validation.infra.issues import (
     AWS_S3_BUCKET_DOES_NOT_EXIST,
@@ -88,7 +88,9 @@ def aws_s3_data_bucket_exists(config: Dict[str, Any], s3_client: S3Client) -> No
         config,
         "infra:aws:region",
     )
-    aws_s3_bucket_exists(region, data_bucket_url, s3_client)
+    aws_s3_bucket_exists(
+        region, data_bucket_url, get_s3_location_resolver(config, s3_client)
+    )
 
 
 @pytest.mark.aws
@@ -112,16 +114,17 @@ def aws_s3_logs_bucket_exists(config: Dict[str, Any], s3_client: S3Client) -> No
         config,
         "infra:aws:region",
     )
-    aws_s3_bucket_exists(region, logs_bucket_url, s3_client)
+    aws_s3_bucket_exists(
+        region, logs_bucket_url, get_s3_location_resolver(config, s3_client)
+    )
 
 
 @pytest.mark.aws
 @pytest.mark.infra
 def aws_s3_backup_bucket_exists_validation(
-    config: Dict[str, Any]
+    config: Dict[str, Any], s3_client: S3Client
 ) -> None:  # pragma: no cover
     """S3 backup storage location exists."""  # noqa: D401,E501
-    s3_client: S3Client = get_client("s3", config)
     aws_s3_backup_bucket_exists(config, s3_client)
 
 
@@ -138,29 +141,24 @@ def aws_s3_backup_bucket_exists(config: Dict[str, Any], s3_client: S3Client) ->
         "infra:aws:region",
     )
     # TODO: Handle a specific parameter for backup S3 location once it exists
-    aws_s3_bucket_exists(region, backup_bucket_url, s3_client)
+    aws_s3_bucket_exists(
+        region, backup_bucket_url, get_s3_location_resolver(config, s3_client)
+    )
 
 
-def aws_s3_bucket_exists(region: str, bucket_url: str, s3_client: S3Client) -> None:
+def aws_s3_bucket_exists(
+    region: str, bucket_url: str, resolver: S3LocationResolver
+) -> None:
     """Check to see if the s3 bucket exists."""
     if not is_valid_s3a_url(bucket_url):
         fail(AWS_S3_BUCKET_INVALID, bucket_url)
 
-    # get bucket name
-    bucket_name = parse_arn(convert_s3a_to_arn(bucket_url))["resource_type"]
-
+    bucket_name = get_s3_location(bucket_url).bucket_name
+    status = resolver.get_bucket_status(bucket_name)
+    if not status.exists:
+        fail(AWS_S3_BUCKET_DOES_NOT_EXIST, bucket_name)
+    if status.forbidden:
+        fail(AWS_S3_BUCKET_FORBIDDEN_ACCESS, bucket_name)
     # check if bucket exists in same region
-    try:
-        if (
-            s3_client.get_bucket_location(Bucket=bucket_name)["LocationConstraint"]
-            != region
-        ):
-            fail(AWS_S3_BUCKET_NOT_IN_SAME_REGION_AS_ENVIRONMENT, bucket_name)
-    except botocore.exceptions.ClientError as e:
-        # if a client error is thrown, check if it is a NoSuchBucket error
-        # if NoSuchBucket error thrown, the bucket does not exist
-        error_code = e.response["Error"]["Code"]
-        if error_code == "NoSuchBucket":
-            fail(AWS_S3_BUCKET_DOES_NOT_EXIST, bucket_name)
-        elif int(error_code) == 403:
-            fail(AWS_S3_BUCKET_FORBIDDEN_ACCESS, bucket_name)
+    if status.region != region:
+        fail(AWS_S3_BUCKET_NOT_IN_SAME_REGION_AS_ENVIRONMENT, bucket_name)
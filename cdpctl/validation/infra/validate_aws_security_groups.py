@@ -46,7 +46,7 @@ import pytest
 from boto3_type_annotations.ec2 import Client as EC2Client
 
 from cdpctl.validation import fail, get_config_value, validator
-from cdpctl.validation.aws_utils import get_client
+from cdpctl.validation.aws_utils import fetch_security_groups, fetch_vpcs, get_client
 from cdpctl.validation.infra.issues import (
     AWS_DEFAULT_SG_NEEDS_ALLOW_ACCESS_INTERNAL_TO_VPC,
     AWS_GATEWAY_SG_NEEDS_ALLOW_ACCESS_INTERNAL_TO_VPC,
@@ -87,9 +87,11 @@ def _aws_default_security_groups_contains_cdp_cidr_validation(
         "infra:aws:vpc:existing:security_groups:default_id",
     )
 
-    security_groups = ec2_client.describe_security_groups(
-        GroupIds=[default_security_groups_id]
-    )
+    security_groups = {
+        "SecurityGroups": fetch_security_groups(
+            ec2_client, [default_security_groups_id]
+        )
+    }
 
     missing_cdp_cidr_9443 = []
 
@@ -144,9 +146,11 @@ def _aws_gateway_security_groups_contains_cdp_cidr_validation(
         "infra:aws:vpc:existing:security_groups:knox_id",
     )
 
-    security_groups = ec2_client.describe_security_groups(
-        GroupIds=[gateway_security_groups_id]
-    )
+    security_groups = {
+        "SecurityGroups": fetch_security_groups(
+            ec2_client, [gateway_security_groups_id]
+        )
+    }
 
     missing_cdp_cidr_443 = []
     missing_cdp_cidr_9443 = []
@@ -206,14 +210,16 @@ def security_groups_contains_vpc_cidr(
         "infra:aws:vpc:existing:vpc_id",
     )
 
-    vpcs = ec2_client.describe_vpcs(VpcIds=[vpc_id])
+    vpcs = {"Vpcs": fetch_vpcs(ec2_client, [vpc_id])}
 
     if len(vpcs["Vpcs"]) == 0:
         fail(AWS_VPC_NOT_FOUND_IN_ACCOUNT, subjects=[vpc_id])
 
     vpc_cidr = vpcs["Vpcs"][0]["CidrBlock"]
 
-    security_groups = ec2_client.describe_security_groups(GroupIds=[security_groups_id])
+    security_groups = {
+        "SecurityGroups": fetch_security_groups(ec2_client, [security_groups_id])
+    }
 
     found_vpc_cidr = False
 
@@ -47,7 +47,7 @@ import pytest
 from boto3_type_annotations.iam import Client as EC2Client
 
 from cdpctl.validation import fail, get_config_value
-from cdpctl.validation.aws_utils import get_client
+from cdpctl.validation.aws_utils import fetch_key_pairs, get_client
 from cdpctl.validation.infra.issues import (
     AWS_REQUIRED_DATA_MISSING,
     AWS_SSH_IS_INVALID,
@@ -76,7 +76,7 @@ def aws_ssh_key_validation(
             "globals:ssh:public_key_id",
         )
 
-        key_pairs = ec2_client.describe_key_pairs(KeyPairIds=[ssh_key_id])["KeyPairs"]
+        key_pairs = fetch_key_pairs(ec2_client, [ssh_key_id])
         if not key_pairs:
             fail(AWS_SSH_KEY_ID_DOES_NOT_EXIST, ssh_key_id)
     except KeyError as e:
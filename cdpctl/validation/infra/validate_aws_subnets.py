@@ -47,7 +47,15 @@ import pytest
 from boto3_type_annotations.iam import Client as EC2Client
 
 from cdpctl.validation import fail, get_config_value, warn
-from cdpctl.validation.aws_utils import get_client
+from cdpctl.validation.aws_utils import (
+    fetch_subnets,
+    fetch_vpcs,
+    get_client,
+    iter_internet_gateway_ids,
+    iter_nat_gateway_ids,
+    iter_route_tables,
+    iter_vpc_subnet_ids,
+)
 from cdpctl.validation.infra.issues import (
     AWS_DNS_SUPPORT_NOT_ENABLED_FOR_VPC,
     AWS_INVALID_DATA,
@@ -93,7 +101,7 @@ def aws_public_subnets_validation(
 
     try:
         # query subnets
-        subnets = ec2_client.describe_subnets(SubnetIds=public_subnets)
+        subnets = {"Subnets": fetch_subnets(ec2_client, public_subnets)}
         missing_subnets = []
         for pu_id in public_subnets:
             missing_subnets.append(pu_id)
@@ -137,57 +145,31 @@ def aws_public_subnets_route_validation(
 ) -> None:
     """Public subnets have internet gateway(s)."""  # noqa: D401,E501
     try:
-        subnets_route_tables = ec2_client.describe_route_tables(
-            Filters=[
-                {
-                    "Name": "association.subnet-id",
-                    "Values": subnets_data["public_subnets_ids"],
-                },
-                {
-                    "Name": "route.state",
-                    "Values": ["active"],
-                },
-            ]
-        )["RouteTables"]
-        vpc_id: List[str] = get_config_value(
+        vpc_id: str = get_config_value(
             config,
             "infra:aws:vpc:existing:vpc_id",
         )
-        Filters = [
-            {
-                "Name": "attachment.vpc-id",
-                "Values": [vpc_id],
-            },
-            {
-                "Name": "attachment.state",
-                "Values": ["available"],
-            },
-        ]
-        igws = ec2_client.describe_internet_gateways(Filters=Filters)[
-            "InternetGateways"
-        ]
-        if len(igws) > 0 and len(subnets_route_tables) > 0:
-            igw_ids = [i["InternetGatewayId"] for i in igws]
-            gateway_ids = []
-            for route_table in subnets_route_tables:
-                routes = route_table["Routes"]
-                for route in routes:
-                    if "GatewayId" in route:
-                        gateway_ids.append(route["GatewayId"])
-        else:
+        igw_ids = set(iter_internet_gateway_ids(ec2_client, vpc_id))
+        has_route_tables = False
+        if igw_ids:
+            # stop paging the route tables at the first routing to a gateway
+            for route_table in iter_route_tables(
+                ec2_client, subnets_data["public_subnets_ids"]
+            ):
+                has_route_tables = True
+                if not igw_ids.isdisjoint(route_table.gateway_ids):
+                    return
+        if not has_route_tables:
             fail(
                 AWS_SUBNETS_OR_VPC_WITHOUT_INTERNET_GATEWAY,
                 subjects=["Public", vpc_id],
                 resources=subnets_data["public_subnets_ids"],
             )
-
-        if not set(igw_ids) & set(gateway_ids):
-            fail(
-                AWS_SUBNETS_WITHOUT_INTERNET_GATEWAY,
-                subjects=["Public"],
-                resources=subnets_data["public_subnets_ids"],
-            )
-
+        fail(
+            AWS_SUBNETS_WITHOUT_INTERNET_GATEWAY,
+            subjects=["Public"],
+            resources=subnets_data["public_subnets_ids"],
+        )
     except KeyError as e:
         fail(AWS_REQUIRED_DATA_MISSING, e.args[0])
     except ec2_client.exceptions.ClientError as ce:
@@ -262,7 +244,7 @@ def aws_private_subnets_validation(
 
     try:
         # query subnets
-        subnets = ec2_client.describe_subnets(SubnetIds=private_subnets)
+        subnets = {"Subnets": fetch_subnets(ec2_client, private_subnets)}
         missing_subnets = []
         for pvt_id in private_subnets:
             missing_subnets.append(pvt_id)
@@ -309,54 +291,31 @@ def aws_private_subnets_route_validation(
 ) -> None:
     """Private subnets have NAT gateway(s)."""  # noqa: D401,E501
     try:
-        subnets_route_tables = ec2_client.describe_route_tables(
-            Filters=[
-                {
-                    "Name": "association.subnet-id",
-                    "Values": subnets_data["private_subnets_ids"],
-                },
-                {
-                    "Name": "route.state",
-                    "Values": ["active"],
-                },
-            ]
-        )["RouteTables"]
-        vpc_id: List[str] = get_config_value(
+        vpc_id: str = get_config_value(
             config,
             "infra:aws:vpc:existing:vpc_id",
         )
-        Filters = [
-            {
-                "Name": "vpc-id",
-                "Values": [vpc_id],
-            },
-            {
-                "Name": "state",
-                "Values": ["available"],
-            },
-        ]
-        nat_gws = ec2_client.describe_nat_gateways(Filters=Filters)["NatGateways"]
-        if len(nat_gws) > 0 and len(subnets_route_tables) > 0:
-            igw_ids = [i["NatGatewayId"] for i in nat_gws]
-            gateway_ids = []
-            for route_table in subnets_route_tables:
-                routes = route_table["Routes"]
-                for route in routes:
-                    if "NatGatewayId" in route:
-                        gateway_ids.append(route["NatGatewayId"])
-        else:
+        nat_gw_ids = set(iter_nat_gateway_ids(ec2_client, vpc_id))
+        has_route_tables = False
+        if nat_gw_ids:
+            # stop paging the route tables at the first routing to a gateway
+            for route_table in iter_route_tables(
+                ec2_client, subnets_data["private_subnets_ids"]
+            ):
+                has_route_tables = True
+                if not nat_gw_ids.isdisjoint(route_table.nat_gateway_ids):
+                    return
+        if not has_route_tables:
             fail(
                 AWS_SUBNETS_OR_VPC_WITHOUT_INTERNET_GATEWAY,
                 subjects=["Private", vpc_id],
-                resources=subnets_data["public_subnets_ids"],
+                resources=subnets_data["private_subnets_ids"],
             )
-        if not set(igw_ids) & set(gateway_ids):
-            fail(
-                AWS_SUBNETS_WITHOUT_INTERNET_GATEWAY,
-                subjects=["Private"],
-                resources=subnets_data["public_subnets_ids"],
-            )
-
+        fail(
+            AWS_SUBNETS_WITHOUT_INTERNET_GATEWAY,
+            subjects=["Private"],
+            resources=subnets_data["private_subnets_ids"],
+        )
     except KeyError as e:
         fail(AWS_REQUIRED_DATA_MISSING, e.args[0])
     except ec2_client.exceptions.ClientError as ce:
@@ -451,18 +410,18 @@ def aws_vpc_subnets_validation(
         "infra:aws:vpc:existing:vpc_id",
     )
     try:
-        vpc_d = ec2_client.describe_vpcs(VpcIds=[vpc_id])
-        filters = [{"Name": "vpc-id", "Values": [vpc_d["Vpcs"][0]["VpcId"]]}]
-        subnets_new = ec2_client.describe_subnets(Filters=filters)["Subnets"]
-        vpc_subnets = [i["SubnetId"] for i in subnets_new]
-        # check provided subnets belong to provided vpc
-        missing_subnets = []
-        for private_id in subnets_data["private_subnets_ids"]:
-            if private_id not in vpc_subnets:
-                missing_subnets.append(private_id)
-        for public_id in subnets_data["public_subnets_ids"]:
-            if public_id not in vpc_subnets:
-                missing_subnets.append(public_id)
+        vpc_d = {"Vpcs": fetch_vpcs(ec2_client, [vpc_id])}
+        # check provided subnets belong to provided vpc, stop paging the
+        # subnets of the vpc once all of them are found
+        missing_subnets = (
+            subnets_data["private_subnets_ids"] + subnets_data["public_subnets_ids"]
+        )
+        unseen_subnets = set(missing_subnets)
+        for subnet_id in iter_vpc_subnet_ids(ec2_client, vpc_d["Vpcs"][0]["VpcId"]):
+            unseen_subnets.discard(subnet_id)
+            if not unseen_subnets:
+                break
+        missing_subnets = [i for i in missing_subnets if i in unseen_subnets]
 
         if len(missing_subnets) > 0:
             fail(
@@ -46,7 +46,7 @@ import pytest
 from azure.storage.filedatalake import DataLakeServiceClient
 
 from cdpctl.validation import fail, get_config_value
-from cdpctl.validation.azure_utils import get_client, parse_adls_path
+from cdpctl.validation.azure_utils import get_adls_resolver, get_client, parse_adls_path
 from cdpctl.validation.issues import (
     AZURE_INVALID_STORAGE_HAS_BEEN_DEFINED,
     AZURE_STORAGE_CONTAINER_DOES_NOT_EXIST,
@@ -78,9 +78,8 @@ def azure_adls_data_storage_validation(
             data_expected_issue=AZURE_STORAGE_NOT_DEFINED,
         )
         parsed_url = parse_adls_path(data_path)
-        service_client = dls_client(config, parsed_url[0])
-        fsc = service_client.get_file_system_client(file_system=parsed_url[1])
-        if not fsc.exists():
+        resolver = get_adls_resolver(config, lambda url: dls_client(config, url))
+        if not resolver.container_exists(parsed_url[0], parsed_url[1]):
             fail(
                 template=AZURE_STORAGE_CONTAINER_DOES_NOT_EXIST,
                 subjects=[data_path],
@@ -106,9 +105,8 @@ def azure_adls_logs_storage_validation(
             data_expected_issue=AZURE_STORAGE_NOT_DEFINED,
         )
         parsed_url = parse_adls_path(logs_path)
-        service_client = dls_client(config, parsed_url[0])
-        fsc = service_client.get_file_system_client(file_system=parsed_url[1])
-        if not fsc.exists():
+        resolver = get_adls_resolver(config, lambda url: dls_client(config, url))
+        if not resolver.container_exists(parsed_url[0], parsed_url[1]):
             fail(
                 template=AZURE_STORAGE_CONTAINER_DOES_NOT_EXIST,
                 subjects=[parsed_url[1]],
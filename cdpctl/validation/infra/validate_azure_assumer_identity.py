@@ -48,10 +48,9 @@ from azure.mgmt.resource import ResourceManagementClient
 
 from cdpctl.validation import fail, get_config_value
 from cdpctl.validation.azure_utils import (
-    check_for_actions,
     get_client,
+    get_permission_index,
     get_resource_group_scope,
-    get_role_assignments,
     get_storage_container_scope,
     parse_adls_path,
 )
@@ -100,7 +99,7 @@ def azure_assumer_identity_exists_validation(
         config=config, key="env:azure:role:name:idbroker"
     )
 
-    _assumer_info["assignments"] = get_role_assignments(
+    _assumer_info["permissions"] = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=_assumer_info["name"],
@@ -114,7 +113,6 @@ def azure_assumer_identity_exists_validation(
 @pytest.mark.dependency(depends=["azure_assumer_identity_exists_validation"])
 def azure_assumer_logs_actions_validation(
     config: Dict[str, Any],
-    auth_client: AuthorizationManagementClient,
     azure_assumer_required_logs_actions: List[str],
     assumer_info,
 ) -> None:  # pragma: no cover
@@ -130,10 +128,8 @@ def azure_assumer_logs_actions_validation(
         assumer_info["sub_id"], assumer_info["rg_name"], storage_name, container_name
     )
 
-    missing_actions, _ = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=assumer_info["assignments"],
-        proper_scope=proper_scope,
+    missing_actions, _ = assumer_info["permissions"].get_missing_actions(
+        scope=proper_scope,
         required_actions=azure_assumer_required_logs_actions,
         required_data_actions=[],
     )
@@ -154,7 +150,6 @@ def azure_assumer_logs_actions_validation(
 @pytest.mark.dependency(depends=["azure_assumer_identity_exists_validation"])
 def azure_assumer_logs_data_actions_validation(
     config: Dict[str, Any],
-    auth_client: AuthorizationManagementClient,
     azure_assumer_required_logs_data_actions: List[str],
     assumer_info,
 ) -> None:  # pragma: no cover
@@ -170,10 +165,8 @@ def azure_assumer_logs_data_actions_validation(
         assumer_info["sub_id"], assumer_info["rg_name"], storage_name, container_name
     )
 
-    _, missing_data_actions = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=assumer_info["assignments"],
-        proper_scope=proper_scope,
+    _, missing_data_actions = assumer_info["permissions"].get_missing_actions(
+        scope=proper_scope,
         required_actions=[],
         required_data_actions=azure_assumer_required_logs_data_actions,
     )
@@ -193,7 +186,6 @@ def azure_assumer_logs_data_actions_validation(
 @pytest.mark.infra
 @pytest.mark.dependency(depends=["azure_assumer_identity_exists_validation"])
 def azure_assumer_rg_actions_validation(
-    auth_client: AuthorizationManagementClient,
     azure_assumer_required_resource_group_actions: List[str],
     assumer_info,
 ) -> None:  # pragma: no cover
@@ -203,10 +195,8 @@ def azure_assumer_rg_actions_validation(
         subscription_id=assumer_info["sub_id"], resource_group=assumer_info["rg_name"]
     )
 
-    missing_actions, _ = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=assumer_info["assignments"],
-        proper_scope=proper_scope,
+    missing_actions, _ = assumer_info["permissions"].get_missing_actions(
+        scope=proper_scope,
         required_actions=azure_assumer_required_resource_group_actions,
         required_data_actions=[],
     )
@@ -52,10 +52,9 @@ from azure.mgmt.resource import ResourceManagementClient
 
 from cdpctl.validation import fail, get_config_value
 from cdpctl.validation.azure_utils import (
-    check_for_actions,
     get_client,
+    get_permission_index,
     get_resource_group_scope,
-    get_role_assignments,
 )
 from cdpctl.validation.infra.issues import (
     AZURE_IDENTITY_MISSING_ACTIONS_FOR_LOCATION,
@@ -102,7 +101,7 @@ def azure_cross_account_identity_exists_validation(
         config=config, key="env:azure:role:name:cross_account"
     )
 
-    _cross_account_info["assignments"] = get_role_assignments(
+    _cross_account_info["permissions"] = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=_cross_account_info["name"],
@@ -115,7 +114,6 @@ def azure_cross_account_identity_exists_validation(
 @pytest.mark.infra
 @pytest.mark.dependency(depends=["azure_cross_account_identity_exists_validation"])
 def azure_cross_account_rg_actions_validation(
-    auth_client: AuthorizationManagementClient,
     azure_cross_account_required_resource_group_actions: List[str],
     cross_account_info,
 ) -> None:  # pragma: no cover
@@ -126,10 +124,8 @@ def azure_cross_account_rg_actions_validation(
         resource_group=cross_account_info["rg_name"],
     )
 
-    missing_actions, _ = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=cross_account_info["assignments"],
-        proper_scope=proper_scope,
+    missing_actions, _ = cross_account_info["permissions"].get_missing_actions(
+        scope=proper_scope,
         required_actions=azure_cross_account_required_resource_group_actions,
         required_data_actions=[],
     )
@@ -149,7 +145,6 @@ def azure_cross_account_rg_actions_validation(
 @pytest.mark.infra
 @pytest.mark.dependency(depends=["azure_cross_account_identity_exists_validation"])
 def azure_cross_account_rg_data_actions_validation(
-    auth_client: AuthorizationManagementClient,
     azure_cross_account_required_resource_group_data_actions: List[str],
     cross_account_info,
 ) -> None:  # pragma: no cover
@@ -160,10 +155,8 @@ def azure_cross_account_rg_data_actions_validation(
         resource_group=cross_account_info["rg_name"],
     )
 
-    _, missing_data_actions = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=cross_account_info["assignments"],
-        proper_scope=proper_scope,
+    _, missing_data_actions = cross_account_info["permissions"].get_missing_actions(
+        scope=proper_scope,
         required_actions=[],
         required_data_actions=azure_cross_account_required_resource_group_data_actions,
     )
@@ -48,9 +48,8 @@ from azure.mgmt.resource import ResourceManagementClient
 
 from cdpctl.validation import fail, get_config_value
 from cdpctl.validation.azure_utils import (
-    check_for_actions,
     get_client,
-    get_role_assignments,
+    get_permission_index,
     get_storage_container_scope,
     parse_adls_path,
 )
@@ -107,7 +106,7 @@ def _azure_dladmin_logs_storage_actions_check(
     parsed_logger_path = parse_adls_path(log_path)
     container_name = parsed_logger_path[1]
 
-    role_assignments = get_role_assignments(
+    permission_index = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=datalake_admin,
@@ -119,10 +118,8 @@ def _azure_dladmin_logs_storage_actions_check(
         sub_id, rg_name, storage_name, container_name
     )
 
-    missing_actions, _ = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=role_assignments,
-        proper_scope=proper_scope,
+    missing_actions, _ = permission_index.get_missing_actions(
+        scope=proper_scope,
         required_actions=azure_data_required_actions,
         required_data_actions=[],
     )
@@ -173,7 +170,7 @@ def _azure_dladmin_logs_storage_data_actions_check(
     parsed_logger_path = parse_adls_path(log_path)
     container_name = parsed_logger_path[1]
 
-    role_assignments = get_role_assignments(
+    permission_index = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=datalake_admin,
@@ -185,10 +182,8 @@ def _azure_dladmin_logs_storage_data_actions_check(
         sub_id, rg_name, storage_name, container_name
     )
 
-    _, missing_data_actions = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=role_assignments,
-        proper_scope=proper_scope,
+    _, missing_data_actions = permission_index.get_missing_actions(
+        scope=proper_scope,
         required_actions=[],
         required_data_actions=azure_data_required_data_actions,
     )
@@ -238,7 +233,7 @@ def _azure_dladmin_data_storage_actions_check(
     parsed_data_path = parse_adls_path(data_path)
     container_name = parsed_data_path[1]
 
-    role_assignments = get_role_assignments(
+    permission_index = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=datalake_admin,
@@ -250,10 +245,8 @@ def _azure_dladmin_data_storage_actions_check(
         sub_id, rg_name, storage_name, container_name
     )
 
-    missing_actions, _ = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=role_assignments,
-        proper_scope=proper_scope,
+    missing_actions, _ = permission_index.get_missing_actions(
+        scope=proper_scope,
         required_actions=azure_data_required_actions,
         required_data_actions=[],
     )
@@ -304,7 +297,7 @@ def _azure_dladmin_data_storage_data_actions_check(
     parsed_data_path = parse_adls_path(data_path)
     container_name = parsed_data_path[1]
 
-    role_assignments = get_role_assignments(
+    permission_index = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=datalake_admin,
@@ -316,10 +309,8 @@ def _azure_dladmin_data_storage_data_actions_check(
         sub_id, rg_name, storage_name, container_name
     )
 
-    _, missing_data_actions = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=role_assignments,
-        proper_scope=proper_scope,
+    _, missing_data_actions = permission_index.get_missing_actions(
+        scope=proper_scope,
         required_actions=[],
         required_data_actions=azure_data_required_data_actions,
     )
@@ -371,7 +362,7 @@ def _azure_dladmin_backup_storage_actions_check(
     parsed_logger_path = parse_adls_path(backup_path)
     container_name = parsed_logger_path[1]
 
-    role_assignments = get_role_assignments(
+    permission_index = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=datalake_admin,
@@ -383,10 +374,8 @@ def _azure_dladmin_backup_storage_actions_check(
         sub_id, rg_name, storage_name, container_name
     )
 
-    missing_actions, _ = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=role_assignments,
-        proper_scope=proper_scope,
+    missing_actions, _ = permission_index.get_missing_actions(
+        scope=proper_scope,
         required_actions=azure_data_required_actions,
         required_data_actions=[],
     )
@@ -439,7 +428,7 @@ def _azure_dladmin_backup_storage_data_actions_check(
     parsed_logger_path = parse_adls_path(backup_path)
     container_name = parsed_logger_path[1]
 
-    role_assignments = get_role_assignments(
+    permission_index = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=datalake_admin,
@@ -451,10 +440,8 @@ def _azure_dladmin_backup_storage_data_actions_check(
         sub_id, rg_name, storage_name, container_name
     )
 
-    _, missing_data_actions = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=role_assignments,
-        proper_scope=proper_scope,
+    _, missing_data_actions = permission_index.get_missing_actions(
+        scope=proper_scope,
         required_actions=[],
         required_data_actions=azure_data_required_data_actions,
     )
@@ -48,9 +48,8 @@ from azure.mgmt.resource import ResourceManagementClient
 
 from cdpctl.validation import fail, get_config_value
 from cdpctl.validation.azure_utils import (
-    check_for_actions,
     get_client,
-    get_role_assignments,
+    get_permission_index,
     get_storage_container_scope,
     parse_adls_path,
 )
@@ -108,7 +107,7 @@ def _azure_ranger_audit_container_actions_check(
     parsed_path = parse_adls_path(path)
     container_name = parsed_path[1]
 
-    role_assignments = get_role_assignments(
+    permission_index = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=ident_name,
@@ -120,10 +119,8 @@ def _azure_ranger_audit_container_actions_check(
         sub_id, rg_name, storage_name, container_name
     )
 
-    missing_actions, _ = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=role_assignments,
-        proper_scope=proper_scope,
+    missing_actions, _ = permission_index.get_missing_actions(
+        scope=proper_scope,
         required_actions=azure_actions_required_actions,
         required_data_actions=[],
     )
@@ -175,7 +172,7 @@ def _azure_ranger_audit_container_data_actions_check(
     parsed_path = parse_adls_path(path)
     container_name = parsed_path[1]
 
-    role_assignments = get_role_assignments(
+    permission_index = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=ident_name,
@@ -187,10 +184,8 @@ def _azure_ranger_audit_container_data_actions_check(
         sub_id, rg_name, storage_name, container_name
     )
 
-    _, missing_data_actions = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=role_assignments,
-        proper_scope=proper_scope,
+    _, missing_data_actions = permission_index.get_missing_actions(
+        scope=proper_scope,
         required_actions=[],
         required_data_actions=azure_ranger_audit_required_data_actions,
     )
@@ -242,7 +237,7 @@ def _azure_ranger_audit_backup_storage_actions_check(
     parsed_path = parse_adls_path(path)
     container_name = parsed_path[1]
 
-    role_assignments = get_role_assignments(
+    permission_index = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=ident_name,
@@ -254,10 +249,8 @@ def _azure_ranger_audit_backup_storage_actions_check(
         sub_id, rg_name, storage_name, container_name
     )
 
-    missing_actions, _ = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=role_assignments,
-        proper_scope=proper_scope,
+    missing_actions, _ = permission_index.get_missing_actions(
+        scope=proper_scope,
         required_actions=azure_actions_required_actions,
         required_data_actions=[],
     )
@@ -309,7 +302,7 @@ def _azure_ranger_audit_backup_storage_data_actions_check(
     parsed_path = parse_adls_path(path)
     container_name = parsed_path[1]
 
-    role_assignments = get_role_assignments(
+    permission_index = get_permission_index(
         auth_client=auth_client,
         resource_client=resource_client,
         identity_name=ident_name,
@@ -321,10 +314,8 @@ def _azure_ranger_audit_backup_storage_data_actions_check(
         sub_id, rg_name, storage_name, container_name
     )
 
-    _, missing_data_actions = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=role_assignments,
-        proper_scope=proper_scope,
+    _, missing_data_actions = permission_index.get_missing_actions(
+        scope=proper_scope,
         required_actions=[],
         required_data_actions=azure_ranger_audit_required_data_actions,
     )
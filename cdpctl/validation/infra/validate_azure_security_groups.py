@@ -46,7 +46,7 @@ from azure.core.exceptions import ResourceNotFoundError
 from azure.mgmt.network import NetworkManagementClient
 
 from cdpctl.validation import fail, get_config_value, validator, warn
-from cdpctl.validation.azure_utils import get_client
+from cdpctl.validation.azure_utils import get_network_snapshot
 from cdpctl.validation.infra.issues import (
     AZURE_CDP_CIDR_ACCESS_NOT_ALLOWED_FOR_PORT,
     AZURE_NSG_NOT_FOUND,
@@ -55,60 +55,36 @@ from cdpctl.validation.infra.issues import (
     AZURE_VNET_NOT_FOUND,
 )
 
-_info = {}
-
-
-@pytest.fixture(autouse=True, name="azure_network_client")
-def azure_network_client_fixture(config: Dict[str, Any]) -> NetworkManagementClient:
-    """Return an Azure Client."""
-    return get_client("network", config)
-
-
-def _load_vnet_info(vnet_name, resource_group_name, azure_network_client):
-    if "vnet" not in _info:
-        try:
-            _info["vnet"] = azure_network_client.virtual_networks.get(
-                virtual_network_name=vnet_name, resource_group_name=resource_group_name
-            )
-        except ResourceNotFoundError:
-            fail(AZURE_VNET_NOT_FOUND, [vnet_name, resource_group_name])
-
-
-@pytest.fixture(name="azure_resource_group_name")
-def azure_resource_group_name_fixture(config: Dict[str, Any]):
-    """Return the resource group name."""
-    return get_config_value(config=config, key="infra:azure:metagroup:name")
-
-
-@pytest.fixture(name="azure_vnet_name")
-def azure_vnet_name_fixture(config: Dict[str, Any]):
-    """Return the vnet name."""
-    return get_config_value(config=config, key="infra:vpc:name")
-
 
 @pytest.fixture(name="azure_vnet_info")
-def azure_vnet_info_fixture(
-    azure_vnet_name, azure_resource_group_name, azure_network_client
-):
+def azure_vnet_info_fixture(azure_network_snapshot):
     """Return the vnet info."""
-    _load_vnet_info(
-        vnet_name=azure_vnet_name,
-        resource_group_name=azure_resource_group_name,
-        azure_network_client=azure_network_client,
-    )
-    return _info["vnet"]
+    try:
+        return azure_network_snapshot.get_vnet()
+    except ResourceNotFoundError:
+        fail(
+            AZURE_VNET_NOT_FOUND,
+            [
+                azure_network_snapshot.vnet_name,
+                azure_network_snapshot.resource_group_name,
+            ],
+        )
 
 
 @pytest.fixture(name="azure_default_nsg_info")
-def azure_default_nsg_info_fixture():
+def azure_default_nsg_info_fixture(config: Dict[str, Any], azure_network_snapshot):
     """Return the default nsg info."""
-    return _info["default_nsg"]
+    return azure_network_snapshot.get_security_group(
+        get_config_value(config=config, key="infra:security_group:default:name")
+    )
 
 
 @pytest.fixture(name="azure_knox_nsg_info")
-def azure_knox_nsg_info_fixture():
+def azure_knox_nsg_info_fixture(config: Dict[str, Any], azure_network_snapshot):
     """Return the knox NSG info."""
-    return _info["knox_nsg"]
+    return azure_network_snapshot.get_security_group(
+        get_config_value(config=config, key="infra:security_group:knox:name")
+    )
 
 
 @pytest.mark.azure
@@ -133,18 +109,10 @@ def azure_default_security_group_exists(
     azure_network_client: NetworkManagementClient,
 ) -> None:  # pragma: no cover
     """Check that the Security Group exists."""  # noqa: D401,E501
-    resource_group_name = get_config_value(
-        config=config, key="infra:azure:metagroup:name"
-    )
+    snapshot = get_network_snapshot(config, azure_network_client)
     nsg_name = get_config_value(config=config, key="infra:security_group:default:name")
-    try:
-        _info["default_nsg"] = azure_network_client.network_security_groups.get(
-            resource_group_name=resource_group_name,
-            network_security_group_name=nsg_name,
-        )
-        pass
-    except ResourceNotFoundError:
-        fail(AZURE_NSG_NOT_FOUND, ["Default", nsg_name, resource_group_name])
+    if snapshot.get_security_group(nsg_name) is None:
+        fail(AZURE_NSG_NOT_FOUND, ["Default", nsg_name, snapshot.resource_group_name])
 
 
 @pytest.mark.azure
@@ -169,18 +137,10 @@ def azure_knox_security_group_exists(
     azure_network_client: NetworkManagementClient,
 ) -> None:
     """Check that the Security Group exists."""  # noqa: D401,E501
-    resource_group_name = get_config_value(
-        config=config, key="infra:azure:metagroup:name"
-    )
+    snapshot = get_network_snapshot(config, azure_network_client)
     nsg_name = get_config_value(config=config, key="infra:security_group:knox:name")
-    try:
-        _info["knox_nsg"] = azure_network_client.network_security_groups.get(
-            resource_group_name=resource_group_name,
-            network_security_group_name=nsg_name,
-        )
-        pass
-    except ResourceNotFoundError:
-        fail(AZURE_NSG_NOT_FOUND, ["Knox", nsg_name, resource_group_name])
+    if snapshot.get_security_group(nsg_name) is None:
+        fail(AZURE_NSG_NOT_FOUND, ["Knox", nsg_name, snapshot.resource_group_name])
 
 
 def _do_ranges_cover_all(port_ranges):
@@ -46,8 +46,8 @@ import pytest
 from azure.core.exceptions import ResourceNotFoundError
 from azure.mgmt.network import NetworkManagementClient
 
-from cdpctl.validation import fail, get_config_value, validator, warn
-from cdpctl.validation.azure_utils import get_client
+from cdpctl.validation import fail, validator, warn
+from cdpctl.validation.azure_utils import get_network_snapshot
 from cdpctl.validation.infra.issues import (
     AZURE_VNET_ADDRESS_SPACE_HAS_PUBLIC_CIDRS,
     AZURE_VNET_ADDRESS_SPACE_OVERLAPS_RESERVED,
@@ -64,14 +64,13 @@ from cdpctl.validation.infra.issues import (
     AZURE_VNET_SUBNET_NEEDS_CLASS_C_FOR_DLDH,
     AZURE_VNET_SUBNET_WITH_NETAPP_DELEGATION_NOT_SIZED_FOR_ML,
 )
-
-_vnet_info = {}
+from cdpctl.validation.network import CidrSet, get_prefix_length, parse_network
 
 
 @pytest.fixture(name="vnet_info")
-def vnet_info_fixture():
+def vnet_info_fixture(azure_network_snapshot):
     """Get the Virtual Network info set."""
-    return _vnet_info["vnet"]
+    return azure_network_snapshot.get_vnet()
 
 
 vnet_reserved_ip_cidrs = [
@@ -89,12 +88,6 @@ def vnet_reserved_ip_networks_fixture():
     return vnet_reserved_ip_cidrs
 
 
-@pytest.fixture(autouse=True, name="azure_network_client")
-def azure_network_client_fixture(config: Dict[str, Any]) -> NetworkManagementClient:
-    """Return an Azure Client."""
-    return get_client("network", config)
-
-
 @pytest.mark.azure
 @pytest.mark.infra
 @pytest.mark.dependency(
@@ -115,17 +108,11 @@ def azure_vnet_exists(
     config: Dict[str, Any], azure_network_client: NetworkManagementClient
 ) -> None:  # pragma: no cover
     """Check that the VNet exists."""  # noqa: D401,E501
-    vnet_name: str = get_config_value(config=config, key="infra:vpc:name")
-    resource_group_name: str = get_config_value(
-        config=config, key="infra:azure:metagroup:name"
-    )
+    snapshot = get_network_snapshot(config, azure_network_client)
     try:
-        _vnet_info["vnet"] = azure_network_client.virtual_networks.get(
-            virtual_network_name=vnet_name, resource_group_name=resource_group_name
-        )
-        pass
+        snapshot.get_vnet()
     except ResourceNotFoundError:
-        fail(AZURE_VNET_NOT_FOUND, [vnet_name, resource_group_name])
+        fail(AZURE_VNET_NOT_FOUND, [snapshot.vnet_name, snapshot.resource_group_name])
 
 
 @pytest.mark.azure
@@ -139,11 +126,7 @@ def azure_vnet_cidr_range_validation(vnet_info) -> None:  # pragma: no cover
 @validator
 def azure_vnet_cidr_range(vnet_info) -> None:  # pragma: no cover
     """Check that the VNet has enough IPs."""  # noqa: D401,E501
-    total_ips = 0
-
-    for address_prefix in vnet_info.address_space.address_prefixes:
-        ip_net = ipaddress.ip_network(address_prefix)
-        total_ips += ip_net.num_addresses
+    total_ips = CidrSet(vnet_info.address_space.address_prefixes).num_addresses
 
     if total_ips < 65536:
         fail(
@@ -165,7 +148,7 @@ def azure_vnet_cidr_range_private(vnet_info) -> None:  # pragma: no cover
 
     public_cidrs = []
     for address_prefix in vnet_info.address_space.address_prefixes:
-        ip_net = ipaddress.ip_network(address_prefix)
+        ip_net = parse_network(address_prefix)
         if not ip_net.is_private:
             public_cidrs.append(ip_net.with_prefixlen)
 
@@ -188,12 +171,12 @@ def azure_vnet_cidr_ranges_not_reserved(
     vnet_info, vnet_reserved_ip_networks
 ) -> None:  # pragma: no cover
     """Check that the VNet does not use reserved addresses."""  # noqa: D401,E501
-    colliding_networks = []
-    for address_prefix in vnet_info.address_space.address_prefixes:
-        ip_net = ipaddress.ip_network(address_prefix)
-        for reserved_net in vnet_reserved_ip_networks:
-            if ip_net.overlaps(reserved_net):
-                colliding_networks.append(reserved_net.with_prefixlen)
+    address_space = CidrSet(vnet_info.address_space.address_prefixes)
+    colliding_networks = [
+        reserved_net.with_prefixlen
+        for reserved_net in vnet_reserved_ip_networks
+        if address_space.overlaps(reserved_net)
+    ]
 
     if colliding_networks:
         fail(
@@ -233,7 +216,7 @@ def azure_vnet_subnets_range_for_dl_and_dh(vnet_info) -> None:  # pragma: no cov
     """Check that the VNet a /24 for the DL and DH."""  # noqa: D401,E501
     found_compatible_subnet = False
     for subnet in vnet_info.subnets:
-        if ipaddress.ip_network(subnet.address_prefix).prefixlen <= 24:
+        if get_prefix_length(subnet.address_prefix) <= 24:
             found_compatible_subnet = True
 
     if not found_compatible_subnet:
@@ -255,7 +238,7 @@ def azure_vnet_subnets_with_db_service_endpoints(vnet_info) -> None:  # pragma:
     """Check thats subnet service endpoints are set for DL subnet."""  # noqa: D401,E501
     found_compatible_subnet = False
     for subnet in vnet_info.subnets:
-        if ipaddress.ip_network(subnet.address_prefix).prefixlen <= 24:
+        if get_prefix_length(subnet.address_prefix) <= 24:
             for endpoint in subnet.service_endpoints:
                 if endpoint.service == "Microsoft.Sql":
                     found_compatible_subnet = True
@@ -279,7 +262,7 @@ def azure_vnet_subnets_range_for_dw(vnet_info) -> None:  # pragma: no cover
     """Check that the VNet has subnets for DW."""  # noqa: D401,E501
     dw_size_subnets = 0
     for subnet in vnet_info.subnets:
-        if ipaddress.ip_network(subnet.address_prefix).prefixlen <= 20:
+        if get_prefix_length(subnet.address_prefix) <= 20:
             dw_size_subnets += 1
 
     if dw_size_subnets < 1:
@@ -306,7 +289,7 @@ def azure_vnet_subnets_with_storage_service_endpoints(
     """Check thats subnet service endpoints are set for DW subnet."""  # noqa: D401,E501
     found_compatible_subnet = False
     for subnet in vnet_info.subnets:
-        if ipaddress.ip_network(subnet.address_prefix).prefixlen <= 20:
+        if get_prefix_length(subnet.address_prefix) <= 20:
             found_sql = False
             found_storage = False
             for endpoint in subnet.service_endpoints:
@@ -343,7 +326,7 @@ def azure_vnet_subnets_for_ml(vnet_info) -> None:  # pragma: no cover
     if netapp_delegation_subnets:
         properly_sized_netapp_networks = False
         for subnet in netapp_delegation_subnets:
-            if ipaddress.ip_network(subnet.address_prefix).prefixlen <= 28:
+            if get_prefix_length(subnet.address_prefix) <= 28:
                 properly_sized_netapp_networks = True
         if not properly_sized_netapp_networks:
             warn(
@@ -355,7 +338,7 @@ def azure_vnet_subnets_for_ml(vnet_info) -> None:  # pragma: no cover
 
     compatible_subnets = 0
     for subnet in vnet_info.subnets:
-        if ipaddress.ip_network(subnet.address_prefix).prefixlen <= 25:
+        if get_prefix_length(subnet.address_prefix) <= 25:
             compatible_subnets += 1
     # must have at least a DLDH subnet and 1 more
     if not compatible_subnets >= 2:
@@ -379,7 +362,7 @@ def azure_vnet_subnets_for_de(vnet_info) -> None:  # pragma: no cover
     """Check that the VNet has enough /24 subnets for DE."""  # noqa: D401,E501
     compatible_subnets = 0
     for subnet in vnet_info.subnets:
-        if ipaddress.ip_network(subnet.address_prefix).prefixlen <= 24:
+        if get_prefix_length(subnet.address_prefix) <= 24:
             compatible_subnets += 1
     # must have at least a DLDH subnet and 1 more
     if not compatible_subnets >= 2:
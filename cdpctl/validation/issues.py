@@ -73,3 +73,5 @@ AZURE_INVALID_STORAGE_HAS_BEEN_DEFINED = "AZURE_INVALID_STORAGE_HAS_BEEN_DEFINED
 AZURE_STORAGE_NOT_DEFINED = "AZURE_STORAGE_NOT_DEFINED"
 
 AZURE_STORAGE_CONTAINER_DOES_NOT_EXIST = "AZURE_STORAGE_CONTAINER_DOES_NOT_EXIST"
+
+VALIDATION_NOT_EVALUATED = "VALIDATION_NOT_EVALUATED"
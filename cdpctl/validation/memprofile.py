@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  memprofile.py
+###
+"""Memory Profile of the Validations and the Rendering."""
+import json
+import os
+import platform
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from cdpctl.__version__ import __version__
+
+DEFAULT_MEMPROFILE_FILE = "cdpctl-memprofile.json"
+MEMPROFILE_TOP_SITES = 10
+MEMPROFILE_SUMMARY_SECTIONS = 5
+# Peaks are only measured where the peak can be reset, from Python 3.9
+CAN_RESET_PEAK = hasattr(tracemalloc, "reset_peak")
+_IGNORED_FILES = [tracemalloc.__file__, "<frozen importlib._bootstrap>", "<unknown>"]
+
+
+# The files of cdpctl are reported relative to the directory holding it
+_PACKAGE_PARENT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+_SITE_PACKAGES = "site-packages" + os.sep
+
+
+def get_site_file(filename: str) -> str:
+    """Get the file of an allocation site, relative to its installation."""
+    index = filename.rfind(_SITE_PACKAGES)
+    if index != -1:
+        filename = filename[index:].split(os.sep, 1)[1]
+    elif filename.startswith(_PACKAGE_PARENT + os.sep):
+        filename = os.path.relpath(filename, _PACKAGE_PARENT)
+    return filename.replace(os.sep, "/")
+
+
+def _format_bytes(size: Optional[int]) -> str:
+    if size is None:
+        return "n/a"
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+class MemoryProfile:
+    """
+    Peak and retained memory of the sections of a validation run.
+
+    A tracemalloc snapshot is taken when a section begins and when it ends.
+    The retained memory is the growth of the traced memory over the section,
+    and the top allocation sites are the lines whose allocations grew the
+    most. The peak is the highest traced memory reached above the start of
+    the section, measured on Python 3.9 and later.
+    """
+
+    def __init__(self, top: int = MEMPROFILE_TOP_SITES) -> None:
+        """Initialize the MemoryProfile."""
+        self.top = top
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        self._started: Dict[str, Tuple[tracemalloc.Snapshot, int]] = {}
+        self._tracing = False
+
+    def start(self) -> None:
+        """Start tracing the allocations, unless they are already traced."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def stop(self) -> None:
+        """Stop tracing the allocations, if the profile started it."""
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+        self._started.clear()
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+
+    def begin(self, key: str) -> None:
+        """Begin a section."""
+        if not tracemalloc.is_tracing():
+            return
+        # The snapshot is part of the baseline of the section
+        snapshot = self._take_snapshot()
+        if CAN_RESET_PEAK:
+            tracemalloc.reset_peak()
+        self._started[key] = (snapshot, tracemalloc.get_traced_memory()[0])
+
+    def end(self, key: str, **info: Any) -> None:
+        """End a section, recording its memory with the info given."""
+        started = self._started.pop(key, None)
+        if started is None or not tracemalloc.is_tracing():
+            return
+        start_snapshot, start_size = started
+        peak = tracemalloc.get_traced_memory()[1]
+        stats = self._take_snapshot().compare_to(start_snapshot, "lineno")
+        self.sections[key] = {
+            **info,
+            "peak_bytes": max(0, peak - start_size) if CAN_RESET_PEAK else None,
+            "retained_bytes": sum(stat.size_diff for stat in stats),
+            "top_allocations": [
+                {
+                    "file": get_site_file(stat.traceback[0].filename),
+                    "line": stat.traceback[0].lineno,
+                    "size_bytes": stat.size_diff,
+                    "count": stat.count_diff,
+                }
+                for stat in stats[: self.top]
+                if stat.size_diff > 0
+            ],
+        }
+
+    @contextmanager
+    def section(self, key: str, **info: Any) -> Iterator[None]:
+        """Profile the memory of a section."""
+        self.begin(key)
+        try:
+            yield
+        finally:
+            self.end(key, **info)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the profile as a JSON document comparable across runs."""
+        return {
+            "version": __version__,
+            "python": platform.python_version(),
+            "sections": self.sections,
+        }
+
+    def save(self, path: str) -> None:
+        """Save the profile as JSON."""
+        with open(path, "w", encoding="utf-8") as profile_file:
+            json.dump(self.to_dict(), profile_file, indent=2, sort_keys=True)
+
+    def get_summary(self, limit: int = MEMPROFILE_SUMMARY_SECTIONS) -> List[str]:
+        """Get the lines summarizing the sections using the most memory."""
+        sections = sorted(
+            self.sections.items(),
+            key=lambda section: (
+                -(section[1]["peak_bytes"] or 0),
+                -section[1]["retained_bytes"],
+                section[0],
+            ),
+        )
+        lines = []
+        for key, section in sections[:limit]:
+            line = (
+                f"{_format_bytes(section['peak_bytes'])} peak, "
+                f"{_format_bytes(section['retained_bytes'])} retained: "
+                f"{section.get('name', key)}"
+            )
+            top_allocations = section["top_allocations"]
+            if top_allocations:
+                site = top_allocations[0]
+                line += f" (top site {site['file']}:{site['line']})"
+            lines.append(line)
+        return lines
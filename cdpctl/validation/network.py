@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  network.py
+###
+"""CIDR Set Arithmetic for the Network Validations."""
+import bisect
+import functools
+import ipaddress
+from typing import Dict, Iterable, List, Tuple, Union
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+# First address and the address after the last one, as integers
+Interval = Tuple[int, int]
+
+IP_VERSIONS = (4, 6)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_network(cidr: str) -> Network:
+    """Parse a CIDR, once per distinct value."""
+    return ipaddress.ip_network(cidr)
+
+
+def get_prefix_length(cidr: str) -> int:
+    """Get the prefix length of a CIDR."""
+    return parse_network(cidr).prefixlen
+
+
+def _as_network(network: Union[str, Network]) -> Network:
+    return parse_network(network) if isinstance(network, str) else network
+
+
+def _get_interval(network: Network) -> Interval:
+    start = int(network.network_address)
+    return start, start + network.num_addresses
+
+
+def _merge(intervals: Iterable[Interval]) -> List[Interval]:
+    """Merge overlapping and adjacent intervals, sorted by their start."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class CidrSet:
+    """
+    Set of IP addresses given as CIDRs, kept as merged integer intervals.
+
+    The networks of each IP version are sorted and merged once, so the
+    address count takes a sum, and checking a network for overlap or
+    containment takes a binary search instead of comparing every pair of
+    networks.
+    """
+
+    def __init__(self, networks: Iterable[Union[str, Network]] = ()) -> None:
+        """Initialize the CidrSet."""
+        intervals: Dict[int, List[Interval]] = {version: [] for version in IP_VERSIONS}
+        for network in networks:
+            network = _as_network(network)
+            intervals[network.version].append(_get_interval(network))
+        self._set_intervals(intervals)
+
+    def _set_intervals(self, intervals: Dict[int, List[Interval]]) -> None:
+        self._intervals = {
+            version: _merge(intervals.get(version, [])) for version in IP_VERSIONS
+        }
+        self._starts = {
+            version: [start for start, _ in version_intervals]
+            for version, version_intervals in self._intervals.items()
+        }
+
+    @classmethod
+    def from_intervals(cls, intervals: Dict[int, List[Interval]]) -> "CidrSet":
+        """Get the set of the address intervals of each IP version."""
+        cidr_set = cls()
+        cidr_set._set_intervals(intervals)
+        return cidr_set
+
+    @property
+    def num_addresses(self) -> int:
+        """Get the number of addresses in the set."""
+        return sum(
+            end - start
+            for version_intervals in self._intervals.values()
+            for start, end in version_intervals
+        )
+
+    def _find(self, version: int, start: int) -> int:
+        """Get the position of the last interval starting at or before start."""
+        return bisect.bisect_right(self._starts[version], start) - 1
+
+    def overlaps(self, network: Union[str, Network]) -> bool:
+        """Check if a network shares addresses with the set."""
+        network = _as_network(network)
+        start, end = _get_interval(network)
+        intervals = self._intervals[network.version]
+        position = self._find(network.version, start)
+        if position >= 0 and intervals[position][1] > start:
+            return True
+        return position + 1 < len(intervals) and intervals[position + 1][0] < end
+
+    def contains(self, network: Union[str, Network]) -> bool:
+        """Check if all the addresses of a network are in the set."""
+        network = _as_network(network)
+        start, end = _get_interval(network)
+        position = self._find(network.version, start)
+        return position >= 0 and self._intervals[network.version][position][1] >= end
+
+    def difference(self, other: "CidrSet") -> "CidrSet":
+        """Get the addresses of the set not in the other set, like free space."""
+        intervals: Dict[int, List[Interval]] = {}
+        for version in IP_VERSIONS:
+            remaining: List[Interval] = []
+            others = other._intervals[version]
+            position = 0
+            for start, end in self._intervals[version]:
+                while position < len(others) and others[position][1] <= start:
+                    position += 1
+                current = start
+                scan = position
+                while scan < len(others) and others[scan][0] < end:
+                    if others[scan][0] > current:
+                        remaining.append((current, others[scan][0]))
+                    current = max(current, others[scan][1])
+                    scan += 1
+                if current < end:
+                    remaining.append((current, end))
+            intervals[version] = remaining
+        return CidrSet.from_intervals(intervals)
+
+    def to_cidrs(self) -> List[str]:
+        """Get the fewest CIDRs covering the set."""
+        address_types = {4: ipaddress.IPv4Address, 6: ipaddress.IPv6Address}
+        return [
+            network.with_prefixlen
+            for version in IP_VERSIONS
+            for start, end in self._intervals[version]
+            for network in ipaddress.summarize_address_range(
+                address_types[version](start), address_types[version](end - 1)
+            )
+        ]
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  plan.py
+###
+"""Validation Plan and Config Dependencies."""
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+def get_validation_name(item: Any) -> str:
+    """Get the name of a validation as reported in the issues."""
+    node = item.obj
+    return node.__doc__.strip() if node.__doc__ else node.__name__
+
+
+def _get_module_id(nodeid: str) -> str:
+    return nodeid.split("::", 1)[0]
+
+
+class ValidationPlan:
+    """Dependency graph of the collected validations."""
+
+    def __init__(
+        self,
+        nodeids: List[str],
+        dependencies: Dict[str, Set[str]],
+        names: Dict[str, str],
+    ) -> None:
+        """Initialize the ValidationPlan."""
+        self.nodeids = nodeids
+        self.dependencies = dependencies
+        self.names = names
+        self.dependents: Dict[str, Set[str]] = {nodeid: set() for nodeid in nodeids}
+        for nodeid, prerequisites in dependencies.items():
+            for prerequisite in prerequisites:
+                self.dependents.setdefault(prerequisite, set()).add(nodeid)
+
+    @classmethod
+    def from_items(cls, items: Iterable[Any]) -> "ValidationPlan":
+        """Build the plan from the pytest-dependency markers of the items."""
+        items = list(items)
+        by_name: Dict[str, str] = {}
+        for item in items:
+            marker = item.get_closest_marker("dependency")
+            name = marker.kwargs.get("name") if marker else None
+            by_name[f"{_get_module_id(item.nodeid)}::{name or item.name}"] = item.nodeid
+            by_name[item.nodeid] = item.nodeid
+
+        dependencies: Dict[str, Set[str]] = {}
+        for item in items:
+            dependencies[item.nodeid] = set()
+            marker = item.get_closest_marker("dependency")
+            if marker is None:
+                continue
+            session_scope = marker.kwargs.get("scope") == "session"
+            for depend in marker.kwargs.get("depends", []):
+                key = (
+                    depend
+                    if session_scope
+                    else f"{_get_module_id(item.nodeid)}::{depend}"
+                )
+                if key in by_name:
+                    dependencies[item.nodeid].add(by_name[key])
+
+        return cls(
+            nodeids=[item.nodeid for item in items],
+            dependencies=dependencies,
+            names={item.nodeid: get_validation_name(item) for item in items},
+        )
+
+    def _closure(self, nodeids: Iterable[str], edges: Dict[str, Set[str]]) -> Set[str]:
+        found: Set[str] = set()
+        pending = list(nodeids)
+        while pending:
+            nodeid = pending.pop()
+            if nodeid not in found:
+                found.add(nodeid)
+                pending.extend(edges.get(nodeid, set()))
+        return found
+
+    def get_dependents(self, nodeids: Iterable[str]) -> Set[str]:
+        """Get the validations and every validation depending on them."""
+        return self._closure(nodeids, self.dependents)
+
+    def get_prerequisites(self, nodeids: Iterable[str]) -> Set[str]:
+        """Get the validations and every validation they depend on."""
+        return self._closure(nodeids, self.dependencies)
+
+    def get_components(self) -> List[List[str]]:
+        """Get the groups of validations connected by their dependencies."""
+        edges = {
+            nodeid: self.dependencies.get(nodeid, set())
+            | self.dependents.get(nodeid, set())
+            for nodeid in self.nodeids
+        }
+        components: List[List[str]] = []
+        assigned: Set[str] = set()
+        for nodeid in self.nodeids:
+            if nodeid in assigned:
+                continue
+            component = self._closure([nodeid], edges)
+            assigned |= component
+            components.append([other for other in self.nodeids if other in component])
+        return components
+
+    def get_shard(
+        self, index: int, count: int, costs: Optional[Dict[str, float]] = None
+    ) -> List[str]:
+        """
+        Get the validations of a shard, numbered from 1 to count.
+
+        Validations connected by dependencies are kept in the same shard.
+        The largest groups, by expected seconds if costs are given or else by
+        size, are assigned first, each to the least loaded shard, so the long
+        running groups start right away and every node computes the same
+        shards from the same plan and costs.
+        """
+
+        def get_load(component: List[str]) -> float:
+            if costs:
+                return sum(costs.get(nodeid, 0.0) for nodeid in component)
+            return float(len(component))
+
+        loads = [0.0] * count
+        shards: List[Set[str]] = [set() for _ in range(count)]
+        for component in sorted(
+            self.get_components(),
+            key=lambda component: (-get_load(component), component),
+        ):
+            shard = loads.index(min(loads))
+            loads[shard] += get_load(component)
+            shards[shard].update(component)
+        return [nodeid for nodeid in self.nodeids if nodeid in shards[index - 1]]
+
+    def get_gating(self) -> Set[str]:
+        """Get the validations other validations depend on."""
+        return {nodeid for nodeid in self.nodeids if self.dependents.get(nodeid)}
+
+    def get_order(self, costs: Dict[str, float]) -> List[str]:
+        """
+        Get the order to run the validations by their expected seconds.
+
+        A validation runs after its prerequisites. Among the validations ready
+        to run, the gating ones run first and the cheapest ones before the
+        expensive ones, so a failing prerequisite is found as early as
+        possible. Validations of equal cost keep their collection order.
+        """
+        gating = self.get_gating()
+        position = {nodeid: index for index, nodeid in enumerate(self.nodeids)}
+        waiting = {
+            nodeid: len(self.dependencies.get(nodeid, set()) & set(position))
+            for nodeid in self.nodeids
+        }
+
+        def get_key(nodeid: str) -> Tuple[bool, float, int, str]:
+            return (
+                nodeid not in gating,
+                costs.get(nodeid, 0.0),
+                position[nodeid],
+                nodeid,
+            )
+
+        ready = [get_key(nodeid) for nodeid, count in waiting.items() if count == 0]
+        heapq.heapify(ready)
+        order: List[str] = []
+        while ready:
+            nodeid = heapq.heappop(ready)[-1]
+            order.append(nodeid)
+            for dependent in self.dependents.get(nodeid, set()):
+                if dependent in waiting:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        heapq.heappush(ready, get_key(dependent))
+        # Validations in a dependency cycle keep their collection order
+        ordered = set(order)
+        return order + [nodeid for nodeid in self.nodeids if nodeid not in ordered]
+
+    def select_changed(
+        self, changed_keys: Set[str], config_reads: Dict[str, Set[str]]
+    ) -> List[str]:
+        """
+        Select the validations to run again after the config keys changed.
+
+        The validations having read a changed key are selected with their
+        dependents, and with the prerequisites that all of them need to run.
+        """
+        changed = [
+            nodeid
+            for nodeid in self.nodeids
+            if any(
+                is_related_key(read_key, changed_key)
+                for read_key in config_reads.get(nodeid, set())
+                for changed_key in changed_keys
+            )
+        ]
+        selected = self.get_prerequisites(self.get_dependents(changed))
+        return [nodeid for nodeid in self.nodeids if nodeid in selected]
+
+
+def is_related_key(key: str, other_key: str, path_delimiter: str = ":") -> bool:
+    """Check if two config keys are the same or one is the parent of the other."""
+    return (
+        key == other_key
+        or key.startswith(other_key + path_delimiter)
+        or other_key.startswith(key + path_delimiter)
+    )
+
+
+def flatten_config(
+    config: Any, prefix: str = "", path_delimiter: str = ":"
+) -> Dict[str, Any]:
+    """Flatten a config to the values of its leaf keys."""
+    if not isinstance(config, dict) or not config:
+        return {prefix: config}
+    values: Dict[str, Any] = {}
+    for key, value in config.items():
+        path = f"{prefix}{path_delimiter}{key}" if prefix else str(key)
+        values.update(flatten_config(value, path, path_delimiter))
+    return values
+
+
+def get_changed_keys(old_config: Any, new_config: Any) -> Set[str]:
+    """Get the leaf config keys added, removed or changed between two configs."""
+    old_values = flatten_config(old_config)
+    new_values = flatten_config(new_config)
+    return {
+        key
+        for key in set(old_values) | set(new_values)
+        if key not in old_values
+        or key not in new_values
+        or old_values[key] != new_values[key]
+    }
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  policies.py
+###
+"""Persisted Cache of the IAM Policy Documents."""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cdpctl.utils import get_cache_dir
+from cdpctl.validation.aws_trust import parse_policy_document
+
+POLICIES_CACHE_DIR_NAME = "policies"
+DEFAULT_POLICY_VERSION = "2008-10-17"
+
+
+def _as_sorted_list(value: Any, lower: bool = False) -> List[Any]:
+    values = value if isinstance(value, list) else [value]
+    if lower:
+        values = [v.lower() if isinstance(v, str) else v for v in values]
+    return sorted(set(values), key=str)
+
+
+def normalize_policy_document(document: Any) -> Dict[str, Any]:
+    """
+    Normalize a policy document for its content to be compared.
+
+    The document is parsed, single actions and resources become sorted lists,
+    the actions (not case sensitive) are lower-cased and the statements are
+    sorted.
+    """
+    parsed = parse_policy_document(document)
+    statements = parsed.get("Statement") or []
+    if not isinstance(statements, list):
+        statements = [statements]
+    normalized: List[Dict[str, Any]] = []
+    for statement in statements:
+        statement = dict(statement)
+        for key in ("Action", "NotAction"):
+            if key in statement:
+                statement[key] = _as_sorted_list(statement[key], lower=True)
+        for key in ("Resource", "NotResource"):
+            if key in statement:
+                statement[key] = _as_sorted_list(statement[key])
+        normalized.append(statement)
+    normalized.sort(key=lambda s: json.dumps(s, sort_keys=True))
+    return {
+        "Version": parsed.get("Version", DEFAULT_POLICY_VERSION),
+        "Statement": normalized,
+    }
+
+
+def get_document_hash(document: Dict[str, Any]) -> str:
+    """Get the content hash of a normalized policy document."""
+    return hashlib.sha256(
+        json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+class PolicyDocumentCache:
+    """
+    Normalized documents of the IAM managed policy versions.
+
+    A policy version never changes, so its document is kept under the account,
+    the policy ARN and the version id, persisted between runs, and fetched
+    again only once the default version of the policy changes. Documents are
+    interned by content hash, identical policies of any account sharing a
+    single parsed document.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None) -> None:
+        """Initialize the PolicyDocumentCache."""
+        self.cache_dir = cache_dir
+        self._hashes: Dict[Tuple[str, str, str], str] = {}
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _get_path(self, key: Tuple[str, str, str]) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        name = hashlib.sha256("|".join(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _load(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        path = self._get_path(key)
+        if not path or not os.path.isfile(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("key") != list(key):
+            return None
+        document = entry.get("document")
+        if not isinstance(document, dict) or get_document_hash(document) != entry.get(
+            "hash"
+        ):
+            return None
+        return document
+
+    def _store(self, key: Tuple[str, str, str], document: Dict[str, Any]) -> None:
+        path = self._get_path(key)
+        if not path:
+            return
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as entry_file:
+                json.dump(
+                    {
+                        "key": list(key),
+                        "hash": get_document_hash(document),
+                        "document": document,
+                    },
+                    entry_file,
+                    sort_keys=True,
+                )
+            os.replace(temp_path, path)
+        except OSError:
+            pass
+
+    def get_hash(
+        self,
+        account: str,
+        policy_arn: str,
+        version_id: str,
+        fetch: Callable[[], Any],
+    ) -> str:
+        """Get the content hash of a policy version, fetching it on a miss."""
+        key = (account, policy_arn, version_id)
+        with self._lock:
+            if key in self._hashes:
+                return self._hashes[key]
+        document = self._load(key)
+        if document is None:
+            document = normalize_policy_document(fetch())
+            self._store(key, document)
+        content_hash = get_document_hash(document)
+        with self._lock:
+            self._hashes[key] = content_hash
+            self._documents.setdefault(content_hash, document)
+        return content_hash
+
+    def get_document(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the normalized document of a content hash."""
+        with self._lock:
+            return self._documents.get(content_hash)
+
+    def clear(self) -> None:
+        """Drop the documents kept in memory, the persisted ones are kept."""
+        with self._lock:
+            self._hashes.clear()
+            self._documents.clear()
+
+
+@lru_cache(maxsize=None)
+def get_policy_document_cache() -> PolicyDocumentCache:
+    """Get the policy document cache, persisted under the cdpctl cache."""
+    return PolicyDocumentCache(get_cache_dir(POLICIES_CACHE_DIR_NAME))
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  prefetch.py
+###
+"""Speculative Prefetch of the Cloud Resources Referenced by a Config."""
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Dict, List
+
+from cdpctl.validation import get_config_value, has_config_value
+from cdpctl.validation.deadline import run_budget
+
+PREFETCH_MAX_WORKERS = 8
+PREFETCH_TIMEOUT = 60.0
+
+AWS_SUBNET_IDS_KEYS = [
+    "infra:aws:vpc:existing:public_subnet_ids",
+    "infra:aws:vpc:existing:private_subnet_ids",
+]
+AWS_SECURITY_GROUP_ID_KEYS = [
+    "infra:aws:vpc:existing:security_groups:default_id",
+    "infra:aws:vpc:existing:security_groups:knox_id",
+]
+AWS_ROLE_NAME_KEYS = [
+    "env:aws:role:name:cross_account",
+    "env:aws:role:name:datalake_admin",
+    "env:aws:role:name:ranger_audit",
+]
+AWS_INSTANCE_PROFILE_NAME_KEYS = [
+    "env:aws:instance_profile:name:idbroker",
+    "env:aws:instance_profile:name:log",
+]
+AZURE_IDENTITY_NAME_KEYS = [
+    "env:azure:role:name:cross_account",
+    "env:azure:role:name:datalake_admin",
+    "env:azure:role:name:idbroker",
+    "env:azure:role:name:log",
+    "env:azure:role:name:ranger_audit",
+]
+
+
+def get_config_values(config: Dict[str, Any], key: str) -> List[Any]:
+    """Get the values set for a config key, if it is defined."""
+    if not has_config_value(config, key):
+        return []
+    value = get_config_value(config, key, key_value_expected=False)
+    values = value if isinstance(value, list) else [value]
+    return [v for v in values if v]
+
+
+def get_aws_prefetches(config: Dict[str, Any]) -> List[Callable[[], Any]]:
+    """Get the fetches of the AWS resources referenced by the config."""
+    from cdpctl.validation import aws_utils
+
+    ec2_client = aws_utils.get_client("ec2", config)
+    iam_client = aws_utils.get_client("iam", config)
+    s3_client = aws_utils.get_client("s3", config)
+
+    prefetches: List[Callable[[], Any]] = []
+    for key in AWS_SUBNET_IDS_KEYS:
+        subnet_ids = get_config_values(config, key)
+        if subnet_ids:
+            prefetches.append(partial(aws_utils.fetch_subnets, ec2_client, subnet_ids))
+    for key in AWS_SECURITY_GROUP_ID_KEYS:
+        for group_id in get_config_values(config, key):
+            prefetches.append(
+                partial(aws_utils.fetch_security_groups, ec2_client, [group_id])
+            )
+    for vpc_id in get_config_values(config, "infra:aws:vpc:existing:vpc_id"):
+        prefetches.append(partial(aws_utils.fetch_vpcs, ec2_client, [vpc_id]))
+    for key_pair_id in get_config_values(config, "globals:ssh:public_key_id"):
+        prefetches.append(partial(aws_utils.fetch_key_pairs, ec2_client, [key_pair_id]))
+    for key in AWS_ROLE_NAME_KEYS:
+        for role_name in get_config_values(config, key):
+            prefetches.append(partial(aws_utils.fetch_role, iam_client, role_name))
+    for key in AWS_INSTANCE_PROFILE_NAME_KEYS:
+        for name in get_config_values(config, key):
+            prefetches.append(
+                partial(aws_utils.fetch_instance_profile, iam_client, name)
+            )
+    resolver = aws_utils.get_s3_location_resolver(config, s3_client)
+    for bucket_name in sorted(resolver.buckets):
+        prefetches.append(
+            partial(aws_utils.fetch_bucket_status, s3_client, bucket_name)
+        )
+    return prefetches
+
+
+def get_azure_prefetches(config: Dict[str, Any]) -> List[Callable[[], Any]]:
+    """Get the fetches of the Azure resources referenced by the config."""
+    from cdpctl.validation import azure_utils
+
+    prefetches: List[Callable[[], Any]] = []
+    subscription_id = get_config_values(config, "infra:azure:subscription_id")
+    resource_group = get_config_values(config, "infra:azure:metagroup:name")
+    if subscription_id and resource_group:
+        resource_client = azure_utils.get_client("resource", config)
+        for key in AZURE_IDENTITY_NAME_KEYS:
+            for identity_name in get_config_values(config, key):
+                identity_id = azure_utils.get_identity_id(
+                    subscription_id[0], resource_group[0], identity_name
+                )
+                prefetches.append(
+                    partial(azure_utils.fetch_identity, resource_client, identity_id)
+                )
+        if get_config_values(config, "infra:vpc:name"):
+            snapshot = azure_utils.get_network_snapshot(
+                config, azure_utils.get_client("network", config)
+            )
+            prefetches.append(snapshot.get_vnet)
+            prefetches.append(snapshot.get_security_groups)
+    resolver = azure_utils.get_adls_resolver(
+        config, partial(azure_utils.get_client, "datalake", config)
+    )
+    for account_url in sorted(resolver.accounts):
+        prefetches.append(
+            partial(
+                azure_utils.fetch_file_systems,
+                resolver.get_service_client(account_url),
+            )
+        )
+    return prefetches
+
+
+def run_prefetches(
+    prefetches: List[Callable[[], Any]],
+    max_workers: int = PREFETCH_MAX_WORKERS,
+    timeout: float = PREFETCH_TIMEOUT,
+) -> None:
+    """
+    Run the fetches concurrently on a bounded pool.
+
+    Failed fetches are not cached, the validations needing the resources fetch
+    them again and report the problem. The run does not wait for the fetches
+    longer than the timeout, or the deadline of the run.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = [executor.submit(prefetch) for prefetch in prefetches]
+    _, not_done = wait(futures, timeout=run_budget.get_timeout(timeout))
+    for future in not_done:
+        future.cancel()
+    executor.shutdown(wait=False)
+
+
+def prefetch_resources(
+    config: Dict[str, Any], infra_type: str, max_workers: int = PREFETCH_MAX_WORKERS
+) -> None:
+    """Prefetch the cloud resources referenced by the config into the cache."""
+    if infra_type == "aws":
+        run_prefetches(get_aws_prefetches(config), max_workers)
+    elif infra_type == "azure":
+        run_prefetches(get_azure_prefetches(config), max_workers)
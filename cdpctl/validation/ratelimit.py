@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  ratelimit.py
+###
+"""Shared Rate Limiting of the Cloud Clients."""
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cdpctl.validation.cache import resource_reads
+
+BASE_BACKOFF = 0.5
+MAX_BACKOFF = 20.0
+MAX_THROTTLE_ATTEMPTS = 8
+MAX_TRANSIENT_ATTEMPTS = 5
+MIN_RATE = 0.5
+
+AWS_DEFAULT_RATE = 20.0
+AWS_SERVICE_RATES = {"iam": 5.0, "sts": 10.0}
+AZURE_DEFAULT_RATE = 20.0
+
+AWS_THROTTLE_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "SlowDown",
+    "EC2ThrottledException",
+}
+THROTTLE_STATUS_CODES = {429}
+TRANSIENT_STATUS_CODES = {500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the request rate to a cloud service.
+
+    The rate adapts to the service: it is halved on every throttle and
+    slowly grows back to the configured rate on successful requests.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize the TokenBucket."""
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._blocked_until = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take a token, waiting for one if needed. Return the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def on_success(self) -> None:
+        """Grow the rate back after a successful request."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def on_throttle(self, delay: float = 0.0) -> None:
+        """Halve the rate and hold every request back for the delay."""
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            self._blocked_until = max(self._blocked_until, self._clock() + delay)
+
+
+class ThrottleEvent:
+    """Throttling response returned by a cloud service."""
+
+    def __init__(
+        self,
+        cloud: str,
+        scope: str,
+        service: str,
+        operation: str,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Initialize the ThrottleEvent."""
+        self.cloud = cloud
+        self.scope = scope
+        self.service = service
+        self.operation = operation
+        self.retry_after = retry_after
+        self.timestamp = time.time()
+
+
+class RateLimiter:
+    """Token buckets per (cloud, account/subscription, service) and throttles."""
+
+    def __init__(self) -> None:
+        """Initialize the RateLimiter."""
+        self._buckets: Dict[Tuple[str, str, str], TokenBucket] = {}
+        self._events: List[ThrottleEvent] = []
+        self._lock = threading.Lock()
+
+    def get_bucket(
+        self, cloud: str, scope: str, service: str, rate: float
+    ) -> TokenBucket:
+        """Get the token bucket shared by the clients of a cloud service."""
+        with self._lock:
+            key = (cloud, scope, service)
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(rate=rate)
+            return self._buckets[key]
+
+    def record_throttle(self, event: ThrottleEvent) -> None:
+        """Record a throttling response."""
+        with self._lock:
+            self._events.append(event)
+
+    def get_throttle_events(self) -> List[ThrottleEvent]:
+        """Get the throttling responses recorded so far."""
+        with self._lock:
+            return list(self._events)
+
+    def get_throttle_counts(self) -> Dict[Tuple[str, str, str], int]:
+        """Get the number of throttling responses per cloud service."""
+        counts: Dict[Tuple[str, str, str], int] = {}
+        for event in self.get_throttle_events():
+            key = (event.cloud, event.scope, event.service)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def clear_throttle_events(self) -> None:
+        """Clear the recorded throttling responses, keeping the buckets."""
+        with self._lock:
+            self._events.clear()
+
+    def clear(self) -> None:
+        """Clear the buckets and the recorded throttling responses."""
+        with self._lock:
+            self._buckets.clear()
+            self._events.clear()
+
+
+_rate_limiter: RateLimiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the rate limiter shared by all the cloud clients."""
+    return _rate_limiter
+
+
+def get_backoff_time(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Get a jittered exponential backoff, never shorter than the Retry-After."""
+    if retry_after:
+        return retry_after + random.uniform(0, BASE_BACKOFF)
+    return random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds."""
+    try:
+        return max(float(value), 0.0) if value else None
+    except ValueError:
+        return None
+
+
+def register_aws_client(client: Any, scope: str) -> None:
+    """
+    Put an AWS client behind the rate limiter shared by its service.
+
+    The client retries throttled requests, server errors and connection
+    errors with backoff. The botocore retry handler of the client is removed,
+    so the requests are only retried by the rate limiter.
+    """
+    # Imported with the AWS clients only, Azure runs do not load botocore
+    from botocore.exceptions import ConnectionError as BotocoreConnectionError
+    from botocore.exceptions import HTTPClientError
+
+    service = client.meta.service_model.service_name
+    event_name = client.meta.service_model.service_id.hyphenize()
+    bucket = get_rate_limiter().get_bucket(
+        "aws", scope, service, AWS_SERVICE_RATES.get(service, AWS_DEFAULT_RATE)
+    )
+
+    # pylint: disable=unused-argument
+    def before_send(**kwargs) -> None:
+        resource_reads.record_request()
+        bucket.acquire()
+
+    def needs_retry(
+        response=None, operation=None, attempts=1, caught_exception=None, **kwargs
+    ):
+        if response is None:
+            if isinstance(
+                caught_exception, (BotocoreConnectionError, HTTPClientError)
+            ) and (attempts < MAX_TRANSIENT_ATTEMPTS):
+                return get_backoff_time(attempts)
+            return None
+        http_response, parsed = response
+        status_code = http_response.status_code
+        error_code = parsed.get("Error", {}).get("Code")
+        if (
+            error_code not in AWS_THROTTLE_ERROR_CODES
+            and status_code not in THROTTLE_STATUS_CODES
+        ):
+            if 200 <= status_code < 300:
+                bucket.on_success()
+            elif (
+                status_code in TRANSIENT_STATUS_CODES
+                and attempts < MAX_TRANSIENT_ATTEMPTS
+            ):
+                return get_backoff_time(attempts)
+            return None
+        retry_after = parse_retry_after(http_response.headers.get("Retry-After"))
+        get_rate_limiter().record_throttle(
+            ThrottleEvent("aws", scope, service, operation.name, retry_after)
+        )
+        delay = get_backoff_time(attempts, retry_after)
+        bucket.on_throttle(delay)
+        if attempts >= MAX_THROTTLE_ATTEMPTS:
+            return None
+        return delay
+
+    client.meta.events.register(f"before-send.{event_name}", before_send)
+    client.meta.events.unregister(
+        f"needs-retry.{event_name}", unique_id=f"retry-config-{event_name}"
+    )
+    client.meta.events.register_first(f"needs-retry.{event_name}", needs_retry)
@@ -41,9 +41,7 @@
 """Base Renderer Module."""
 import json
 
-from jinja2 import Environment, PackageLoader, select_autoescape
-
-from cdpctl.utils import smart_open
+from cdpctl.utils import get_template_environment, render_template, smart_open
 from cdpctl.validation import UnrecoverableValidationError
 
 
@@ -60,15 +58,9 @@ class TextValidationRenderer(ValidationRenderer):
 
     def render(self, issues, output_file):
         """Render the issues found as a text format."""
-        env = Environment(
-            loader=PackageLoader(
-                package_name="cdpctl.validation.renderer", package_path="templates"
-            ),
-            autoescape=select_autoescape(),
-        )
+        env = get_template_environment(package_name="cdpctl.validation.renderer")
         template = env.get_template("text.j2")
-        with smart_open(output_file) as f:
-            f.write(template.render(issues=issues))
+        render_template(template, output_file, issues=issues)
 
 
 class JsonValidationRenderer(ValidationRenderer):
@@ -94,11 +86,10 @@ class JsonValidationRenderer(ValidationRenderer):
             json_issues.append(json_rep)
 
         with smart_open(output_file) as f:
-            f.write(
-                json.dumps(
-                    json_issues,
-                    indent=4,
-                )
+            json.dump(
+                json_issues,
+                f,
+                indent=4,
             )
 
 
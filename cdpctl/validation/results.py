@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  results.py
+###
+"""Partial Validation Results of the Shards."""
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cdpctl.__version__ import __version__
+from cdpctl.validation import Issue, IssueType
+from cdpctl.validation.plan import ValidationPlan
+
+SHARD_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard given as index/count, with the index starting at 1."""
+    match = SHARD_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"{value} is not a shard in the form i/N")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(
+            f"{value} is not a shard between 1/{count} and {count}/{count}"
+        )
+    return index, count
+
+
+def get_default_shard_file(shard: Tuple[int, int]) -> str:
+    """Get the default file of the results of a shard."""
+    return f"cdpctl-shard-{shard[0]}-of-{shard[1]}.json"
+
+
+def serialize_issues(
+    issues: Dict[str, Dict[str, List[Issue]]]
+) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """Serialize the issues found by the validations."""
+    return {
+        name: {
+            issue_type: [issue.to_dict() for issue in type_issues]
+            for issue_type, type_issues in validation_issues.items()
+        }
+        for name, validation_issues in issues.items()
+    }
+
+
+def deserialize_issues(
+    issues: Dict[str, Dict[str, List[Dict[str, Any]]]]
+) -> Dict[str, Dict[str, List[Issue]]]:
+    """Deserialize the issues found by the validations."""
+    return {
+        name: {
+            issue_type.value: [
+                Issue.from_dict(issue)
+                for issue in validation_issues.get(issue_type.value, [])
+            ]
+            for issue_type in IssueType
+        }
+        for name, validation_issues in issues.items()
+    }
+
+
+def get_shard_results(
+    plan: ValidationPlan,
+    shard: Tuple[int, int],
+    infra_type: str,
+    target: str,
+    issues: Dict[str, Dict[str, List[Issue]]],
+    costs: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """Get the partial results of the validations run by a shard."""
+    names = []
+    for nodeid in plan.nodeids:
+        if plan.names[nodeid] not in names:
+            names.append(plan.names[nodeid])
+    return {
+        "version": __version__,
+        "infra_type": infra_type,
+        "target": target,
+        "shard": list(shard),
+        "validations": names,
+        "nodeids": plan.get_shard(*shard, costs=costs),
+        "issues": serialize_issues(issues),
+    }
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    """Save partial results to a file."""
+    with open(path, "w", encoding="utf-8") as results_file:
+        json.dump(results, results_file, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Load partial results from a file."""
+    with open(path, encoding="utf-8") as results_file:
+        results = json.load(results_file)
+    if not isinstance(results, dict) or "shard" not in results:
+        raise ValueError(f"{path} does not contain the results of a shard")
+    return results
+
+
+def merge_results(
+    shard_results: Iterable[Dict[str, Any]]
+) -> Dict[str, Dict[str, List[Issue]]]:
+    """
+    Merge the partial results of all the shards of a validation run.
+
+    The issues are returned in the order of the validations of a full run.
+    Raise a ValueError if shards are missing, repeated, overlapping or
+    from other runs.
+    """
+    shard_results = list(shard_results)
+    if not shard_results:
+        raise ValueError("No shard results to merge")
+
+    first = shard_results[0]
+    count = first["shard"][1]
+    for results in shard_results:
+        for key in ("version", "infra_type", "target", "validations"):
+            if results[key] != first[key]:
+                raise ValueError(
+                    f"Shard {results['shard'][0]}/{results['shard'][1]} was not "
+                    f"run with the same {key} as shard {first['shard'][0]}/{count}"
+                )
+        if results["shard"][1] != count:
+            raise ValueError(
+                f"Shard {results['shard'][0]}/{results['shard'][1]} is not one "
+                f"of {count} shards"
+            )
+
+    indexes = [results["shard"][0] for results in shard_results]
+    if len(set(indexes)) != len(indexes):
+        raise ValueError("The results of a shard are given more than once")
+    missing = sorted(set(range(1, count + 1)) - set(indexes))
+    if missing:
+        raise ValueError(
+            "Missing the results of shard(s) "
+            + ", ".join(f"{index}/{count}" for index in missing)
+        )
+    nodeids = [nodeid for results in shard_results for nodeid in results["nodeids"]]
+    if len(set(nodeids)) != len(nodeids):
+        raise ValueError(
+            "The shards ran the same validations, they were not split with the "
+            "same timings file"
+        )
+
+    issues: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for results in shard_results:
+        issues.update(results["issues"])
+    order = {name: position for position, name in enumerate(first["validations"])}
+    return deserialize_issues(
+        {
+            name: issues[name]
+            for name in sorted(issues, key=lambda name: order.get(name, len(order)))
+        }
+    )
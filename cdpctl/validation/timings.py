@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  timings.py
+###
+"""Timing History of the Validations."""
+import json
+import os
+import statistics
+import tempfile
+from typing import Dict, Iterable, Optional
+
+from cdpctl.utils import get_cache_dir
+
+TIMINGS_FILE_NAME = "timings.json"
+# Weight of the latest run in the average seconds of a validation
+TIMING_SMOOTHING = 0.5
+
+
+def get_default_timings_file() -> Optional[str]:
+    """Get the timing history file under the cdpctl cache."""
+    cache_dir = get_cache_dir()
+    return os.path.join(cache_dir, TIMINGS_FILE_NAME) if cache_dir else None
+
+
+class TimingHistory:
+    """Average seconds taken by each validation in the previous runs."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initialize the TimingHistory, loading the history file if any."""
+        self.path = path
+        self.seconds: Dict[str, float] = {}
+        if not path or not os.path.isfile(path):
+            return
+        try:
+            with open(path, encoding="utf-8") as timings_file:
+                seconds = json.load(timings_file)
+        except (OSError, ValueError):
+            return
+        if isinstance(seconds, dict):
+            self.seconds = {
+                nodeid: float(value)
+                for nodeid, value in seconds.items()
+                if isinstance(value, (int, float)) and value >= 0
+            }
+
+    def record(self, nodeid: str, seconds: float) -> None:
+        """Record the seconds taken by a validation."""
+        previous = self.seconds.get(nodeid)
+        self.seconds[nodeid] = (
+            seconds
+            if previous is None
+            else previous + TIMING_SMOOTHING * (seconds - previous)
+        )
+
+    def get_costs(self, nodeids: Iterable[str]) -> Dict[str, float]:
+        """
+        Get the expected seconds of the validations.
+
+        Validations without history are expected to take the median of the
+        known ones. Return nothing if none of them has history.
+        """
+        nodeids = list(nodeids)
+        known = [self.seconds[nodeid] for nodeid in nodeids if nodeid in self.seconds]
+        if not known:
+            return {}
+        median = statistics.median(known)
+        return {nodeid: self.seconds.get(nodeid, median) for nodeid in nodeids}
+
+    def save(self) -> None:
+        """Save the history, replacing the file at once for concurrent runs."""
+        if not self.path:
+            return
+        try:
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.path) or ".", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as timings_file:
+                json.dump(self.seconds, timings_file, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_cli.py
+###
+"""CLI Start-up Tests."""
+import subprocess
+import sys
+from typing import Dict
+
+from cdpctl.command.validate import get_pytest_options
+
+# Cumulative microseconds for importing the CLI, measured by -X importtime
+CLI_IMPORT_TIME_BUDGET = 200000
+HEAVY_PACKAGES = ["ansible_runner", "azure", "boto3", "botocore", "pytest"]
+
+
+def get_import_times(statement: str) -> Dict[str, int]:
+    """Get the cumulative import time of the modules imported by a statement."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def get_heavy_imports(times: Dict[str, int]):
+    """Get the heavy packages imported."""
+    return sorted({name.split(".")[0] for name in times} & set(HEAVY_PACKAGES))
+
+
+def test_cli_import_is_fast():
+    """Test the CLI does not load pytest or the cloud SDKs to start."""
+    times = get_import_times("import cdpctl.cli")
+    assert get_heavy_imports(times) == []
+    assert times["cdpctl.cli"] < CLI_IMPORT_TIME_BUDGET
+
+
+def test_validate_command_imports_no_cloud_sdk():
+    """Test the cloud SDKs are only imported by the runs needing them."""
+    times = get_import_times("import cdpctl.command.validate")
+    assert get_heavy_imports(times) == ["pytest"]
+
+
+def test_pytest_options_skip_other_platforms():
+    """Test the validations of the other platforms are not collected."""
+    options = get_pytest_options(infra_type="aws", target="infra", debug=False)
+    ignored = options[options.index("--ignore-glob") + 1]
+    assert ignored.endswith("validate_azure_*.py")
+    assert "validate_aws_*.py" not in " ".join(options)
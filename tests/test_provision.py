@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_provision.py
+###
+"""Tests of the provision command."""
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from cdpctl.command import provision
+from cdpctl.command.provision import (
+    ProvisionCheckpoint,
+    ProvisionCommand,
+    ProvisionEvents,
+    get_run_names,
+    get_task_register,
+    run_provision,
+)
+
+
+class FakeRunner:
+    """Record the ansible-runner runs, with the number running at once."""
+
+    def __init__(self, failing: List[str] = None) -> None:
+        """Initialize the FakeRunner."""
+        self.runs: List[Dict[str, Any]] = []
+        self.running = 0
+        self.max_running = 0
+        self.failing = failing or []
+        self._lock = threading.Lock()
+
+    def run(self, **kwargs: Any) -> SimpleNamespace:
+        """Run a fake playbook."""
+        with self._lock:
+            self.runs.append(kwargs)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        kwargs["event_handler"]({"counter": 1, "event_data": {"name": "a task"}})
+        with self._lock:
+            self.running -= 1
+        failed = kwargs["ident"] in self.failing
+        return SimpleNamespace(status="failed" if failed else "successful")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir_fixture(monkeypatch, tmp_path) -> None:
+    """Keep the provision checkpoints in a temporary cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+@pytest.fixture(name="project_dir")
+def project_dir_fixture(tmp_path) -> str:
+    """Return a project directory with a playbook."""
+    project_dir = tmp_path / "example"
+    (project_dir / "project").mkdir(parents=True)
+    (project_dir / "project" / "test.yaml").write_text("- hosts: all\n")
+    return str(project_dir)
+
+
+def test_get_run_names() -> None:
+    """Test each config file gets a unique run name."""
+    assert get_run_names(["a/dev.yml", "b/dev.yml", "prod env.yaml"]) == [
+        "dev",
+        "dev-2",
+        "prod_env",
+    ]
+
+
+def test_provision_runs_at_once_up_to_width(monkeypatch, project_dir, tmp_path):
+    """Test the environments are provisioned at once, sharing the forks."""
+    runner = FakeRunner()
+    monkeypatch.setattr(provision.ansible_runner, "run", runner.run)
+    command = ProvisionCommand(
+        width=2, forks=20, project_dir=project_dir, work_dir=str(tmp_path / "work")
+    )
+
+    statuses = command.run_all("infra", ["dev.yml", "test.yml", "prod.yml"])
+
+    assert statuses == {
+        "dev": "successful",
+        "test": "successful",
+        "prod": "successful",
+    }
+    assert runner.max_running == 2
+    assert {run["forks"] for run in runner.runs} == {10}
+    private_dirs = {run["private_data_dir"] for run in runner.runs}
+    assert len(private_dirs) == 3
+    for private_dir in private_dirs:
+        assert os.path.isfile(os.path.join(private_dir, "project", "test.yaml"))
+    assert {run["extravars"]["cdpctl_config_file"] for run in runner.runs} == {
+        os.path.abspath(name) for name in ["dev.yml", "test.yml", "prod.yml"]
+    }
+
+
+def test_provision_removes_its_temporary_work_dir(monkeypatch, project_dir, tmp_path):
+    """Test the run directories are removed without a work directory."""
+    runner = FakeRunner()
+    monkeypatch.setattr(provision.ansible_runner, "run", runner.run)
+    monkeypatch.setattr(provision.tempfile, "tempdir", str(tmp_path / "tmp"))
+    (tmp_path / "tmp").mkdir()
+
+    statuses = ProvisionCommand(project_dir=project_dir).run_all("infra", ["dev.yml"])
+
+    assert statuses == {"dev": "successful"}
+    assert runner.runs[0]["private_data_dir"].startswith(str(tmp_path / "tmp"))
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_provision_events_are_written_as_ndjson(monkeypatch, project_dir, tmp_path):
+    """Test the events of the runs are written to the events file."""
+    monkeypatch.setattr(provision.ansible_runner, "run", FakeRunner().run)
+    events_file = tmp_path / "events.ndjson"
+    command = ProvisionCommand(
+        project_dir=project_dir,
+        work_dir=str(tmp_path / "work"),
+        events_file=str(events_file),
+    )
+
+    command.run_all("infra", ["dev.yml", "test.yml"])
+
+    events = [json.loads(line) for line in events_file.read_text().splitlines()]
+    assert sorted(
+        (event["run"], event["event"]) for event in events if "event" in event
+    ) == [
+        ("dev", "cdpctl_run_status"),
+        ("test", "cdpctl_run_status"),
+    ]
+    assert sorted(event["run"] for event in events if "event_data" in event) == [
+        "dev",
+        "test",
+    ]
+
+
+def test_provision_events_coalesce_tasks_and_aggregate_hosts(capsys) -> None:
+    """Test the tasks are printed once per redraw and the hosts summarized."""
+    events = ProvisionEvents(interval=60)
+    for task in ["first task", "second task"]:
+        events.put(
+            "dev", {"event": "playbook_on_task_start", "event_data": {"name": task}}
+        )
+        for host in ["host-1", "host-2"]:
+            events.put(
+                "dev",
+                {
+                    "event": "runner_on_ok",
+                    "event_data": {"host": host, "res": {"changed": host == "host-1"}},
+                },
+            )
+    events.put("dev", {"event": "runner_on_failed", "event_data": {"host": "host-2"}})
+
+    with events:
+        pass
+
+    lines = capsys.readouterr().out.splitlines()
+    assert "[dev] Task: first task" not in lines
+    assert lines == [
+        "[dev] Task: second task",
+        "[dev] host-1: ok=2 changed=2 failed=0 unreachable=0 skipped=0",
+        "[dev] host-2: ok=2 changed=0 failed=1 unreachable=0 skipped=0",
+    ]
+    assert events.events == 7
+
+
+def test_provision_events_never_block(tmp_path) -> None:
+    """Test the events are dropped from the progress only when the queue is full."""
+    events_file = tmp_path / "events.ndjson"
+    events = ProvisionEvents(max_size=2, events_file=str(events_file))
+    for counter in range(5):
+        events.put("dev", {"counter": counter})
+    assert events.dropped == 3
+
+    with events:
+        events.put_status("dev", "successful")
+
+    lines = [json.loads(line) for line in events_file.read_text().splitlines()]
+    assert [line.get("counter") for line in lines] == [0, 1, 2, 3, 4, None]
+
+    # Once stopped, the events are no longer written
+    events.put("dev", {"counter": 5})
+    assert events_file.read_text().count("\n") == 6
+
+
+def test_provision_runs_the_playbook_of_the_project(monkeypatch, tmp_path):
+    """Test the playbook and project directory are options of the command."""
+    runner = FakeRunner()
+    copied = []
+
+    def run(**kwargs: Any) -> SimpleNamespace:
+        copied.append(
+            os.path.isfile(
+                os.path.join(kwargs["private_data_dir"], "project", "site.yml")
+            )
+        )
+        return runner.run(**kwargs)
+
+    monkeypatch.setattr(provision.ansible_runner, "run", run)
+    project_dir = tmp_path / "cdp"
+    (project_dir / "project").mkdir(parents=True)
+    (project_dir / "project" / "site.yml").write_text("- hosts: all\n")
+
+    run_provision(
+        "infra", ["dev.yml"], project_dir=str(project_dir), playbook="site.yml"
+    )
+
+    (run_kwargs,) = runner.runs
+    assert run_kwargs["playbook"] == "site.yml"
+    assert copied == [True]
+
+
+def test_run_provision_fails_on_failed_runs(monkeypatch, project_dir):
+    """Test the command fails if any of the environments failed."""
+    monkeypatch.setattr(
+        provision.ansible_runner, "run", FakeRunner(failing=["test"]).run
+    )
+    monkeypatch.chdir(os.path.dirname(project_dir))
+
+    with pytest.raises(SystemExit) as e:
+        run_provision("infra", ["dev.yml", "test.yml"])
+    assert e.value.code == 1
+
+
+class PlaybookRunner:
+    """Run the tasks of a fake playbook, failing at a task."""
+
+    def __init__(self, tasks: List[str], failing_task: str = None) -> None:
+        """Initialize the PlaybookRunner."""
+        self.tasks = tasks
+        self.failing_task = failing_task
+        self.runs: List[Dict[str, Any]] = []
+
+    def run(self, **kwargs: Any) -> SimpleNamespace:
+        """Run the tasks from the start at task, if any."""
+        self.runs.append(kwargs)
+        start = 0
+        if kwargs.get("cmdline"):
+            start = self.tasks.index(kwargs["cmdline"].split(" ", 1)[1])
+        tasks = self.tasks[start:]
+        handler = kwargs["event_handler"]
+        for task in tasks:
+            handler({"event": "playbook_on_task_start", "event_data": {"task": task}})
+            if task == self.failing_task:
+                handler({"event": "runner_on_failed", "event_data": {"host": "h1"}})
+                return SimpleNamespace(status="failed")
+            handler(
+                {
+                    "event": "runner_on_ok",
+                    "event_data": {
+                        "host": "h1",
+                        "res": {"ansible_facts": {"last_task": task}},
+                    },
+                }
+            )
+        handler({"event": "playbook_on_stats", "event_data": {}})
+        return SimpleNamespace(status="successful")
+
+
+def test_provision_checkpoint_from_events() -> None:
+    """Test the resume task and facts of the events."""
+    checkpoint = ProvisionCheckpoint()
+    for event in [
+        {"event": "playbook_on_task_start", "event_data": {"task": "gather"}},
+        {
+            "event": "runner_on_ok",
+            "event_data": {"host": "h1", "res": {"ansible_facts": {"os": "linux"}}},
+        },
+        {"event": "playbook_on_task_start", "event_data": {"task": "optional"}},
+        {
+            "event": "runner_on_failed",
+            "event_data": {"host": "h1", "ignore_errors": True},
+        },
+        {"event": "playbook_on_task_start", "event_data": {"task": "create"}},
+        {"event": "runner_on_failed", "event_data": {"host": "h2"}},
+        {"event": "playbook_on_task_start", "event_data": {"task": "configure"}},
+    ]:
+        checkpoint.update(event)
+
+    assert checkpoint.resume_task == "create"
+    assert checkpoint.facts == {"h1": {"os": "linux"}}
+
+
+PLAYBOOK = """- hosts: all
+  tasks:
+    - name: find the subnets
+      command: aws ec2 describe-subnets
+      register: subnets
+
+    - name: pick a subnet
+      set_fact:
+        subnet: "{{ subnets.stdout }}"
+    - name: pick a subnet
+      debug:
+        var: subnet
+    - block:
+      - name: describe the subnet
+        command: >-
+          aws ec2 describe-subnets
+          --subnet-ids {{ subnet }}
+    # Kept for the cluster
+        register: described
+    - {name: tag the subnet, command: aws ec2 create-tags, register: tagged}
+"""
+
+
+def test_get_task_register(tmp_path) -> None:
+    """Test the registered variable is read from the parsed task."""
+    playbook = tmp_path / "site.yml"
+    playbook.write_text(PLAYBOOK)
+
+    assert get_task_register(f"{playbook}:3") == "subnets"
+    assert get_task_register(f"{playbook}:7") is None
+    assert get_task_register(f"{playbook}:14") == "described"
+    assert get_task_register(f"{playbook}:20") == "tagged"
+    assert get_task_register(f"{playbook}:99") is None
+    assert get_task_register(f"{tmp_path / 'missing.yml'}:3") is None
+
+
+def test_provision_checkpoint_restores_the_task_variables(tmp_path) -> None:
+    """Test the facts and registered variables are written as host variables."""
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    (project_dir / "site.yml").write_text(PLAYBOOK)
+    checkpoint = ProvisionCheckpoint()
+    checkpoint.source_dir = str(tmp_path)
+    for event in [
+        {
+            "event": "playbook_on_task_start",
+            "event_data": {
+                "task": "find the subnets",
+                "task_path": f"{project_dir / 'site.yml'}:3",
+            },
+        },
+        {
+            "event": "runner_on_ok",
+            "event_data": {"host": "localhost", "res": {"stdout": "subnet-1"}},
+        },
+        {
+            "event": "playbook_on_task_start",
+            "event_data": {"task": "gather", "task_path": "gather.yml:1"},
+        },
+        {
+            "event": "runner_on_ok",
+            "event_data": {
+                "host": "localhost",
+                "task_action": "gather_facts",
+                "res": {"ansible_facts": {"os": "linux"}},
+            },
+        },
+        {
+            "event": "playbook_on_task_start",
+            "event_data": {
+                "task": "pick a subnet",
+                "task_path": f"{project_dir / 'site.yml'}:7",
+            },
+        },
+        {
+            "event": "runner_on_ok",
+            "event_data": {
+                "host": "localhost",
+                "res": {"ansible_facts": {"subnet": "subnet-1"}},
+            },
+        },
+    ]:
+        checkpoint.update(event)
+
+    assert checkpoint.task_paths["find the subnets"] == ["project/site.yml:3"]
+    checkpoint.write_host_vars(str(project_dir))
+    host_vars = json.loads((project_dir / "host_vars" / "localhost.json").read_text())
+    assert host_vars == {"subnet": "subnet-1", "subnets": {"stdout": "subnet-1"}}
+
+
+def test_provision_checkpoint_refuses_ambiguous_resume_tasks() -> None:
+    """Test a run is not resumed at a task name used by several tasks."""
+    checkpoint = ProvisionCheckpoint()
+    for event in [
+        {
+            "event": "playbook_on_task_start",
+            "event_data": {"task": "pick a subnet", "task_path": "site.yml:7"},
+        },
+        {
+            "event": "playbook_on_task_start",
+            "event_data": {"task": "pick a subnet", "task_path": "site.yml:10"},
+        },
+        {"event": "runner_on_failed", "event_data": {"host": "localhost"}},
+    ]:
+        checkpoint.update(event)
+
+    assert checkpoint.resume_task == "pick a subnet"
+    with pytest.raises(ValueError):
+        checkpoint.start()
+    assert checkpoint.resume_task == "pick a subnet"
+
+
+def test_provision_resumes_at_the_failed_task(monkeypatch, project_dir, tmp_path):
+    """Test resuming starts at the failed task and skips provisioned runs."""
+    runner = PlaybookRunner(["first", "second", "third"], failing_task="second")
+    monkeypatch.setattr(provision.ansible_runner, "run", runner.run)
+
+    def provision_dev(resume: bool) -> Dict[str, str]:
+        return ProvisionCommand(
+            project_dir=project_dir, work_dir=str(tmp_path / "work"), resume=resume
+        ).run_all("infra", ["dev.yml"])
+
+    assert provision_dev(resume=False) == {"dev": "failed"}
+    runner.failing_task = None
+    assert provision_dev(resume=True) == {"dev": "successful"}
+    assert provision_dev(resume=True) == {"dev": "successful"}
+
+    assert len(runner.runs) == 2
+    assert runner.runs[0]["cmdline"] is None
+    assert runner.runs[1]["cmdline"] == "--start-at-task second"
+    fact_cache_dir = runner.runs[1]["envvars"]["ANSIBLE_CACHE_PLUGIN_CONNECTION"]
+    assert (
+        fact_cache_dir == runner.runs[0]["envvars"]["ANSIBLE_CACHE_PLUGIN_CONNECTION"]
+    )
+    assert os.path.isdir(fact_cache_dir)
+    cached_facts = os.path.join(fact_cache_dir, "h1")
+    with open(cached_facts, "w", encoding="utf-8") as f:
+        f.write("{}")
+    host_vars_file = os.path.join(
+        runner.runs[1]["private_data_dir"], "project", "host_vars", "h1.json"
+    )
+    with open(host_vars_file, encoding="utf-8") as f:
+        assert json.load(f) == {"last_task": "first"}
+
+    checkpoint = ProvisionCheckpoint.for_run("infra", "dev", "dev.yml", resume=True)
+    assert checkpoint.status == "successful"
+    assert checkpoint.facts == {"h1": {"last_task": "third"}}
+
+    # A new run does not use the cached facts of the previous ones
+    assert provision_dev(resume=False) == {"dev": "successful"}
+    assert not os.path.exists(cached_facts)
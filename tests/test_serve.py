@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_serve.py
+###
+"""Serve Command Tests."""
+import http.client
+import json
+import os
+import stat
+import threading
+
+import pytest
+
+from cdpctl.command import serve
+from cdpctl.command.serve import (
+    ValidationHTTPServer,
+    ValidationService,
+    ValidationUnixServer,
+)
+from cdpctl.validation import conftest
+from cdpctl.validation.policies import get_policy_document_cache
+from cdpctl.validation.ratelimit import ThrottleEvent, get_rate_limiter
+
+CONFIG = {"infra_type": "aws", "infra": {"aws": {"region": "us-west-2"}}}
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """Provide a service whose validation runs are recorded instead of run."""
+    runs = []
+
+    def run_checks(**kwargs):
+        runs.append(kwargs)
+        conftest.plan = kwargs["plan"] or "plan"
+
+    monkeypatch.setattr(serve, "run_checks", run_checks)
+    monkeypatch.setattr(serve, "get_cloud_config_error", lambda **_: None)
+    monkeypatch.setattr(conftest, "plan", None)
+    service = ValidationService(work_dir=str(tmp_path))
+    service.runs = runs
+    return service
+
+
+@pytest.mark.parametrize(
+    "request_, message",
+    [
+        ({}, "No config was provided"),
+        ({"config": "infra_type: [aws"}, "Unable to load the config"),
+        ({"config": CONFIG, "target": "cluster"}, "Unsupported target: cluster"),
+        ({"config": CONFIG, "output_format": "xml"}, "Unsupported output format"),
+        ({"config": {"infra_type": "gcp"}}, "Unsupported infra_type: gcp"),
+        ({"config": CONFIG, "deadline": "60"}, "The deadline must be a positive"),
+        ({"config": CONFIG, "deadline": 0}, "The deadline must be a positive"),
+        ({"config": CONFIG, "deadline": -5}, "The deadline must be a positive"),
+        ({"config": CONFIG, "deadline": True}, "The deadline must be a positive"),
+    ],
+)
+def test_validate_rejects_bad_requests(service, request_, message):
+    status, _, body = service.validate(request_)
+    assert status == 400
+    assert json.loads(body)["error"].startswith(message)
+    assert service.runs == []
+
+
+def test_validate_reports_cloud_config_errors(service, monkeypatch):
+    monkeypatch.setattr(serve, "get_cloud_config_error", lambda **_: "No region")
+    status, _, body = service.validate({"config": CONFIG})
+    assert status == 422
+    assert json.loads(body) == {"error": "No region"}
+
+
+def test_validate_reuses_the_plan_and_config_file(service):
+    status, content_type, body = service.validate({"config": CONFIG})
+    assert (status, content_type, json.loads(body)) == (200, "application/json", [])
+    status, _, _ = service.validate(
+        {"config": "infra_type: aws\ninfra: {aws: {region: us-west-2}}"}
+    )
+    assert status == 200
+
+    first, second = service.runs
+    assert first["plan"] is None
+    assert second["plan"] == "plan"
+    assert first["config_file"] == second["config_file"]
+    # The config file is only kept during the run
+    assert not os.path.exists(first["config_file"])
+    assert service.plans == {("aws", "infra"): "plan"}
+
+
+def test_validate_passes_the_deadline(service):
+    status, _, _ = service.validate({"config": CONFIG, "deadline": 2.5})
+    assert status == 200
+    assert service.runs[0]["deadline"] == 2.5
+
+
+def test_validate_drops_the_state_of_the_previous_run(service):
+    get_rate_limiter().record_throttle(
+        ThrottleEvent("aws", "default", "iam", "GetRole", 1.0)
+    )
+    get_policy_document_cache()._documents["some-hash"] = {}
+
+    status, _, _ = service.validate({"config": CONFIG})
+
+    assert status == 200
+    assert get_rate_limiter().get_throttle_events() == []
+    assert get_policy_document_cache()._documents == {}
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_http_server(service):
+    server = ValidationHTTPServer(("127.0.0.1", 0), service, "secret")
+    _serve(server)
+    headers = {"Authorization": "Bearer secret"}
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        connection.request("GET", "/health")
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())["status"] == "ok"
+
+        connection.request("POST", "/validate", body="{", headers=headers)
+        response = connection.getresponse()
+        assert response.status == 400
+        response.read()
+
+        for unauthorized in ({}, {"Authorization": "Bearer other"}):
+            connection.request(
+                "POST",
+                "/validate",
+                body=json.dumps({"config": CONFIG}),
+                headers=unauthorized,
+            )
+            response = connection.getresponse()
+            assert response.status == 401
+            response.read()
+        assert service.runs == []
+
+        connection.request(
+            "POST", "/validate", body=json.dumps({"config": CONFIG}), headers=headers
+        )
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read()) == []
+
+        connection.request("GET", "/validate")
+        assert connection.getresponse().status == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class UnixConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket."""
+
+    def __init__(self, path):
+        """Initialize the UnixConnection."""
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        """Connect to the Unix socket."""
+        import socket
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def test_http_server_requires_a_token(service):
+    with pytest.raises(ValueError):
+        ValidationHTTPServer(("127.0.0.1", 0), service, "")
+
+
+def test_unix_server(service, tmp_path):
+    socket_path = str(tmp_path / "cdpctl.sock")
+    server = ValidationUnixServer(socket_path, service)
+    _serve(server)
+    try:
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+        connection = UnixConnection(socket_path)
+        connection.request("GET", "/health")
+        assert connection.getresponse().status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_teardown.py
+###
+"""Tests of the teardown command."""
+import json
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import Mock
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_ec2, mock_iam, mock_s3
+
+from cdpctl.command.teardown import (
+    DELETED,
+    FAILED,
+    NOT_FOUND,
+    SKIPPED,
+    TeardownPlan,
+    TeardownResource,
+    get_adls_directory,
+    get_aws_plan,
+    get_azure_plan,
+)
+from cdpctl.validation import aws_utils, azure_utils
+from cdpctl.validation.cache import get_client_pool, get_resource_cache
+
+REGION = "us-west-2"
+
+
+def _client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Delete")
+
+
+def _plan(resources: List[TeardownResource]) -> TeardownPlan:
+    def is_error(codes: List[str], e: Exception) -> bool:
+        return isinstance(e, ClientError) and e.response["Error"]["Code"] in codes
+
+    return TeardownPlan(
+        resources,
+        is_not_found=lambda e: is_error(["NotFound"], e),
+        is_retryable=lambda e: is_error(["DependencyViolation"], e),
+    )
+
+
+class FakeDeletions:
+    """Record the deletions, failing them as asked."""
+
+    def __init__(self, errors: Dict[str, List[str]] = None) -> None:
+        """Initialize the FakeDeletions."""
+        self.errors = errors or {}
+        self.deleted: List[str] = []
+        self._lock = threading.Lock()
+
+    def resource(self, name: str, after: List[str] = None) -> TeardownResource:
+        """Get a resource deleted by the fake deletions."""
+        return TeardownResource(
+            "fake",
+            name,
+            f"fake:{name}",
+            lambda: self.delete(name),
+            after=[("fake", before) for before in after or []],
+        )
+
+    def delete(self, name: str) -> None:
+        """Delete a fake resource, raising its next error if any."""
+        with self._lock:
+            errors = self.errors.get(name)
+            if errors:
+                raise _client_error(errors.pop(0))
+            self.deleted.append(name)
+
+
+@pytest.fixture(autouse=True)
+def clear_resource_cache():
+    """Clear the resources cached by the planning between tests."""
+    get_resource_cache().clear()
+    yield
+    get_resource_cache().clear()
+
+
+@pytest.fixture(name="client_pool")
+def client_pool_fixture(monkeypatch):
+    """Share the AWS clients of a test, to record their operations."""
+    monkeypatch.setattr(get_client_pool(), "enabled", True)
+    yield get_client_pool()
+    get_client_pool().clear()
+
+
+def test_teardown_plan_orders_the_deletions() -> None:
+    """Test the resources are deleted after the ones depending on them."""
+    deletions = FakeDeletions()
+    plan = _plan(
+        [
+            deletions.resource("vpc", after=["subnet-1", "subnet-2"]),
+            deletions.resource("subnet-1", after=["nat"]),
+            deletions.resource("subnet-2", after=["nat"]),
+            deletions.resource("nat"),
+            deletions.resource("role", after=["unknown"]),
+        ]
+    )
+
+    assert [[r.resource_id for r in wave] for wave in plan.get_waves()] == [
+        ["nat", "role"],
+        ["subnet-1", "subnet-2"],
+        ["vpc"],
+    ]
+    results = plan.execute(sleep=lambda seconds: None)
+    assert {result.status for result in results.values()} == {DELETED}
+    assert deletions.deleted.index("vpc") == 4
+    assert deletions.deleted.index("nat") < deletions.deleted.index("subnet-1")
+
+
+def test_teardown_plan_rejects_circular_dependencies() -> None:
+    """Test a circular dependency is reported before deleting anything."""
+    deletions = FakeDeletions()
+    plan = _plan([deletions.resource("a", after=["b"]), deletions.resource("b", ["a"])])
+    with pytest.raises(ValueError, match="Circular"):
+        plan.execute()
+    assert deletions.deleted == []
+
+
+def test_teardown_retries_and_skips_the_dependents_of_failures() -> None:
+    """Test in use resources are retried, and failures block their dependents."""
+    deletions = FakeDeletions(
+        errors={
+            "subnet": ["DependencyViolation", "DependencyViolation"],
+            "profile": ["AccessDenied"],
+            "gone": ["NotFound"],
+        }
+    )
+    plan = _plan(
+        [
+            deletions.resource("vpc", after=["subnet"]),
+            deletions.resource("subnet"),
+            deletions.resource("profile"),
+            deletions.resource("role", after=["profile"]),
+            deletions.resource("gone"),
+        ]
+    )
+    sleeps: List[float] = []
+
+    results = plan.execute(sleep=sleeps.append)
+
+    statuses = {key[1]: result.status for key, result in results.items()}
+    assert statuses == {
+        "vpc": DELETED,
+        "subnet": DELETED,
+        "profile": FAILED,
+        "role": SKIPPED,
+        "gone": NOT_FOUND,
+    }
+    assert len(sleeps) == 2
+    assert results[("fake", "role")].message == "waiting on fake profile"
+
+
+class OperationRecorder:
+    """Record the operations called by the AWS clients."""
+
+    def __init__(self) -> None:
+        """Initialize the OperationRecorder."""
+        self.operations: List[str] = []
+
+    def __call__(self, model: Any, **kwargs: Any) -> None:
+        """Record an operation."""
+        self.operations.append(model.name)
+
+
+def _create_aws_environment() -> Dict[str, Any]:
+    """Create the resources of an environment, returning their ids and config."""
+    ec2 = boto3.client("ec2", region_name=REGION)
+    iam = boto3.client("iam", region_name=REGION)
+    s3 = boto3.client("s3", region_name=REGION)
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    subnet_id = ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.1.0/24")["Subnet"][
+        "SubnetId"
+    ]
+    other_subnet_id = ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.2.0/24")[
+        "Subnet"
+    ]["SubnetId"]
+    gateway_id = ec2.create_internet_gateway()["InternetGateway"]["InternetGatewayId"]
+    ec2.attach_internet_gateway(InternetGatewayId=gateway_id, VpcId=vpc_id)
+    allocation_id = ec2.allocate_address(Domain="vpc")["AllocationId"]
+    nat_gateway_id = ec2.create_nat_gateway(
+        SubnetId=other_subnet_id, AllocationId=allocation_id
+    )["NatGateway"]["NatGatewayId"]
+    route_table_id = ec2.create_route_table(VpcId=vpc_id)["RouteTable"]["RouteTableId"]
+    group_id = ec2.create_security_group(
+        GroupName="knox", Description="knox", VpcId=vpc_id
+    )["GroupId"]
+    iam.create_role(RoleName="idbroker-role", AssumeRolePolicyDocument="{}")
+    iam.put_role_policy(
+        RoleName="idbroker-role",
+        PolicyName="inline",
+        PolicyDocument=json.dumps(
+            {
+                "Version": "2012-10-17",
+                "Statement": [{"Effect": "Allow", "Action": "s3:*", "Resource": "*"}],
+            }
+        ),
+    )
+    iam.create_instance_profile(InstanceProfileName="idbroker")
+    iam.add_role_to_instance_profile(
+        InstanceProfileName="idbroker", RoleName="idbroker-role"
+    )
+    s3.create_bucket(
+        Bucket="cdp-data", CreateBucketConfiguration={"LocationConstraint": REGION}
+    )
+    s3.put_object(Bucket="cdp-data", Key="data/file", Body=b"data")
+    s3.put_object(Bucket="cdp-data", Key="data2/file", Body=b"data")
+    config = {
+        "infra_type": "aws",
+        "infra": {
+            "aws": {
+                "region": REGION,
+                "profile": None,
+                "vpc": {
+                    "existing": {
+                        "vpc_id": vpc_id,
+                        "public_subnet_ids": [subnet_id],
+                        "security_groups": {"knox_id": group_id},
+                        "storage": {"data": "s3a://cdp-data/data"},
+                    }
+                },
+            }
+        },
+        "env": {"aws": {"instance_profile": {"name": {"idbroker": "idbroker"}}}},
+    }
+    return {
+        "config": config,
+        "vpc": vpc_id,
+        "subnet": subnet_id,
+        "other_subnet": other_subnet_id,
+        "internet_gateway": gateway_id,
+        "allocation": allocation_id,
+        "nat_gateway": nat_gateway_id,
+        "route_table": route_table_id,
+        "security_group": group_id,
+    }
+
+
+def _record_operations(config: Dict[str, Any]) -> "OperationRecorder":
+    """Record the operations of the clients, pooled so the planning uses them."""
+    recorder = OperationRecorder()
+    for service in ["ec2", "iam", "s3"]:
+        aws_utils.get_client(service, config).meta.events.register(
+            "before-call", recorder
+        )
+    return recorder
+
+
+@mock_ec2
+@mock_iam
+@mock_s3
+def test_aws_teardown(monkeypatch, client_pool) -> None:
+    """Test only the AWS resources of the config are planned, then deleted."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    ids = _create_aws_environment()
+    recorder = _record_operations(ids["config"])
+
+    plan = get_aws_plan(ids["config"])
+
+    assert recorder.operations
+    assert all(
+        operation.startswith(("Describe", "Get", "List", "Head"))
+        for operation in recorder.operations
+    )
+    waves = [[str(resource) for resource in wave] for wave in plan.get_waves()]
+    assert waves == [
+        [
+            "instance_profile idbroker",
+            "s3_location s3a://cdp-data/data",
+            f"security_group {ids['security_group']}",
+            f"subnet {ids['subnet']}",
+        ],
+        ["role idbroker-role"],
+    ]
+
+    results = plan.execute(sleep=lambda seconds: None)
+
+    assert {result.status for result in results.values()} == {DELETED}
+    ec2 = boto3.client("ec2", region_name=REGION)
+    s3 = boto3.client("s3", region_name=REGION)
+    assert [vpc["VpcId"] for vpc in ec2.describe_vpcs()["Vpcs"]].count(ids["vpc"]) == 1
+    assert [
+        subnet["SubnetId"]
+        for subnet in ec2.describe_subnets(
+            Filters=[{"Name": "vpc-id", "Values": [ids["vpc"]]}]
+        )["Subnets"]
+    ] == [ids["other_subnet"]]
+    assert [
+        item["Key"] for item in s3.list_objects_v2(Bucket="cdp-data")["Contents"]
+    ] == ["data2/file"]
+
+
+@mock_ec2
+@mock_iam
+@mock_s3
+def test_aws_teardown_of_the_vpc_and_buckets(monkeypatch, client_pool) -> None:
+    """Test the VPC and buckets are only deleted when asked to."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    ids = _create_aws_environment()
+    recorder = _record_operations(ids["config"])
+
+    plan = get_aws_plan(ids["config"], delete_vpc=True, delete_buckets=True)
+
+    assert recorder.operations
+    assert all(
+        operation.startswith(("Describe", "Get", "List", "Head"))
+        for operation in recorder.operations
+    )
+    waves = [[str(resource) for resource in wave] for wave in plan.get_waves()]
+    assert waves == [
+        [
+            "instance_profile idbroker",
+            f"nat_gateway {ids['nat_gateway']}",
+            f"route_table {ids['route_table']}",
+            "s3_location s3a://cdp-data/data",
+            f"security_group {ids['security_group']}",
+        ],
+        [
+            "bucket cdp-data",
+            f"internet_gateway {ids['internet_gateway']}",
+            "role idbroker-role",
+            *sorted(f"subnet {ids[key]}" for key in ["subnet", "other_subnet"]),
+        ],
+        [f"vpc {ids['vpc']}"],
+    ]
+
+    results = plan.execute(sleep=lambda seconds: None)
+
+    assert {result.status for result in results.values()} == {DELETED}
+    ec2 = boto3.client("ec2", region_name=REGION)
+    s3 = boto3.client("s3", region_name=REGION)
+    iam = boto3.client("iam", region_name=REGION)
+    assert (
+        ec2.describe_vpcs(Filters=[{"Name": "vpc-id", "Values": [ids["vpc"]]}])["Vpcs"]
+        == []
+    )
+    assert ids["allocation"] not in [
+        address.get("AllocationId") for address in ec2.describe_addresses()["Addresses"]
+    ]
+    assert "ReleaseAddress" in recorder.operations
+    assert iam.list_roles()["Roles"] == []
+    assert s3.list_buckets()["Buckets"] == []
+
+
+AZURE_CONFIG = {
+    "infra": {
+        "azure": {"subscription_id": "sub-1", "metagroup": {"name": "cdp-rg"}},
+        "vpc": {"name": "cdp-vnet"},
+        "security_group": {"default": {"name": "cdp-nsg"}},
+    },
+    "env": {
+        "azure": {
+            "role": {"name": {"idbroker": "idbroker"}},
+            "storage": {
+                "path": {
+                    "data": "abfs://data@cdp.dfs.core.windows.net/cluster/data",
+                    "logs": "abfs://logs@cdp.dfs.core.windows.net",
+                }
+            },
+        }
+    },
+}
+
+
+@pytest.fixture(name="azure_clients")
+def azure_clients_fixture(monkeypatch) -> Dict[str, Mock]:
+    """Provide the mocked Azure clients of the teardown."""
+    clients = {client_type: Mock() for client_type in ["resource", "auth", "network"]}
+    clients["datalake"] = Mock()
+    clients["auth"].role_assignments.list.return_value = [
+        SimpleNamespace(id="assignment-1")
+    ]
+    clients["datalake"].get_file_system_client.return_value.get_paths.return_value = [
+        SimpleNamespace(name="audit", is_directory=True),
+        SimpleNamespace(name="README", is_directory=False),
+    ]
+    monkeypatch.setattr(
+        azure_utils,
+        "get_client",
+        lambda client_type, config, url=None: clients[client_type],
+    )
+    monkeypatch.setattr(
+        azure_utils,
+        "fetch_identity",
+        lambda client, identity_id: SimpleNamespace(
+            properties={"principalId": "principal-1"}
+        ),
+    )
+    return clients
+
+
+def test_get_adls_directory() -> None:
+    assert get_adls_directory("abfs://data@cdp.dfs.core.windows.net/a/b/") == "a/b"
+    assert get_adls_directory("abfs://data@cdp.dfs.core.windows.net") == ""
+
+
+def test_azure_teardown_keeps_the_vnet_and_file_systems(azure_clients) -> None:
+    """Test only the directories of the ADLS paths are deleted by default."""
+    plan = get_azure_plan(AZURE_CONFIG)
+
+    assert sorted(kind for kind, _ in plan.resources) == [
+        "adls_location",
+        "adls_location",
+        "identity",
+        "role_assignment",
+    ]
+
+    results = plan.execute(sleep=lambda seconds: None)
+
+    assert {result.status for result in results.values()} == {DELETED}
+    file_system_client = azure_clients["datalake"].get_file_system_client.return_value
+    assert sorted(
+        call.args[0] for call in file_system_client.delete_directory.call_args_list
+    ) == ["audit", "cluster/data"]
+    file_system_client.delete_file.assert_called_once_with("README")
+    azure_clients["datalake"].delete_file_system.assert_not_called()
+    azure_clients["network"].virtual_networks.begin_delete.assert_not_called()
+    azure_clients["network"].network_security_groups.begin_delete.assert_not_called()
+
+
+def test_azure_teardown_of_the_vnet_and_file_systems(azure_clients) -> None:
+    """Test the VNet and file systems are only deleted when asked to."""
+    plan = get_azure_plan(AZURE_CONFIG, delete_vpc=True, delete_buckets=True)
+
+    waves = [[str(resource) for resource in wave] for wave in plan.get_waves()]
+    assert waves == [
+        [
+            "adls_location abfs://data@cdp.dfs.core.windows.net/cluster/data",
+            "adls_location abfs://logs@cdp.dfs.core.windows.net",
+            "role_assignment assignment-1",
+            "vnet cdp-vnet",
+        ],
+        [
+            "container https://cdp.dfs.core.windows.net/data",
+            "container https://cdp.dfs.core.windows.net/logs",
+            "identity " + azure_utils.get_identity_id("sub-1", "cdp-rg", "idbroker"),
+            "security_group cdp-nsg",
+        ],
+    ]
+
+    results = plan.execute(sleep=lambda seconds: None)
+
+    assert {result.status for result in results.values()} == {DELETED}
+    assert sorted(
+        call.args[0]
+        for call in azure_clients["datalake"].delete_file_system.call_args_list
+    ) == ["data", "logs"]
+    azure_clients["network"].virtual_networks.begin_delete.assert_called_once_with(
+        "cdp-rg", "cdp-vnet"
+    )
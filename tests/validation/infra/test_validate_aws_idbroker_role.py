@@ -172,10 +172,9 @@ def test_idbroker_role_with_no_assumerole_policy() -> None:
         includeTrustPolicy=True,
     )
 
+    # ranger_audit_arn names the same role, which is only fetched once
     add_get_role_response(stubber, datalake_admin_arn, False)
 
-    add_get_role_response(stubber, ranger_audit_arn, False)
-
     add_simulate_policy_response(
         stubber=stubber,
         role_arn=idbroker_instance_profile,
@@ -203,10 +202,9 @@ def test_idbroker_role_with_assumerole_policy() -> None:
         includeTrustPolicy=True,
     )
 
+    # ranger_audit_arn names the same role, which is only fetched once
     add_get_role_response(stubber, datalake_admin_arn, False)
 
-    add_get_role_response(stubber, ranger_audit_arn, False)
-
     add_simulate_policy_response(
         stubber=stubber,
         role_arn=idbroker_instance_profile,
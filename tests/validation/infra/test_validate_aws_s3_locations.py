@@ -120,6 +120,65 @@ def test_aws_s3_data_bucket_config_is_invalid(s3_client: S3Client) -> None:
     func(config2, s3_client)
 
 
+# type: ignore[misc]
+def test_aws_s3_data_bucket_forbidden(s3_client: S3Client) -> None:
+    """Test the validation with a forbidden s3 bucket fails."""
+    config: Dict[str, Any] = {
+        "infra": {
+            "aws": {
+                "region": "us-west-2",
+                "vpc": {"existing": {"storage": {"data": "s3a://mybucket/data"}}},
+            }
+        }
+    }
+    stubber = Stubber(s3_client)
+    stubber.add_client_error(
+        "get_bucket_location",
+        service_error_code="AccessDenied",
+        service_message="Access Denied",
+        expected_params={"Bucket": "mybucket"},
+    )
+    stubber.activate()
+    func = expect_validation_failure(aws_s3_data_bucket_exists)
+    func(config, s3_client)
+
+
+# type: ignore[misc]
+def test_aws_s3_buckets_shared_by_locations(s3_client: S3Client) -> None:
+    """Test the locations sharing a bucket are checked with a single call."""
+    config: Dict[str, Any] = {
+        "infra": {
+            "aws": {
+                "region": "us-west-2",
+                "vpc": {
+                    "existing": {
+                        "storage": {
+                            "data": "s3a://mybucket/data",
+                            "logs": "s3a://mybucket/logs",
+                            "backup": "s3a://mybucket/backup",
+                        }
+                    }
+                },
+            }
+        }
+    }
+    stubber = Stubber(s3_client)
+    stubber.add_response(
+        "get_bucket_location",
+        {"LocationConstraint": "us-west-2"},
+        expected_params={"Bucket": "mybucket"},
+    )
+    with stubber:
+        for check in [
+            aws_s3_data_bucket_exists,
+            aws_s3_logs_bucket_exists,
+            aws_s3_backup_bucket_exists,
+        ]:
+            func = expect_validation_success(check)
+            func(config, s3_client)
+        stubber.assert_no_pending_responses()
+
+
 # type: ignore[misc]
 def test_aws_s3_logs_bucket_exists(s3_client: S3Client) -> None:
     """Test the check of an existing s3 bucket."""
@@ -287,6 +287,34 @@ def test_aws_public_subnets_route_validation_success(ec2_client: EC2Client) -> N
         sample_public_subnets_response,
         expected_params={"SubnetIds": public_subnet_ids},
     )
+    stubber.add_response(
+        "describe_internet_gateways",
+        {
+            "InternetGateways": [
+                {
+                    "Attachments": [
+                        {"State": "available", "VpcId": "vpc-testcdp12345"}
+                    ],
+                    "InternetGatewayId": "igw-0c345435ee08c38ecd",
+                    "OwnerId": "924123132397",
+                    "Tags": [],
+                }
+            ],
+        },
+        expected_params={
+            "Filters": [
+                {
+                    "Name": "attachment.vpc-id",
+                    "Values": ["vpc-testcdp12345"],
+                },
+                {
+                    "Name": "attachment.state",
+                    "Values": ["available"],
+                },
+            ],
+            "MaxResults": 100,
+        },
+    )
     stubber.add_response(
         "describe_route_tables",
         {
@@ -331,35 +359,8 @@ def test_aws_public_subnets_route_validation_success(ec2_client: EC2Client) -> N
                     "Name": "route.state",
                     "Values": ["active"],
                 },
-            ]
-        },
-    )
-
-    stubber.add_response(
-        "describe_internet_gateways",
-        {
-            "InternetGateways": [
-                {
-                    "Attachments": [
-                        {"State": "available", "VpcId": "vpc-testcdp12345"}
-                    ],
-                    "InternetGatewayId": "igw-0c345435ee08c38ecd",
-                    "OwnerId": "924123132397",
-                    "Tags": [],
-                }
             ],
-        },
-        expected_params={
-            "Filters": [
-                {
-                    "Name": "attachment.vpc-id",
-                    "Values": ["vpc-testcdp12345"],
-                },
-                {
-                    "Name": "attachment.state",
-                    "Values": ["available"],
-                },
-            ]
+            "MaxResults": 100,
         },
     )
     with stubber:
@@ -398,41 +399,6 @@ def test_aws_public_subnets_route_validation_failure(ec2_client: EC2Client) -> N
         },
         expected_params={"SubnetIds": public_subnet_ids},
     )
-    stubber.add_response(
-        "describe_route_tables",
-        {
-            "RouteTables": [
-                {
-                    "Associations": [],
-                    "OwnerId": "5634563456745",
-                    "PropagatingVgws": [],
-                    "RouteTableId": "rtb-0c451408c5eed6a63",
-                    "Routes": [
-                        {
-                            "DestinationPrefixListId": "pl-68a54001",
-                            "GatewayId": "vpce-0dfgdg4353431d",
-                            "Origin": "CreateRoute",
-                            "State": "active",
-                        },
-                    ],
-                    "Tags": [],
-                    "VpcId": "vpc-testcdp12345",
-                }
-            ]
-        },
-        expected_params={
-            "Filters": [
-                {
-                    "Name": "association.subnet-id",
-                    "Values": public_subnet_ids,
-                },
-                {
-                    "Name": "route.state",
-                    "Values": ["active"],
-                },
-            ]
-        },
-    )
     stubber.add_response(
         "describe_internet_gateways",
         {
@@ -448,7 +414,8 @@ def test_aws_public_subnets_route_validation_failure(ec2_client: EC2Client) -> N
                     "Name": "attachment.state",
                     "Values": ["available"],
                 },
-            ]
+            ],
+            "MaxResults": 100,
         },
     )
     with stubber:
@@ -668,6 +635,29 @@ def test_aws_private_subnets_route_validation_success(ec2_client: EC2Client) ->
         sample_private_subnets_response,
         expected_params={"SubnetIds": private_subnet_ids},
     )
+    stubber.add_response(
+        "describe_nat_gateways",
+        {
+            "NatGateways": [
+                {
+                    "NatGatewayId": "nat-test1234566789",
+                }
+            ],
+        },
+        expected_params={
+            "Filter": [
+                {
+                    "Name": "vpc-id",
+                    "Values": ["vpc-testcdp12345"],
+                },
+                {
+                    "Name": "state",
+                    "Values": ["available"],
+                },
+            ],
+            "MaxResults": 100,
+        },
+    )
     stubber.add_response(
         "describe_route_tables",
         {
@@ -712,29 +702,8 @@ def test_aws_private_subnets_route_validation_success(ec2_client: EC2Client) ->
                     "Name": "route.state",
                     "Values": ["active"],
                 },
-            ]
-        },
-    )
-    stubber.add_response(
-        "describe_nat_gateways",
-        {
-            "NatGateways": [
-                {
-                    "NatGatewayId": "nat-test1234566789",
-                }
             ],
-        },
-        expected_params={
-            "Filters": [
-                {
-                    "Name": "vpc-id",
-                    "Values": ["vpc-testcdp12345"],
-                },
-                {
-                    "Name": "state",
-                    "Values": ["available"],
-                },
-            ]
+            "MaxResults": 100,
         },
     )
     with stubber:
@@ -773,48 +742,13 @@ def test_aws_private_subnets_route_validation_failure(ec2_client: EC2Client) ->
         },
         expected_params={"SubnetIds": private_subnet_ids},
     )
-    stubber.add_response(
-        "describe_route_tables",
-        {
-            "RouteTables": [
-                {
-                    "Associations": [],
-                    "OwnerId": "5634563456745",
-                    "PropagatingVgws": [],
-                    "RouteTableId": "rtb-0c451408c5eed6a63",
-                    "Routes": [
-                        {
-                            "DestinationPrefixListId": "pl-68a54001",
-                            "GatewayId": "vpce-test12123423",
-                            "Origin": "CreateRoute",
-                            "State": "active",
-                        },
-                    ],
-                    "Tags": [],
-                    "VpcId": "vpc-testcdp12345",
-                }
-            ]
-        },
-        expected_params={
-            "Filters": [
-                {
-                    "Name": "association.subnet-id",
-                    "Values": private_subnet_ids,
-                },
-                {
-                    "Name": "route.state",
-                    "Values": ["active"],
-                },
-            ]
-        },
-    )
     stubber.add_response(
         "describe_nat_gateways",
         {
             "NatGateways": [],
         },
         expected_params={
-            "Filters": [
+            "Filter": [
                 {
                     "Name": "vpc-id",
                     "Values": ["vpc-testcdp12345"],
@@ -823,7 +757,8 @@ def test_aws_private_subnets_route_validation_failure(ec2_client: EC2Client) ->
                     "Name": "state",
                     "Values": ["available"],
                 },
-            ]
+            ],
+            "MaxResults": 100,
         },
     )
     with stubber:
@@ -1041,7 +976,7 @@ def test_aws_vpc_validation_success(ec2_client: EC2Client) -> None:
             "Subnets": sample_public_subnets_response["Subnets"]
             + sample_private_subnets_response["Subnets"]
         },
-        expected_params={"Filters": filters},
+        expected_params={"Filters": filters, "MaxResults": 100},
     )
     stubber.add_response(
         "describe_vpc_attribute",
@@ -1097,7 +1032,7 @@ def test_aws_vpc_validation_failure(ec2_client: EC2Client) -> None:
             "Subnets": sample_public_subnets_response["Subnets"]
             + sample_private_subnets_response["Subnets"]
         },
-        expected_params={"Filters": filters},
+        expected_params={"Filters": filters, "MaxResults": 100},
     )
     stubber.add_response(
         "describe_vpc_attribute",
@@ -40,6 +40,7 @@
 ###
 """Azure ADLS Tests."""
 import pytest
+from azure.core.exceptions import HttpResponseError
 
 from cdpctl.validation.infra.validate_azure_adls import (
     azure_adls_data_storage_validation,
@@ -48,14 +49,33 @@ from cdpctl.validation.infra.validate_azure_adls import (
 from tests.validation import expect_validation_failure, expect_validation_success
 
 
+class FileSystemProperties:
+    """Mock class for unit testing."""
+
+    def __init__(self, name):
+        """Mock init for testing."""
+        self.name = name
+
+
 class DataLakeServiceClient:
     """Mock class for unit testing."""
 
-    def __init__(self, config, url):
+    def __init__(self, config, url, list_status=None):
         """Mock init for testing."""
         self.config = config
         self.url = url
         self.client = None
+        self.list_status = list_status
+        self.listings = 0
+
+    def list_file_systems(self):
+        """Mock method for testing."""
+        self.listings += 1
+        if self.list_status is not None:
+            error = HttpResponseError(message="Listing failed")
+            error.status_code = self.list_status
+            raise error
+        return [FileSystemProperties("container"), FileSystemProperties("other")]
 
     def get_file_system_client(self, file_system=None):
         """Mock method for testing."""
@@ -158,3 +178,40 @@ def test_azure_adls_logs_storage_validation_wo_config_failure(
 ) -> None:
     func = expect_validation_failure(azure_adls_logs_storage_validation)
     func(EMPTY_CONFIG, dls_client)
+
+
+def test_azure_adls_storage_validations_list_account_once() -> None:
+    clients = []
+
+    def _get_client(config, url):
+        # pylint: disable=redefined-outer-name
+        clients.append(DataLakeServiceClient(config, url))
+        return clients[-1]
+
+    for validation in [
+        azure_adls_data_storage_validation,
+        azure_adls_logs_storage_validation,
+    ]:
+        func = expect_validation_success(validation)
+        func(CONFIG, _get_client)
+    assert len(clients) == 1
+    assert clients[0].url == "https://test.dfs.core.windows.net"
+    assert clients[0].listings == 1
+
+
+def test_azure_adls_storage_validation_without_list_access() -> None:
+    def _get_client(config, url):
+        # pylint: disable=redefined-outer-name
+        return DataLakeServiceClient(config, url, list_status=403)
+
+    func = expect_validation_success(azure_adls_data_storage_validation)
+    func(CONFIG, _get_client)
+
+
+def test_azure_adls_storage_validation_without_list_access_failure() -> None:
+    def _get_client(config, url):
+        # pylint: disable=redefined-outer-name
+        return DataLakeServiceClient(config, url, list_status=403)
+
+    func = expect_validation_failure(azure_adls_data_storage_validation)
+    func(FAILURE_CONFIG, _get_client)
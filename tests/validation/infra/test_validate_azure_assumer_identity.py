@@ -48,6 +48,7 @@ from azure.mgmt.authorization import AuthorizationManagementClient
 from azure.mgmt.resource import ResourceManagementClient
 
 from cdpctl.validation.azure_utils import (
+    fetch_permission_index,
     get_resource_group_scope,
     get_storage_container_scope,
 )
@@ -132,7 +133,7 @@ def setup_mocks(
         ],
     )
 
-    assumer_info["assignments"] = [AuthListResponseProperties(identity_name, scope)]
+    assumer_info["permissions"] = fetch_permission_index(auth_client, identity_name)
     assumer_info["name"] = identity_name
     assumer_info["sub_id"] = "test_id"
     assumer_info["rg_name"] = "rg_name"
@@ -206,7 +207,6 @@ def test_azure_assumer_logs_actions_validation_success():
     func = expect_validation_success(azure_assumer_logs_actions_validation)
     func(
         get_config(identity_name),
-        auth_client,
         ["Microsoft.Storage/storageAccounts/blobServices/write"],
         assumer_info,
     )
@@ -234,7 +234,6 @@ def test_azure_assumer_logs_actions_validation_fail():
     func = expect_validation_failure(azure_assumer_logs_actions_validation)
     func(
         get_config(identity_name),
-        auth_client,
         ["Microsoft.Storage/storageAccounts/blobServices/write"],
         assumer_info,
     )
@@ -264,7 +263,6 @@ def test_azure_assumer_logs_data_actions_validation_success():
     func = expect_validation_success(azure_assumer_logs_data_actions_validation)
     func(
         get_config(identity_name),
-        auth_client,
         ["Microsoft.Storage/storageAccounts/blobServices/containers/blobs/write"],
         assumer_info,
     )
@@ -294,7 +292,6 @@ def test_azure_assumer_logs_data_actions_validation_fail():
     func = expect_validation_failure(azure_assumer_logs_data_actions_validation)
     func(
         get_config(identity_name),
-        auth_client,
         ["Microsoft.Storage/storageAccounts/blobServices/containers/blobs/write"],
         assumer_info,
     )
@@ -321,7 +318,6 @@ def test_azure_assumer_rg_actions_validation_success():
 
     func = expect_validation_success(azure_assumer_rg_actions_validation)
     func(
-        auth_client,
         ["Microsoft.ManagedIdentity/userAssignedIdentities/read"],
         assumer_info,
     )
@@ -348,7 +344,6 @@ def test_azure_assumer_rg_actions_validation_fail():
 
     func = expect_validation_failure(azure_assumer_rg_actions_validation)
     func(
-        auth_client,
         ["Microsoft.ManagedIdentity/userAssignedIdentities/read"],
         assumer_info,
     )
@@ -47,7 +47,10 @@ from azure.core.exceptions import ResourceNotFoundError
 from azure.mgmt.authorization import AuthorizationManagementClient
 from azure.mgmt.resource import ResourceManagementClient
 
-from cdpctl.validation.azure_utils import get_resource_group_scope
+from cdpctl.validation.azure_utils import (
+    fetch_permission_index,
+    get_resource_group_scope,
+)
 from cdpctl.validation.infra.validate_azure_cross_account_identity import (
     azure_cross_account_identity_exists_validation,
     azure_cross_account_rg_actions_validation,
@@ -128,9 +131,9 @@ def setup_mocks(
         ],
     )
 
-    cross_account_info["assignments"] = [
-        AuthListResponseProperties(identity_name, scope)
-    ]
+    cross_account_info["permissions"] = fetch_permission_index(
+        auth_client, identity_name
+    )
     cross_account_info["name"] = identity_name
     cross_account_info["sub_id"] = "test_id"
     cross_account_info["rg_name"] = "rg_name"
@@ -205,7 +208,6 @@ def test_azure_cross_account_rg_actions_validation_success(
 
     func = expect_validation_success(azure_cross_account_rg_actions_validation)
     func(
-        auth_client,
         azure_cross_account_required_resource_group_actions,
         cross_account_info,
     )
@@ -234,7 +236,6 @@ def test_azure_cross_account_rg_actions_validation_fail(
 
     func = expect_validation_failure(azure_cross_account_rg_actions_validation)
     func(
-        auth_client,
         azure_cross_account_required_resource_group_actions,
         cross_account_info,
     )
@@ -263,7 +264,6 @@ def test_azure_cross_account_rg_data_actions_validation_success(
 
     func = expect_validation_success(azure_cross_account_rg_data_actions_validation)
     func(
-        auth_client,
         azure_cross_account_required_resource_group_data_actions,
         cross_account_info,
     )
@@ -292,7 +292,6 @@ def test_azure_cross_account_rg_data_actions_validation_fail(
 
     func = expect_validation_failure(azure_cross_account_rg_data_actions_validation)
     func(
-        auth_client,
         azure_cross_account_required_resource_group_data_actions,
         cross_account_info,
     )
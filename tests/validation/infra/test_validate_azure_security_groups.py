@@ -44,7 +44,6 @@ from typing import Any, Dict
 from unittest.mock import Mock
 
 import pytest
-from azure.core.exceptions import ResourceNotFoundError
 from azure.mgmt.network import NetworkManagementClient
 
 from cdpctl.validation.infra.validate_azure_security_groups import (
@@ -83,16 +82,14 @@ def test_azure_default_security_group_exists_success(basic_azure_test_config):
         basic_azure_test_config["infra"]["security_group"]["default"]["name"]
     )
     mock_network_mgmt_client = Mock(spec=NetworkManagementClient)
-    mock_network_mgmt_client.network_security_groups.get.return_value = nsg
+    mock_network_mgmt_client.network_security_groups.list.return_value = [nsg]
     func = expect_validation_success(azure_default_security_group_exists)
     func(basic_azure_test_config, mock_network_mgmt_client)
 
 
 def test_azure_default_security_group_exists_failure(basic_azure_test_config):
     mock_network_mgmt_client = Mock(spec=NetworkManagementClient)
-    mock_network_mgmt_client.network_security_groups.get.side_effect = (
-        ResourceNotFoundError()
-    )
+    mock_network_mgmt_client.network_security_groups.list.return_value = []
     func = expect_validation_failure(azure_default_security_group_exists)
     func(basic_azure_test_config, mock_network_mgmt_client)
 
@@ -103,16 +100,14 @@ def test_azure_knox_security_group_exists_success(basic_azure_test_config):
         basic_azure_test_config["infra"]["security_group"]["knox"]["name"]
     )
     mock_network_mgmt_client = Mock(spec=NetworkManagementClient)
-    mock_network_mgmt_client.network_security_groups.get.return_value = nsg
+    mock_network_mgmt_client.network_security_groups.list.return_value = [nsg]
     func = expect_validation_success(azure_knox_security_group_exists)
     func(basic_azure_test_config, mock_network_mgmt_client)
 
 
 def test_azure_knox_security_group_exists_failure(basic_azure_test_config):
     mock_network_mgmt_client = Mock(spec=NetworkManagementClient)
-    mock_network_mgmt_client.network_security_groups.get.side_effect = (
-        ResourceNotFoundError()
-    )
+    mock_network_mgmt_client.network_security_groups.list.return_value = []
     func = expect_validation_failure(azure_knox_security_group_exists)
     func(basic_azure_test_config, mock_network_mgmt_client)
 
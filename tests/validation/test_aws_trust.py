@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_aws_trust.py
+###
+"""Tests for the trust policies of the AWS roles."""
+import json
+from urllib.parse import quote
+
+from cdpctl.validation.aws_trust import EXTERNAL_ID, TrustPolicy
+from cdpctl.validation.aws_utils import get_trust_policy
+
+CROSS_ACCOUNT_TRUST = {
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Principal": {"AWS": "arn:aws:iam::387553343826:root"},
+            "Action": "sts:AssumeRole",
+            "Condition": {"StringEquals": {"sts:ExternalId": "ext-id"}},
+        },
+        {
+            "Effect": "Allow",
+            "Principal": {"Service": ["ec2.amazonaws.com", "ssm.amazonaws.com"]},
+            "Action": ["sts:AssumeRole"],
+        },
+    ],
+}
+
+
+def test_trust_policy_documents() -> None:
+    """Test the decoded, JSON and URL-encoded documents are parsed alike."""
+    for document in [
+        CROSS_ACCOUNT_TRUST,
+        json.dumps(CROSS_ACCOUNT_TRUST),
+        quote(json.dumps(CROSS_ACCOUNT_TRUST)),
+    ]:
+        trust_policy = TrustPolicy(document)
+        assert trust_policy.trusts_account("387553343826")
+        assert trust_policy.trusts_service("ec2.amazonaws.com")
+
+
+def test_trust_policy_principals() -> None:
+    """Test the accounts and services are trusted for their actions only."""
+    trust_policy = TrustPolicy(CROSS_ACCOUNT_TRUST)
+    assert trust_policy.trusts_account("387553343826")
+    assert not trust_policy.trusts_account("123456789012")
+    assert trust_policy.trusts_service("ssm.amazonaws.com")
+    assert not trust_policy.trusts_service("lambda.amazonaws.com")
+    assert not trust_policy.trusts_service("ec2.amazonaws.com", "sts:TagSession")
+
+
+def test_trust_policy_wildcards_and_denies() -> None:
+    """Test the wildcard actions match and a denying statement wins."""
+    trust_policy = TrustPolicy(
+        {
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Principal": {"AWS": ["123456789012", "arn:aws:iam::1111:root"]},
+                    "Action": "sts:*",
+                },
+                {
+                    "Effect": "Deny",
+                    "Principal": {"AWS": "arn:aws:iam::1111:role/other"},
+                    "Action": "sts:AssumeRole",
+                },
+            ]
+        }
+    )
+    assert trust_policy.trusts_account("123456789012")
+    assert trust_policy.trusts_account("123456789012", "sts:TagSession")
+    assert not trust_policy.trusts_account("1111")
+
+
+def test_trust_policy_condition_values() -> None:
+    """Test the condition values are indexed by their statement."""
+    trust_policy = TrustPolicy(CROSS_ACCOUNT_TRUST)
+    assert trust_policy.get_condition_values(EXTERNAL_ID) == {0: {"ext-id"}}
+    assert trust_policy.get_condition_values("sts:externalid", [1]) == {}
+
+
+def test_get_trust_policy_parses_once() -> None:
+    """Test the trust policy of a role is parsed once per run."""
+    role = {
+        "Arn": "arn:aws:iam::1111:role/cross-account",
+        "RoleId": "AROA1",
+        "AssumeRolePolicyDocument": CROSS_ACCOUNT_TRUST,
+    }
+    assert get_trust_policy(role) is get_trust_policy(dict(role))
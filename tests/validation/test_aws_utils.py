@@ -48,7 +48,16 @@ from boto3_type_annotations.iam import Client as IAMClient
 from botocore.stub import Stubber
 from moto import mock_iam
 
-from cdpctl.validation.aws_utils import get_role, is_valid_s3a_url, simulate_policy
+from cdpctl.validation.aws_utils import (
+    RouteTableTargets,
+    get_role,
+    get_s3_location,
+    get_s3_location_resolver,
+    is_valid_s3a_url,
+    iter_route_tables,
+    iter_vpc_subnet_ids,
+    simulate_policy,
+)
 from tests.validation import expect_validation_failure, expect_validation_success
 
 
@@ -178,6 +187,136 @@ def test_simulate_policy_with_all_valid_policies() -> None:
         )
 
 
+def test_iter_route_tables_follows_pages() -> None:
+    """Test the route tables of every page are iterated as their targets."""
+    ec2_client = boto3.client("ec2", region_name="us-west-2")
+    filters = [
+        {"Name": "association.subnet-id", "Values": ["subnet-1"]},
+        {"Name": "route.state", "Values": ["active"]},
+    ]
+    stubber: Stubber = Stubber(ec2_client)
+    stubber.add_response(
+        "describe_route_tables",
+        {
+            "RouteTables": [
+                {
+                    "RouteTableId": "rtb-1",
+                    "Routes": [{"GatewayId": "igw-1"}, {"GatewayId": "local"}],
+                }
+            ],
+            "NextToken": "page-2",
+        },
+        expected_params={"Filters": filters, "MaxResults": 100},
+    )
+    stubber.add_response(
+        "describe_route_tables",
+        {
+            "RouteTables": [
+                {"RouteTableId": "rtb-2", "Routes": [{"NatGatewayId": "nat-1"}]}
+            ]
+        },
+        expected_params={"Filters": filters, "MaxResults": 100, "NextToken": "page-2"},
+    )
+
+    with stubber:
+        assert list(iter_route_tables(ec2_client, ["subnet-1"])) == [
+            RouteTableTargets("rtb-1", frozenset(["igw-1", "local"]), frozenset()),
+            RouteTableTargets("rtb-2", frozenset(), frozenset(["nat-1"])),
+        ]
+        stubber.assert_no_pending_responses()
+
+
+def test_iter_vpc_subnet_ids_stops_requesting_pages() -> None:
+    """Test the next page is not requested when the iteration stops."""
+    ec2_client = boto3.client("ec2", region_name="us-west-2")
+    stubber: Stubber = Stubber(ec2_client)
+    stubber.add_response(
+        "describe_subnets",
+        {"Subnets": [{"SubnetId": "subnet-1"}], "NextToken": "page-2"},
+        expected_params={
+            "Filters": [{"Name": "vpc-id", "Values": ["vpc-1"]}],
+            "MaxResults": 100,
+        },
+    )
+
+    with stubber:
+        subnet_ids = iter_vpc_subnet_ids(ec2_client, "vpc-1")
+        assert next(subnet_ids) == "subnet-1"
+        subnet_ids.close()
+
+
+def test_get_s3_location() -> None:
+    """Test the ARNs of a S3A location and its bucket."""
+    location = get_s3_location("s3a://mybucket/data/path")
+    assert location.bucket_name == "mybucket"
+    assert location.arn == "arn:aws:s3:::mybucket/data/path"
+    assert location.bucket_arn == "arn:aws:s3:::mybucket"
+
+
+def test_s3_location_resolver_calls_once_per_bucket() -> None:
+    """Test the locations sharing a bucket are resolved with a single call."""
+    s3_client = boto3.client("s3", region_name="us-west-2")
+    config: Dict[str, Any] = {
+        "infra": {
+            "aws": {
+                "vpc": {
+                    "existing": {
+                        "storage": {
+                            "data": "s3a://mybucket/data",
+                            "logs": "s3a://mybucket/logs",
+                            "backup": "not-a-s3a-url",
+                        }
+                    }
+                }
+            }
+        }
+    }
+    stubber: Stubber = Stubber(s3_client)
+    stubber.add_response(
+        "get_bucket_location",
+        {"LocationConstraint": ""},
+        expected_params={"Bucket": "mybucket"},
+    )
+
+    with stubber:
+        resolver = get_s3_location_resolver(config, s3_client)
+        assert get_s3_location_resolver(config, s3_client) is resolver
+        assert resolver.buckets == {
+            "mybucket": [
+                "infra:aws:vpc:existing:storage:data",
+                "infra:aws:vpc:existing:storage:logs",
+            ]
+        }
+        status = resolver.get_bucket_status("mybucket")
+        assert status.exists and not status.forbidden
+        assert status.region == "us-east-1"
+        assert resolver.get_bucket_status("mybucket") == status
+        stubber.assert_no_pending_responses()
+
+
+def test_s3_location_resolver_keeps_forbidden_buckets() -> None:
+    """Test a forbidden bucket is resolved as such, without raising."""
+    s3_client = boto3.client("s3", region_name="us-west-2")
+    config: Dict[str, Any] = {
+        "infra": {
+            "aws": {"vpc": {"existing": {"storage": {"data": "s3a://mybucket/data"}}}}
+        }
+    }
+    stubber: Stubber = Stubber(s3_client)
+    stubber.add_client_error(
+        "get_bucket_location",
+        service_error_code="AccessDenied",
+        expected_params={"Bucket": "mybucket"},
+    )
+
+    with stubber:
+        status = get_s3_location_resolver(config, s3_client).get_bucket_status(
+            "mybucket"
+        )
+        assert status.exists and status.forbidden
+        assert status.region is None
+
+
 def add_simulate_policy_response_with_evaluation_results(
     stubber: Stubber,
     role_arn: str,
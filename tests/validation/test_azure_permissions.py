@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_azure_permissions.py
+###
+"""Tests for the effective permissions of the Azure identities."""
+import dataclasses
+from unittest.mock import Mock
+
+from azure.mgmt.authorization import AuthorizationManagementClient
+
+from cdpctl.validation.azure_permissions import (
+    ACTION,
+    DATA_ACTION,
+    OperationRegistry,
+    PermissionIndex,
+    PermissionMatcher,
+)
+from cdpctl.validation.azure_utils import (
+    fetch_permission_index,
+    get_resource_group_scope,
+    get_storage_container_scope,
+)
+
+Permission = dataclasses.make_dataclass(
+    "Permission",
+    [
+        ("actions", list),
+        ("not_actions", list, dataclasses.field(default_factory=list)),
+        ("data_actions", list, dataclasses.field(default_factory=list)),
+        ("not_data_actions", list, dataclasses.field(default_factory=list)),
+    ],
+)
+RoleAssignment = dataclasses.make_dataclass(
+    "RoleAssignment", [("role_definition_id", str), ("scope", str)]
+)
+RoleDefinition = dataclasses.make_dataclass("RoleDefinition", ["permissions"])
+
+SUBSCRIPTION_SCOPE = "/subscriptions/sub"
+RG_SCOPE = get_resource_group_scope("sub", "rg")
+ACCOUNT_SCOPE = f"{RG_SCOPE}/providers/Microsoft.Storage/storageAccounts/storage"
+CONTAINER_SCOPE = get_storage_container_scope("sub", "rg", "storage", "logs")
+
+READ = "Microsoft.Storage/storageAccounts/blobServices/containers/read"
+WRITE = "Microsoft.Storage/storageAccounts/blobServices/containers/write"
+BLOB_READ = "Microsoft.Storage/storageAccounts/blobServices/containers/blobs/read"
+
+
+def test_permissions_are_inherited_by_child_scopes() -> None:
+    index = PermissionIndex()
+    index.add(SUBSCRIPTION_SCOPE, "reader", [Permission(actions=["*/read"])])
+    index.add(
+        ACCOUNT_SCOPE.upper(),
+        "contributor",
+        [Permission(actions=[], data_actions=["Microsoft.Storage/*"])],
+    )
+    index.add(CONTAINER_SCOPE, "writer", [Permission(actions=[WRITE])])
+
+    assert index.get_missing_actions(CONTAINER_SCOPE, [READ, WRITE], [BLOB_READ]) == (
+        [],
+        [],
+    )
+    # Roles assigned to child scopes do not apply to their parents
+    assert index.get_missing_actions(RG_SCOPE, [READ, WRITE], [BLOB_READ]) == (
+        [WRITE],
+        [BLOB_READ],
+    )
+
+
+def test_not_actions_only_restrict_their_permission() -> None:
+    index = PermissionIndex()
+    index.add(RG_SCOPE, "owner", [Permission(actions=["*"], not_actions=["*/write"])])
+    assert index.get_missing_actions(RG_SCOPE, [READ, WRITE], []) == ([WRITE], [])
+
+    index.add(RG_SCOPE, "writer", [Permission(actions=[WRITE])])
+    assert index.get_missing_actions(RG_SCOPE, [READ, WRITE], []) == ([], [])
+
+
+def test_operations_match_whole() -> None:
+    index = PermissionIndex()
+    index.add(RG_SCOPE, "reader", [Permission(actions=[READ[:-1]])])
+    assert index.get_missing_actions(RG_SCOPE, [READ], []) == ([READ], [])
+
+
+def test_permission_index_is_fetched_once_per_run() -> None:
+    auth_client = Mock(spec=AuthorizationManagementClient)
+    auth_client.role_assignments.list.return_value = [
+        RoleAssignment("reader", RG_SCOPE),
+        RoleAssignment("reader", SUBSCRIPTION_SCOPE),
+    ]
+    auth_client.role_definitions.get_by_id.return_value = RoleDefinition(
+        [Permission(actions=[READ])]
+    )
+
+    index = fetch_permission_index(auth_client, "principal")
+    assert fetch_permission_index(auth_client, "principal") is index
+    assert index.get_missing_actions(CONTAINER_SCOPE, [READ], []) == ([], [])
+    auth_client.role_assignments.list.assert_called_once_with(
+        filter="principalId eq 'principal'"
+    )
+    auth_client.role_definitions.get_by_id.assert_called_once_with("reader")
+
+
+def test_operation_registry_masks() -> None:
+    registry = OperationRegistry()
+    mask = registry.get_mask(ACTION, [READ, WRITE])
+    assert mask == 0b11
+    assert registry.get_mask(DATA_ACTION, [READ]) == 0b100
+    assert registry.get_mask(ACTION, [WRITE, READ]) == mask
+    assert list(registry.iterate(0b101)) == [(1, ACTION, READ), (4, DATA_ACTION, READ)]
+
+
+def test_operations_are_evaluated_once_per_scope(monkeypatch) -> None:
+    calls = []
+    allows = PermissionMatcher.allows
+
+    def counting_allows(self, kind, operation):
+        calls.append((kind, operation))
+        return allows(self, kind, operation)
+
+    monkeypatch.setattr(PermissionMatcher, "allows", counting_allows)
+    index = PermissionIndex(OperationRegistry())
+    index.add(RG_SCOPE, "reader", [Permission(actions=[READ])])
+
+    assert index.get_missing_actions(RG_SCOPE, [READ, WRITE], []) == ([WRITE], [])
+    assert index.get_missing_actions(RG_SCOPE, [WRITE], [READ]) == ([WRITE], [READ])
+    assert index.get_missing_actions(RG_SCOPE.upper(), [READ], []) == ([], [])
+    assert calls == [(ACTION, READ), (ACTION, WRITE), (DATA_ACTION, READ)]
+
+    # New assignments are evaluated again
+    index.add(RG_SCOPE, "writer", [Permission(actions=[WRITE])])
+    assert index.get_missing_actions(RG_SCOPE, [READ, WRITE], []) == ([], [])
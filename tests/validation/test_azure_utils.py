@@ -44,12 +44,14 @@ from unittest.mock import Mock
 
 import pytest
 from azure.mgmt.authorization import AuthorizationManagementClient
+from azure.mgmt.network import NetworkManagementClient
 from azure.storage.filedatalake import DataLakeServiceClient
 
 from cdpctl.validation.azure_utils import (
     AzureSupportedRegionFeatures,
-    check_for_actions,
+    fetch_permission_index,
     get_client,
+    get_network_snapshot,
     parse_adls_path,
     read_azure_supported_regions,
 )
@@ -91,6 +93,39 @@ def test_get_client():
     assert isinstance(datalake_client_service, DataLakeServiceClient)
 
 
+def test_get_network_snapshot():
+    """Test the network snapshot is shared and fetches each resource once."""
+    config = {
+        "infra": {
+            "vpc": {"name": "some-vnet"},
+            "azure": {
+                "subscription_id": "XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX",
+                "metagroup": {"name": "some-resource-group"},
+            },
+        }
+    }
+    NetworkSecurityGroup = dataclasses.make_dataclass("NetworkSecurityGroup", ["name"])
+    network_client = Mock(spec=NetworkManagementClient)
+    network_client.network_security_groups.list.return_value = [
+        NetworkSecurityGroup("Default-NSG"),
+        NetworkSecurityGroup("knox-nsg"),
+    ]
+
+    snapshot = get_network_snapshot(config, network_client)
+    assert snapshot is get_network_snapshot(config, Mock(spec=NetworkManagementClient))
+
+    assert snapshot.get_vnet() is snapshot.get_vnet()
+    assert snapshot.get_security_group("default-nsg").name == "Default-NSG"
+    assert snapshot.get_security_group("knox-nsg").name == "knox-nsg"
+    assert snapshot.get_security_group("missing-nsg") is None
+    network_client.virtual_networks.get.assert_called_once_with(
+        virtual_network_name="some-vnet", resource_group_name="some-resource-group"
+    )
+    network_client.network_security_groups.list.assert_called_once_with(
+        resource_group_name="some-resource-group"
+    )
+
+
 def test_parse_adls_path():
     """Test parse adls path."""
     parsed_url = parse_adls_path("abfs://container@test.dfs.core.windows.net")
@@ -110,7 +145,7 @@ def test_parse_adls_path_invalid_container():
         parse_adls_path("abfs://test.dfs.core.windows.net")
 
 
-def test_check_for_actions_success():
+def test_permission_index_success():
     auth_client = Mock(spec=AuthorizationManagementClient)
 
     RoleAssignment = dataclasses.make_dataclass(
@@ -148,19 +183,21 @@ def test_check_for_actions_success():
         ],
     )
 
-    missing_actions, missing_data_actions = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=[RoleAssignment("check", "check")],
-        proper_scope="check",
-        required_actions=["foo.bar/car/read", "foo.bar/car/write"],
-        required_data_actions=["foo.bar/car/read", "foo.bar/car/write"],
+    permission_index = fetch_permission_index(auth_client, "principal")
+    missing_actions, missing_data_actions = permission_index.get_missing_actions(
+        "check",
+        ["foo.bar/car/read", "foo.bar/car/write"],
+        ["foo.bar/car/read", "foo.bar/car/write"],
     )
 
+    auth_client.role_assignments.list.assert_called_once_with(
+        filter="principalId eq 'principal'"
+    )
     assert missing_actions == []
     assert missing_data_actions == []
 
 
-def test_check_for_actions_failure():
+def test_permission_index_failure():
     auth_client = Mock(spec=AuthorizationManagementClient)
 
     RoleAssignment = dataclasses.make_dataclass(
@@ -198,12 +235,11 @@ def test_check_for_actions_failure():
         ],
     )
 
-    missing_actions, missing_data_actions = check_for_actions(
-        auth_client=auth_client,
-        role_assigments=[RoleAssignment("check", "check")],
-        proper_scope="check",
-        required_actions=["foo.bar/car/read", "foo.bar/car/write"],
-        required_data_actions=[
+    permission_index = fetch_permission_index(auth_client, "principal")
+    missing_actions, missing_data_actions = permission_index.get_missing_actions(
+        "check",
+        ["foo.bar/car/read", "foo.bar/car/write"],
+        [
             "foo.bar/car/read",
             "foo.bar/car/write",
             "foo.bar/car/delete",
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_cache.py
+###
+"""Tests for the per-run resource cache."""
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from cdpctl.validation.cache import (
+    ClientPool,
+    ResourceReads,
+    SingleFlight,
+    get_resource_cache,
+)
+
+
+def test_resource_cache_only_stores_successful_fetches() -> None:
+    cache = get_resource_cache()
+    fetch = Mock(side_effect=[ValueError("throttled"), "value"])
+
+    with pytest.raises(ValueError):
+        cache.get("key", fetch)
+    assert cache.get("key", fetch) == "value"
+    assert cache.get("key", fetch) == "value"
+    assert fetch.call_count == 2
+
+
+def _run_concurrently(func, count: int = 8) -> list:
+    results = []
+    barrier = threading.Barrier(count)
+
+    def run():
+        barrier.wait()
+        try:
+            results.append(func())
+        except ValueError as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_resource_cache_coalesces_concurrent_misses() -> None:
+    cache = get_resource_cache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"Role": {"RoleName": "some-role"}}
+
+    results = _run_concurrently(lambda: cache.get(("aws", "role", "some-role"), fetch))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_single_flight_shares_errors_without_keeping_them() -> None:
+    flights = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        raise ValueError("throttled")
+
+    results = _run_concurrently(lambda: flights.do("key", fetch))
+
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flights.do("key", lambda: "value") == "value"
+
+
+def test_client_pool_reuses_clients_once_enabled() -> None:
+    pool = ClientPool()
+    create = Mock(side_effect=lambda: object())
+
+    assert pool.get("key", create) is not pool.get("key", create)
+    pool.enabled = True
+    client = pool.get("key", create)
+    assert pool.get("key", create) is client
+    assert pool.get("other", create) is not client
+    pool.clear()
+    assert pool.get("key", create) is not client
+    assert create.call_count == 5
+
+
+def test_resource_reads_are_recorded_per_thread() -> None:
+    reads = ResourceReads()
+    reads.start("validation")
+
+    def prefetch() -> None:
+        reads.record("prefetched")
+        reads.record_request()
+
+    thread = threading.Thread(target=prefetch)
+    thread.start()
+    thread.join()
+    reads.record("read")
+
+    assert reads.keys == {"validation": {"read"}}
+    assert reads.untracked == set()
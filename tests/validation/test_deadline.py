@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_deadline.py
+###
+"""Tests for the validation deadlines and the circuit breaker."""
+import time
+from typing import Any, Dict
+from unittest.mock import Mock
+
+import pytest
+from botocore.exceptions import EndpointConnectionError
+
+from cdpctl.validation import NotEvaluatedError
+from cdpctl.validation.aws_utils import get_client
+from cdpctl.validation.azure_policies import AzureCircuitBreakerPolicy
+from cdpctl.validation.deadline import (
+    RunBudget,
+    ValidationTimeoutError,
+    get_circuit_breaker,
+    run_budget,
+    validation_deadline,
+)
+
+config: Dict[str, Any] = {"infra": {"aws": {"region": "us-west-2", "profile": ""}}}
+ENDPOINT = ("aws", "default", "s3")
+
+
+@pytest.fixture(autouse=True)
+def reset_run_budget():
+    """Run the tests without a run deadline."""
+    run_budget.start(None)
+    yield
+    run_budget.start(None)
+
+
+def test_run_budget_shortens_timeouts() -> None:
+    now = [0.0]
+    budget = RunBudget(clock=lambda: now[0])
+    assert budget.get_timeout(30.0) == 30.0
+
+    budget.start(45.0)
+    now[0] = 20.0
+    assert budget.get_timeout(30.0) == 25.0
+    now[0] = 60.0
+    assert budget.get_remaining() == 0.0
+
+
+def test_validation_deadline_times_out() -> None:
+    breaker = get_circuit_breaker()
+    breaker.begin(ENDPOINT)
+
+    with pytest.raises(ValidationTimeoutError, match="within 0.1 seconds"):
+        with validation_deadline(0.1):
+            time.sleep(5)
+
+    # The request in flight failed, and the alarm is cancelled
+    breaker.record_failure(ENDPOINT)
+    breaker.record_failure(ENDPOINT)
+    assert breaker.is_open(ENDPOINT)
+    time.sleep(0.2)
+
+
+def test_validation_deadline_shared_by_the_steps() -> None:
+    started_at = time.monotonic()
+    with validation_deadline(0.2, started_at):
+        time.sleep(0.1)
+
+    # The setup took the time the call could have taken
+    with pytest.raises(ValidationTimeoutError, match="within 0.2 seconds"):
+        with validation_deadline(0.2, started_at):
+            time.sleep(5)
+    time.sleep(0.1)
+    with pytest.raises(ValidationTimeoutError, match="within 0.2 seconds"):
+        with validation_deadline(0.2, started_at):
+            pass
+
+
+def test_validation_deadline_after_run_deadline() -> None:
+    run_budget.start(0.001)
+    time.sleep(0.01)
+    with pytest.raises(NotEvaluatedError, match="deadline of the run"):
+        with validation_deadline(10.0):
+            pass
+
+
+def test_circuit_breaker_opens_on_repeated_failures() -> None:
+    breaker = get_circuit_breaker()
+    breaker.record_failure(ENDPOINT)
+    breaker.record_failure(ENDPOINT)
+    breaker.record_success(ENDPOINT)
+    breaker.record_failure(ENDPOINT)
+    assert not breaker.is_open(ENDPOINT)
+
+    breaker.record_failure(ENDPOINT)
+    breaker.record_failure(ENDPOINT)
+    assert breaker.get_opened() == [ENDPOINT]
+    with pytest.raises(NotEvaluatedError, match="aws s3"):
+        breaker.check(ENDPOINT)
+
+
+def test_aws_client_behind_circuit_breaker(monkeypatch) -> None:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    s3_client = get_client("s3", config)
+    operation = s3_client.meta.service_model.operation_model("GetBucketLocation")
+    for attempt in range(3):
+        s3_client.meta.events.emit(
+            "needs-retry.s3.GetBucketLocation",
+            response=None,
+            endpoint=Mock(),
+            operation=operation,
+            attempts=attempt + 1,
+            caught_exception=EndpointConnectionError(endpoint_url="https://s3"),
+            request_dict={},
+        )
+
+    with pytest.raises(NotEvaluatedError):
+        s3_client.get_bucket_location(Bucket="some-bucket")
+
+
+def test_azure_policy_records_server_errors() -> None:
+    policy = AzureCircuitBreakerPolicy(scope="some-subscription", service="auth")
+    response = Mock()
+    response.http_response.status_code = 503
+    for _ in range(3):
+        policy.on_request(Mock())
+        policy.on_response(Mock(), response)
+
+    with pytest.raises(NotEvaluatedError):
+        policy.on_request(Mock())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_fingerprint.py
+###
+"""Tests for the validation results cache."""
+from typing import List
+from unittest.mock import Mock
+
+import pytest
+
+from cdpctl.validation import Issue, aws_utils, fingerprint
+from cdpctl.validation.cache import get_resource_cache
+from cdpctl.validation.fingerprint import ChangeTokens, ResultCache
+from cdpctl.validation.infra.issues import AWS_SSH_KEY_ID_DOES_NOT_EXIST
+from cdpctl.validation.plan import ValidationPlan
+from cdpctl.validation.policies import PolicyDocumentCache
+
+MODULE = "infra/validate_aws_ssh_key.py"
+CONFIG = {"globals": {"ssh": {"public_key_id": "my-key"}}}
+CONFIG_KEYS = ["globals:ssh:public_key_id"]
+
+
+def validation() -> None:
+    """Validate nothing, for unit testing."""
+
+
+class Item:
+    """Collected validation for unit testing."""
+
+    def __init__(self, name: str, depends: List[str] = None) -> None:
+        """Initialize the Item."""
+        self.name = name
+        self.nodeid = f"{MODULE}::{name}"
+        self.obj = validation
+        self.marker = pytest.mark.dependency(depends=depends or []).mark
+
+    def get_closest_marker(self, name: str):
+        """Get the dependency marker."""
+        return self.marker if name == "dependency" else None
+
+
+def test_result_cache_hit(tmp_path) -> None:
+    item = Item("ssh_key_validation")
+    cache = ResultCache("config.yml", CONFIG, cache_dir=str(tmp_path))
+    cache.store(item, "passed", CONFIG_KEYS, [], {})
+
+    entry = ResultCache("config.yml", CONFIG, cache_dir=str(tmp_path)).get_hit(item)
+    assert entry["outcome"] == "passed"
+
+
+def test_result_cache_miss_on_config_change(tmp_path) -> None:
+    item = Item("ssh_key_validation")
+    ResultCache("config.yml", CONFIG, cache_dir=str(tmp_path)).store(
+        item, "passed", CONFIG_KEYS, [], {}
+    )
+
+    new_config = {"globals": {"ssh": {"public_key_id": "other-key"}}}
+    assert ResultCache("config.yml", new_config, str(tmp_path)).get_hit(item) is None
+    # The results are kept per configuration file
+    assert ResultCache("other.yml", CONFIG, str(tmp_path)).get_hit(item) is None
+
+
+def test_result_cache_miss_on_shared_source_change(tmp_path, monkeypatch) -> None:
+    item = Item("ssh_key_validation")
+    ResultCache("config.yml", CONFIG, cache_dir=str(tmp_path)).store(
+        item, "passed", CONFIG_KEYS, [], {}
+    )
+
+    # A change of a conftest fixture or a helper module
+    monkeypatch.setattr(fingerprint, "get_shared_source_hash", lambda: "changed")
+    assert ResultCache("config.yml", CONFIG, str(tmp_path)).get_hit(item) is None
+
+
+def test_role_token_uses_policy_documents(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(
+        aws_utils,
+        "get_policy_document_cache",
+        lambda: PolicyDocumentCache(str(tmp_path)),
+    )
+    pages = {
+        "list_attached_role_policies": [
+            {"AttachedPolicies": [{"PolicyArn": "arn:aws:iam::1234:policy/my-policy"}]}
+        ],
+        "list_role_policies": [{"PolicyNames": []}],
+    }
+    iam_client = Mock()
+    iam_client.meta.region_name = "us-west-2"
+    iam_client.get_paginator.side_effect = lambda operation: Mock(
+        paginate=Mock(return_value=pages[operation])
+    )
+    iam_client.get_role.return_value = {
+        "Role": {"RoleName": "my-role", "RoleLastUsed": {"Region": "us-west-2"}}
+    }
+    iam_client.get_policy.return_value = {"Policy": {"DefaultVersionId": "v1"}}
+    iam_client.get_policy_version.return_value = {
+        "PolicyVersion": {"Document": {"Statement": [{"Action": "s3:GetObject"}]}}
+    }
+    key = ("aws", "us-west-2", "role", "my-role")
+
+    def get_token() -> str:
+        get_resource_cache().clear()
+        tokens = ChangeTokens({})
+        tokens._clients[("aws", "iam", "")] = iam_client
+        return tokens.get(key)
+
+    token = get_token()
+    assert not token.startswith("error:")
+    # The last use of the role does not change the token
+    iam_client.get_role.return_value = {"Role": {"RoleName": "my-role"}}
+    assert get_token() == token
+    # The document of a policy version is fetched once
+    assert iam_client.get_policy_version.call_count == 1
+    # A new version with the same document does not change the token
+    iam_client.get_policy.return_value = {"Policy": {"DefaultVersionId": "v2"}}
+    assert get_token() == token
+    iam_client.get_policy.return_value = {"Policy": {"DefaultVersionId": "v3"}}
+    iam_client.get_policy_version.return_value = {
+        "PolicyVersion": {"Document": {"Statement": [{"Action": "s3:*"}]}}
+    }
+    assert get_token() != token
+
+
+def test_result_cache_replays(tmp_path) -> None:
+    items = [
+        Item("key_validation"),
+        Item("key_type_validation", ["key_validation"]),
+        Item("ssh_key_validation"),
+    ]
+    plan = ValidationPlan.from_items(items)
+    cache = ResultCache("config.yml", CONFIG, cache_dir=str(tmp_path))
+    cache.store(items[0], "passed", CONFIG_KEYS, [], {})
+    cache.store(items[2], "failed", CONFIG_KEYS, [], {})
+
+    # The key validation is not replayed as its dependent has to run
+    assert set(cache.get_replays(items, plan)) == {f"{MODULE}::ssh_key_validation"}
+
+    cache.store(items[1], "passed", CONFIG_KEYS, [], {})
+    assert len(cache.get_replays(items, plan)) == 3
+
+    revalidate = ResultCache("config.yml", CONFIG, str(tmp_path), revalidate=True)
+    assert revalidate.get_replays(items, plan) == {}
+
+
+def test_issue_round_trip() -> None:
+    issue = Issue.from_dict(
+        {
+            "template": AWS_SSH_KEY_ID_DOES_NOT_EXIST,
+            "subjects": ["my-key"],
+            "resources": ["us-west-2"],
+        }
+    )
+    assert Issue.from_dict(issue.to_dict()).to_dict() == issue.to_dict()
+    assert issue.message is not None
@@ -43,7 +43,7 @@
 import pytest
 from _pytest.outcomes import Failed
 
-from cdpctl.validation import get_config_value
+from cdpctl.validation import config_reads, get_config_value, has_config_value
 
 
 def test_get_config_value() -> None:
@@ -77,3 +77,30 @@ def test_get_of_empty_config_value() -> None:
     simple_nest = {"foo": {"bar": None}}
     with pytest.raises(Failed):
         get_config_value(simple_nest, "foo:bar")
+
+
+def test_get_config_value_records_config_reads() -> None:
+    """Test the config keys read by a validation are recorded."""
+    simple_nest = {"foo": {"bar": "car"}}
+    config_reads.start("infra/validate_foo.py::foo_validation")
+    try:
+        get_config_value(simple_nest, "foo:bar")
+        with pytest.raises(Failed):
+            get_config_value(simple_nest, "foo:bat")
+    finally:
+        config_reads.stop()
+    get_config_value(simple_nest, "foo")
+
+    assert config_reads.keys["infra/validate_foo.py::foo_validation"] == {
+        "foo:bar",
+        "foo:bat",
+    }
+    config_reads.clear()
+
+
+def test_has_config_value() -> None:
+    """Test checking a config value without failing."""
+    simple_nest = {"foo": {"bar": None}}
+    assert has_config_value(simple_nest, "foo:bar")
+    assert not has_config_value(simple_nest, "foo:bat")
+    assert not has_config_value(simple_nest, "foo:bar:car")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_memprofile.py
+###
+"""Tests for the memory profile of the validations."""
+import json
+import os
+import tracemalloc
+from typing import List
+
+import pytest
+
+from cdpctl.validation import memprofile
+from cdpctl.validation.memprofile import MemoryProfile, get_site_file
+
+retained: List[bytes] = []
+
+
+@pytest.fixture(name="profile")
+def profile_fixture():
+    """Return a started memory profile."""
+    profile = MemoryProfile(top=3)
+    profile.start()
+    yield profile
+    profile.stop()
+    retained.clear()
+
+
+def test_memory_profile_records_retained_memory(profile) -> None:
+    """Test the memory retained by a section and its top allocation site."""
+    with profile.section("nodeid", name="A validation"):
+        retained.append(bytes(2 * 1024 * 1024))
+        transient = bytes(4 * 1024 * 1024)
+        del transient
+
+    section = profile.sections["nodeid"]
+    assert section["name"] == "A validation"
+    assert section["retained_bytes"] >= 2 * 1024 * 1024
+    assert section["retained_bytes"] < 3 * 1024 * 1024
+    if memprofile.CAN_RESET_PEAK:
+        assert section["peak_bytes"] >= 6 * 1024 * 1024
+    top_site = section["top_allocations"][0]
+    assert top_site["file"] == "tests/validation/test_memprofile.py"
+    assert top_site["size_bytes"] >= 2 * 1024 * 1024
+    assert len(section["top_allocations"]) <= 3
+
+
+def test_memory_profile_summary_and_artifact(profile, tmp_path) -> None:
+    """Test the sections using the most memory are summarized and saved."""
+    with profile.section("small", name="Small validation"):
+        retained.append(bytes(1024))
+    with profile.section("large", name="Large validation"):
+        retained.append(bytes(1024 * 1024))
+
+    summary = profile.get_summary(limit=1)
+    assert len(summary) == 1
+    assert "Large validation" in summary[0]
+
+    path = str(tmp_path / "memprofile.json")
+    profile.save(path)
+    with open(path, encoding="utf-8") as profile_file:
+        saved = json.load(profile_file)
+    assert set(saved["sections"]) == {"small", "large"}
+    assert saved["sections"]["large"]["retained_bytes"] >= 1024 * 1024
+
+
+def test_memory_profile_stops_only_its_own_tracing() -> None:
+    """Test a profile leaves the tracing started by others running."""
+    tracemalloc.start()
+    try:
+        profile = MemoryProfile()
+        profile.start()
+        profile.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_get_site_file() -> None:
+    """Test the allocation sites are reported relative to their installation."""
+    site_packages = os.path.join("", "venv", "lib", "site-packages", "yaml", "x.py")
+    assert get_site_file(site_packages) == "yaml/x.py"
+    assert get_site_file(memprofile.__file__) == "cdpctl/validation/memprofile.py"
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_network.py
+###
+"""Tests for the CIDR set arithmetic."""
+import ipaddress
+import random
+
+from cdpctl.validation.network import CidrSet, get_prefix_length
+
+
+def test_cidr_set_merges_networks() -> None:
+    cidr_set = CidrSet(["10.0.1.0/24", "10.0.0.0/24", "10.0.0.128/25", "fd00::/120"])
+    assert cidr_set.num_addresses == 512 + 256
+    assert cidr_set.to_cidrs() == ["10.0.0.0/23", "fd00::/120"]
+    assert get_prefix_length("10.0.0.0/20") == 20
+
+
+def test_cidr_set_overlaps_and_contains() -> None:
+    cidr_set = CidrSet(["10.0.0.0/16", "10.2.0.0/16", "fd00::/64"])
+    assert cidr_set.overlaps("10.0.255.0/24")
+    assert cidr_set.overlaps("10.0.0.0/8")
+    assert not cidr_set.overlaps("10.1.0.0/16")
+    assert not cidr_set.overlaps("9.0.0.0/8")
+    assert cidr_set.overlaps(ipaddress.ip_network("fd00::1/128"))
+    assert not cidr_set.overlaps("fd01::/64")
+
+    assert cidr_set.contains("10.2.3.0/24")
+    assert not cidr_set.contains("10.0.0.0/15")
+    assert not CidrSet().contains("10.0.0.0/32")
+
+
+def test_cidr_set_difference() -> None:
+    vnet = CidrSet(["10.0.0.0/22"])
+    subnets = CidrSet(["10.0.0.0/24", "10.0.2.128/25", "192.168.0.0/24"])
+    free = vnet.difference(subnets)
+    assert free.to_cidrs() == ["10.0.1.0/24", "10.0.2.0/25", "10.0.3.0/24"]
+    assert free.num_addresses == 1024 - 256 - 128
+
+
+def test_cidr_set_matches_ipaddress() -> None:
+    rng = random.Random(7)
+    networks = [
+        ipaddress.ip_network(
+            (rng.randrange(0, 1 << 16) << 16, rng.randint(16, 28)), False
+        )
+        for _ in range(200)
+    ]
+    cidr_set = CidrSet(networks[:100])
+    for network in networks[100:]:
+        assert cidr_set.overlaps(network) == any(
+            network.overlaps(other) for other in networks[:100]
+        )
+    addresses = set()
+    for network in networks[:100]:
+        start = int(network.network_address)
+        addresses.update(range(start, start + network.num_addresses))
+    assert cidr_set.num_addresses == len(addresses)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_plan.py
+###
+"""Tests for the validation plan."""
+from typing import List
+
+import pytest
+
+from cdpctl.validation.plan import ValidationPlan, get_changed_keys
+
+MODULE = "infra/validate_aws_subnets.py"
+
+
+class Item:
+    """Collected validation for unit testing."""
+
+    def __init__(self, name: str, depends: List[str] = None) -> None:
+        """Initialize the Item."""
+        self.name = name
+        self.nodeid = f"{MODULE}::{name}"
+        self.obj = lambda: None
+        self.obj.__doc__ = f"{name} docs."
+        self.marker = pytest.mark.dependency(depends=depends or []).mark
+
+    def get_closest_marker(self, name: str):
+        """Get the dependency marker."""
+        return self.marker if name == "dependency" else None
+
+
+def get_plan() -> ValidationPlan:
+    return ValidationPlan.from_items(
+        [
+            Item("public_validation"),
+            Item("public_az_validation", ["public_validation"]),
+            Item("private_validation"),
+            Item("vpc_validation", ["public_validation", "private_validation"]),
+            Item("ssh_key_validation"),
+        ]
+    )
+
+
+def test_plan_dependencies() -> None:
+    plan = get_plan()
+    assert plan.dependencies[f"{MODULE}::vpc_validation"] == {
+        f"{MODULE}::public_validation",
+        f"{MODULE}::private_validation",
+    }
+    assert plan.names[f"{MODULE}::ssh_key_validation"] == "ssh_key_validation docs."
+
+
+def test_select_changed_validations() -> None:
+    plan = get_plan()
+    config_reads = {
+        f"{MODULE}::public_validation": {"infra:aws:vpc:existing:public_subnet_ids"},
+        f"{MODULE}::private_validation": {"infra:aws:vpc:existing:private_subnet_ids"},
+        f"{MODULE}::ssh_key_validation": {"globals:ssh:public_key_id"},
+    }
+
+    selected = plan.select_changed(
+        {"infra:aws:vpc:existing:public_subnet_ids"}, config_reads
+    )
+
+    # The dependents of the public subnets validation run again, with the
+    # private subnets validation the VPC validation depends on.
+    assert selected == [
+        f"{MODULE}::public_validation",
+        f"{MODULE}::public_az_validation",
+        f"{MODULE}::private_validation",
+        f"{MODULE}::vpc_validation",
+    ]
+    assert plan.select_changed({"env:tunnel"}, config_reads) == []
+    assert plan.select_changed({"globals:ssh"}, config_reads) == [
+        f"{MODULE}::ssh_key_validation"
+    ]
+
+
+def test_get_changed_keys() -> None:
+    old_config = {
+        "infra": {"aws": {"region": "us-west-2", "profile": "dev"}},
+        "env": {"tunnel": True},
+    }
+    new_config = {
+        "infra": {"aws": {"region": "us-east-1", "profile": "dev"}},
+        "globals": {"ssh": {"public_key_id": "some-key"}},
+    }
+
+    assert get_changed_keys(old_config, new_config) == {
+        "infra:aws:region",
+        "env:tunnel",
+        "globals:ssh:public_key_id",
+    }
+    assert get_changed_keys(old_config, old_config) == set()
+
+
+def test_plan_shards() -> None:
+    plan = get_plan()
+    assert plan.get_components() == [
+        [
+            f"{MODULE}::public_validation",
+            f"{MODULE}::public_az_validation",
+            f"{MODULE}::private_validation",
+            f"{MODULE}::vpc_validation",
+        ],
+        [f"{MODULE}::ssh_key_validation"],
+    ]
+
+    # Prerequisites stay with their dependents
+    assert plan.get_shard(1, 2) == plan.get_components()[0]
+    assert plan.get_shard(2, 2) == [f"{MODULE}::ssh_key_validation"]
+    assert plan.get_shard(3, 3) == []
+    assert plan.get_shard(1, 1) == plan.nodeids
+
+
+def test_plan_shards_by_cost() -> None:
+    plan = get_plan()
+    costs = {nodeid: 1.0 for nodeid in plan.nodeids}
+    costs[f"{MODULE}::ssh_key_validation"] = 10.0
+
+    # The long running validation gets a shard on its own, and is assigned first
+    assert plan.get_shard(1, 2, costs) == [f"{MODULE}::ssh_key_validation"]
+    assert plan.get_shard(2, 2, costs) == plan.get_components()[0]
+
+
+def test_plan_order() -> None:
+    plan = get_plan()
+    costs = {
+        f"{MODULE}::public_validation": 5.0,
+        f"{MODULE}::public_az_validation": 0.1,
+        f"{MODULE}::private_validation": 1.0,
+        f"{MODULE}::vpc_validation": 0.2,
+        f"{MODULE}::ssh_key_validation": 0.5,
+    }
+    assert plan.get_gating() == {
+        f"{MODULE}::public_validation",
+        f"{MODULE}::private_validation",
+    }
+
+    # Gating validations first, then the cheapest validations ready to run
+    assert plan.get_order(costs) == [
+        f"{MODULE}::private_validation",
+        f"{MODULE}::public_validation",
+        f"{MODULE}::public_az_validation",
+        f"{MODULE}::vpc_validation",
+        f"{MODULE}::ssh_key_validation",
+    ]
+    assert plan.get_order({}) == [
+        f"{MODULE}::public_validation",
+        f"{MODULE}::private_validation",
+        f"{MODULE}::public_az_validation",
+        f"{MODULE}::vpc_validation",
+        f"{MODULE}::ssh_key_validation",
+    ]
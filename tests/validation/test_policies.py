@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_policies.py
+###
+"""Tests for the persisted cache of the IAM policy documents."""
+import json
+from typing import Any, Dict, List
+
+import boto3
+from botocore.stub import Stubber
+
+from cdpctl.validation import aws_utils
+from cdpctl.validation.policies import (
+    PolicyDocumentCache,
+    get_document_hash,
+    normalize_policy_document,
+)
+
+POLICY_ARN = "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess"
+DOCUMENT = {
+    "Version": "2012-10-17",
+    "Statement": [
+        {"Effect": "Allow", "Action": ["s3:List*", "S3:Get*"], "Resource": "*"},
+        {"Effect": "Allow", "Action": "ec2:DescribeSubnets", "Resource": ["*"]},
+    ],
+}
+REORDERED_DOCUMENT = {
+    "Version": "2012-10-17",
+    "Statement": [
+        {"Effect": "Allow", "Action": "ec2:describesubnets", "Resource": "*"},
+        {"Effect": "Allow", "Action": ["s3:get*", "s3:list*"], "Resource": "*"},
+    ],
+}
+
+
+def test_normalize_policy_document() -> None:
+    """Test documents with the same content have the same hash."""
+    normalized = normalize_policy_document(json.dumps(DOCUMENT))
+    assert normalized["Statement"][1]["Action"] == ["s3:get*", "s3:list*"]
+    assert get_document_hash(normalized) == get_document_hash(
+        normalize_policy_document(REORDERED_DOCUMENT)
+    )
+
+
+def test_policy_document_cache_fetches_versions_once(tmp_path) -> None:
+    """Test a policy version is fetched once, even across runs."""
+    fetches: List[str] = []
+
+    def fetch(document: Dict[str, Any], version_id: str):
+        def _fetch():
+            fetches.append(version_id)
+            return document
+
+        return _fetch
+
+    cache = PolicyDocumentCache(str(tmp_path))
+    content_hash = cache.get_hash("aws", POLICY_ARN, "v1", fetch(DOCUMENT, "v1"))
+    assert (
+        cache.get_hash("aws", POLICY_ARN, "v1", fetch(DOCUMENT, "v1")) == content_hash
+    )
+    rerun_cache = PolicyDocumentCache(str(tmp_path))
+    assert (
+        rerun_cache.get_hash("aws", POLICY_ARN, "v1", fetch(DOCUMENT, "v1"))
+        == content_hash
+    )
+    assert fetches == ["v1"]
+
+    # A new default version is fetched, and shares the document of its content
+    assert (
+        cache.get_hash("aws", POLICY_ARN, "v2", fetch(REORDERED_DOCUMENT, "v2"))
+        == content_hash
+    )
+    assert fetches == ["v1", "v2"]
+    assert cache.get_document(content_hash) == normalize_policy_document(DOCUMENT)
+
+
+def test_policy_document_cache_ignores_corrupt_entries(tmp_path) -> None:
+    """Test a corrupt entry is fetched again."""
+    cache = PolicyDocumentCache(str(tmp_path))
+    cache.get_hash("aws", POLICY_ARN, "v1", lambda: DOCUMENT)
+    for entry in tmp_path.iterdir():
+        entry.write_text("{not json", encoding="utf-8")
+    fetches: List[str] = []
+    PolicyDocumentCache(str(tmp_path)).get_hash(
+        "aws", POLICY_ARN, "v1", lambda: fetches.append("v1") or DOCUMENT
+    )
+    assert fetches == ["v1"]
+
+
+def test_role_policies_share_managed_policies(monkeypatch, tmp_path) -> None:
+    """Test a managed policy attached to several roles is fetched once."""
+    cache = PolicyDocumentCache(str(tmp_path))
+    monkeypatch.setattr(aws_utils, "get_policy_document_cache", lambda: cache)
+    iam_client = boto3.client("iam")
+    stubber = Stubber(iam_client)
+    for role_name in ["role-1", "role-2"]:
+        stubber.add_response(
+            "list_attached_role_policies",
+            {"AttachedPolicies": [{"PolicyArn": POLICY_ARN}]},
+            expected_params={"RoleName": role_name},
+        )
+        if role_name == "role-1":
+            stubber.add_response(
+                "get_policy",
+                {"Policy": {"DefaultVersionId": "v1"}},
+                expected_params={"PolicyArn": POLICY_ARN},
+            )
+            stubber.add_response(
+                "get_policy_version",
+                {"PolicyVersion": {"Document": json.dumps(DOCUMENT)}},
+                expected_params={"PolicyArn": POLICY_ARN, "VersionId": "v1"},
+            )
+        stubber.add_response(
+            "list_role_policies",
+            {"PolicyNames": []},
+            expected_params={"RoleName": role_name},
+        )
+
+    with stubber:
+        policies = [
+            aws_utils.fetch_role_policies(iam_client, role_name)
+            for role_name in ["role-1", "role-2"]
+        ]
+        stubber.assert_no_pending_responses()
+    assert policies[0] == policies[1]
+    assert policies[0]["attached"][POLICY_ARN] == get_document_hash(
+        normalize_policy_document(DOCUMENT)
+    )
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_prefetch.py
+###
+"""Tests for the resource prefetch."""
+from typing import Any, Dict
+from unittest.mock import Mock
+
+import boto3
+import pytest
+from azure.mgmt.resource import ResourceManagementClient
+from botocore.stub import Stubber
+
+from cdpctl.validation import aws_utils, azure_utils
+from cdpctl.validation.aws_utils import fetch_role, fetch_subnets
+from cdpctl.validation.azure_utils import fetch_identity, get_identity_id
+from cdpctl.validation.prefetch import prefetch_resources
+
+public_subnet_ids = ["subnet-pub1", "subnet-pub2", "subnet-pub3"]
+
+aws_config: Dict[str, Any] = {
+    "infra": {
+        "aws": {
+            "region": "us-west-2",
+            "profile": "",
+            "vpc": {"existing": {"public_subnet_ids": public_subnet_ids}},
+        }
+    },
+    "env": {"aws": {"role": {"name": {"cross_account": "cross-account-role"}}}},
+}
+
+
+def test_prefetch_aws_resources(monkeypatch) -> None:
+    clients = {
+        client_type: boto3.client(client_type, region_name="us-west-2")
+        for client_type in ["ec2", "iam", "s3"]
+    }
+    monkeypatch.setattr(
+        aws_utils, "get_client", lambda client_type, config: clients[client_type]
+    )
+    ec2_stubber = Stubber(clients["ec2"])
+    ec2_stubber.add_response(
+        "describe_subnets",
+        {"Subnets": [{"SubnetId": subnet_id} for subnet_id in public_subnet_ids]},
+        expected_params={"SubnetIds": public_subnet_ids},
+    )
+    iam_stubber = Stubber(clients["iam"])
+    iam_stubber.add_client_error("get_role", "NoSuchEntity")
+
+    with ec2_stubber, iam_stubber:
+        prefetch_resources(aws_config, "aws")
+        ec2_stubber.assert_no_pending_responses()
+        iam_stubber.assert_no_pending_responses()
+
+    # The subnets are read from the cache, without any call to AWS.
+    with Stubber(clients["ec2"]):
+        assert [
+            subnet["SubnetId"]
+            for subnet in fetch_subnets(clients["ec2"], public_subnet_ids)
+        ] == public_subnet_ids
+
+    # The failed role lookup is not cached, so the validation reports it.
+    with Stubber(clients["iam"]) as iam_stubber:
+        iam_stubber.add_client_error("get_role", "NoSuchEntity")
+        with pytest.raises(clients["iam"].exceptions.NoSuchEntityException):
+            fetch_role(clients["iam"], "cross-account-role")
+
+
+def test_prefetch_azure_resources(monkeypatch) -> None:
+    config: Dict[str, Any] = {
+        "infra": {
+            "azure": {
+                "subscription_id": "XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX",
+                "metagroup": {"name": "some-resource-group"},
+            },
+        },
+        "env": {"azure": {"role": {"name": {"log": "logger-identity"}}}},
+    }
+    resource_client = Mock(spec=ResourceManagementClient)
+    monkeypatch.setattr(
+        azure_utils, "get_client", lambda client_type, config: resource_client
+    )
+
+    prefetch_resources(config, "azure")
+
+    identity_id = get_identity_id(
+        "XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX",
+        "some-resource-group",
+        "logger-identity",
+    )
+    identity = fetch_identity(Mock(spec=ResourceManagementClient), identity_id)
+    assert identity is resource_client.resources.get_by_id.return_value
+    resource_client.resources.get_by_id.assert_called_once_with(
+        resource_id=identity_id, api_version="2018-11-30"
+    )
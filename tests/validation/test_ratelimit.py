@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_ratelimit.py
+###
+"""Tests for the shared rate limiter."""
+from typing import Any, Dict, List
+from unittest.mock import Mock
+
+from botocore.exceptions import EndpointConnectionError
+
+from cdpctl.validation.aws_utils import get_client, get_client_scope
+from cdpctl.validation.azure_policies import AzureRateLimitPolicy
+from cdpctl.validation.ratelimit import TokenBucket, get_backoff_time, get_rate_limiter
+
+config: Dict[str, Any] = {"infra": {"aws": {"region": "us-west-2", "profile": ""}}}
+SCOPE = "default:us-west-2"
+
+
+class FakeClock:
+    """Clock advanced by the sleeps of the token bucket."""
+
+    def __init__(self) -> None:
+        """Initialize the FakeClock."""
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def time(self) -> float:
+        """Get the current time."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the current time."""
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_limits_rate() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, clock=clock.time, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0.5
+
+
+def test_token_bucket_backs_off_on_throttle() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4.0, clock=clock.time, sleep=clock.sleep)
+
+    bucket.on_throttle(3.0)
+    assert bucket.rate == 2.0
+    assert bucket.acquire() >= 3.0
+
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == 4.0
+
+
+def test_backoff_honors_retry_after() -> None:
+    assert get_backoff_time(1, retry_after=10.0) >= 10.0
+    assert 0 <= get_backoff_time(3) <= 4.0
+
+
+def emit_needs_retry(client: Any, response: Any, attempts: int = 1) -> Any:
+    """Emit the needs-retry event of a GetRole call."""
+    operation = client.meta.service_model.operation_model("GetRole")
+    responses = client.meta.events.emit(
+        "needs-retry.iam.GetRole",
+        response=response,
+        endpoint=Mock(),
+        operation=operation,
+        attempts=attempts,
+        caught_exception=None,
+        request_dict={},
+    )
+    return responses[0][1]
+
+
+def test_aws_client_retries_throttles() -> None:
+    iam_client = get_client("iam", config)
+    operation = iam_client.meta.service_model.operation_model("GetRole")
+    throttle_response = (
+        Mock(status_code=400, headers={"Retry-After": "2"}),
+        {"Error": {"Code": "Throttling"}},
+    )
+
+    responses = iam_client.meta.events.emit(
+        "needs-retry.iam.GetRole",
+        response=throttle_response,
+        endpoint=Mock(),
+        operation=operation,
+        attempts=1,
+        caught_exception=None,
+        request_dict={},
+    )
+
+    assert responses[0][1] >= 2.0
+    events = get_rate_limiter().get_throttle_events()
+    assert [(e.cloud, e.scope, e.service, e.operation) for e in events] == [
+        ("aws", SCOPE, "iam", "GetRole")
+    ]
+    assert get_rate_limiter().get_throttle_counts() == {("aws", SCOPE, "iam"): 1}
+
+
+def test_aws_client_retries_server_errors() -> None:
+    iam_client = get_client("iam", config)
+    bucket = get_rate_limiter().get_bucket("aws", SCOPE, "iam", rate=1.0)
+    bucket.on_throttle()
+    rate = bucket.rate
+    server_error = (Mock(status_code=503, headers={}), {"Error": {"Code": "Busy"}})
+    not_found = (Mock(status_code=404, headers={}), {"Error": {"Code": "NoSuchEntity"}})
+
+    assert emit_needs_retry(iam_client, server_error) >= 0
+    assert emit_needs_retry(iam_client, server_error, attempts=4) >= 0
+    assert emit_needs_retry(iam_client, server_error, attempts=5) is None
+    assert emit_needs_retry(iam_client, not_found) is None
+    assert bucket.rate == rate
+    assert emit_needs_retry(iam_client, (Mock(status_code=200, headers={}), {})) is None
+    assert bucket.rate > rate
+    assert get_rate_limiter().get_throttle_counts() == {}
+
+
+def test_client_scope_is_the_profile_and_region() -> None:
+    assert get_client_scope("some-profile", "us-west-2") == "some-profile:us-west-2"
+    assert get_client_scope(None, "us-west-2") == SCOPE
+
+
+def test_azure_policy_records_throttles() -> None:
+    policy = AzureRateLimitPolicy(scope="some-subscription", service="auth")
+    request = Mock()
+    request.http_request.url = "https://management.azure.com/roleAssignments"
+    response = Mock()
+    response.http_response.status_code = 429
+    response.http_response.headers = {"Retry-After": "0"}
+
+    policy.on_request(request)
+    policy.on_response(request, response)
+
+    assert get_rate_limiter().get_throttle_counts() == {
+        ("azure", "some-subscription", "auth"): 1
+    }
+    assert policy.bucket.rate == policy.bucket.max_rate / 2
+
+
+def test_aws_client_retries_connection_errors() -> None:
+    iam_client = get_client("iam", config)
+    operation = iam_client.meta.service_model.operation_model("GetRole")
+
+    responses = iam_client.meta.events.emit(
+        "needs-retry.iam.GetRole",
+        response=None,
+        endpoint=Mock(),
+        operation=operation,
+        attempts=1,
+        caught_exception=EndpointConnectionError(endpoint_url="https://iam"),
+        request_dict={},
+    )
+
+    # Only the rate limiter retries, the botocore retry handler is removed
+    assert len([delay for _, delay in responses if delay is not None]) == 1
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_results.py
+###
+"""Tests for the shard results."""
+from typing import Any, Dict, List
+
+import pytest
+
+from cdpctl.validation.infra.issues import AWS_SSH_KEY_ID_DOES_NOT_EXIST
+from cdpctl.validation.results import merge_results, parse_shard
+
+VALIDATIONS = ["Subnets exist.", "SSH key exists.", "VPC exists."]
+
+
+def get_results(index: int, count: int, names: List[str]) -> Dict[str, Any]:
+    return {
+        "version": "0.0.0",
+        "infra_type": "aws",
+        "target": "infra",
+        "shard": [index, count],
+        "validations": VALIDATIONS,
+        "nodeids": [],
+        "issues": {
+            name: {
+                "problem": [
+                    {
+                        "template": AWS_SSH_KEY_ID_DOES_NOT_EXIST,
+                        "subjects": [name],
+                        "resources": [],
+                    }
+                ],
+                "warning": [],
+            }
+            for name in names
+        },
+    }
+
+
+def test_parse_shard() -> None:
+    assert parse_shard("2/3") == (2, 3)
+    assert parse_shard(" 1 / 1 ") == (1, 1)
+    for value in ["0/3", "4/3", "1/0", "1", "a/b"]:
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+
+def test_merge_results_in_validation_order() -> None:
+    issues = merge_results(
+        [
+            get_results(2, 2, ["VPC exists.", "Subnets exist."]),
+            get_results(1, 2, ["SSH key exists."]),
+        ]
+    )
+    assert list(issues) == VALIDATIONS
+    assert issues["VPC exists."]["problem"][0].resources == []
+
+
+def test_merge_results_checks_shards() -> None:
+    with pytest.raises(ValueError, match="Missing the results of shard"):
+        merge_results([get_results(1, 3, []), get_results(3, 3, [])])
+    with pytest.raises(ValueError, match="more than once"):
+        merge_results([get_results(1, 2, []), get_results(1, 2, [])])
+    with pytest.raises(ValueError, match="is not one of"):
+        merge_results([get_results(1, 2, []), get_results(2, 3, [])])
+    other_target = get_results(2, 2, [])
+    other_target["infra_type"] = "azure"
+    with pytest.raises(ValueError, match="same infra_type"):
+        merge_results([get_results(1, 2, []), other_target])
+    overlapping = [get_results(1, 2, []), get_results(2, 2, [])]
+    for results in overlapping:
+        results["nodeids"] = ["infra/validate_aws_subnets.py::subnets_validation"]
+    with pytest.raises(ValueError, match="same timings file"):
+        merge_results(overlapping)
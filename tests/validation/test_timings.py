@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+###
+# CLOUDERA CDP Control (cdpctl)
+#
+# (C) Cloudera, Inc. 2021-2021
+# All rights reserved.
+#
+# Applicable Open Source License: GNU AFFERO GENERAL PUBLIC LICENSE
+#
+# NOTE: Cloudera open source products are modular software products
+# made up of hundreds of individual components, each of which was
+# individually copyrighted.  Each Cloudera open source product is a
+# collective work under U.S. Copyright Law. Your license to use the
+# collective work is as provided in your written agreement with
+# Cloudera.  Used apart from the collective work, this file is
+# licensed for your use pursuant to the open source license
+# identified above.
+#
+# This code is provided to you pursuant a written agreement with
+# (i) Cloudera, Inc. or (ii) a third-party authorized to distribute
+# this code. If you do not have a written agreement with Cloudera nor
+# with an authorized and properly licensed third party, you do not
+# have any rights to access nor to use this code.
+#
+# Absent a written agreement with Cloudera, Inc. (“Cloudera”) to the
+# contrary, A) CLOUDERA PROVIDES THIS CODE TO YOU WITHOUT WARRANTIES OF ANY
+# KIND; (B) CLOUDERA DISCLAIMS ANY AND ALL EXPRESS AND IMPLIED
+# WARRANTIES WITH RESPECT TO THIS CODE, INCLUDING BUT NOT LIMITED TO
+# IMPLIED WARRANTIES OF TITLE, NON-INFRINGEMENT, MERCHANTABILITY AND
+# FITNESS FOR A PARTICULAR PURPOSE; (C) CLOUDERA IS NOT LIABLE TO YOU,
+# AND WILL NOT DEFEND, INDEMNIFY, NOR HOLD YOU HARMLESS FOR ANY CLAIMS
+# ARISING FROM OR RELATED TO THE CODE; AND (D)WITH RESPECT TO YOUR EXERCISE
+# OF ANY RIGHTS GRANTED TO YOU FOR THE CODE, CLOUDERA IS NOT LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, PUNITIVE OR
+# CONSEQUENTIAL DAMAGES INCLUDING, BUT NOT LIMITED TO, DAMAGES
+# RELATED TO LOST REVENUE, LOST PROFITS, LOSS OF INCOME, LOSS OF
+# BUSINESS ADVANTAGE OR UNAVAILABILITY, OR LOSS OR CORRUPTION OF
+# DATA.
+#
+# Source File Name:  test_timings.py
+###
+"""Tests for the timing history of the validations."""
+import json
+
+from cdpctl.validation.timings import TimingHistory
+
+
+def test_timing_history_averages_runs(tmp_path) -> None:
+    path = str(tmp_path / "timings.json")
+    timings = TimingHistory(path)
+    timings.record("a", 4.0)
+    timings.record("a", 2.0)
+    timings.record("b", 1.0)
+    timings.save()
+
+    timings = TimingHistory(path)
+    assert timings.seconds == {"a": 3.0, "b": 1.0}
+    # Validations without history are expected to take the median time
+    assert timings.get_costs(["a", "b", "c"]) == {"a": 3.0, "b": 1.0, "c": 2.0}
+    assert timings.get_costs(["c"]) == {}
+
+
+def test_timing_history_ignores_bad_files(tmp_path) -> None:
+    path = tmp_path / "timings.json"
+    path.write_text("{")
+    assert TimingHistory(str(path)).seconds == {}
+    path.write_text(json.dumps({"a": "slow", "b": -1, "c": 2}))
+    assert TimingHistory(str(path)).seconds == {"c": 2.0}
+    assert TimingHistory(None).get_costs(["a"]) == {}